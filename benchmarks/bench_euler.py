@@ -0,0 +1,46 @@
+# 欧拉角批量转换基准：对比 scipy.spatial.transform.Rotation
+# 运行方式（仓库根目录）: python -m benchmarks.bench_euler
+import time
+import numpy as np
+from scipy.spatial.transform import Rotation
+
+from src._1_核心基础模块._2_坐标系转换 import CoordinateTransform
+
+
+def best_of(func, repeat: int = 3) -> float:
+    """多次运行取最短耗时（秒）"""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(n: int = 1_000_000, order: str = 'ZYX'):
+    angles = np.random.default_rng(0).uniform(-np.pi, np.pi, (n, 3))
+    matrices = CoordinateTransform.euler_angles_rotation(angles, order)
+    quats = CoordinateTransform.euler_angles_rotation(angles, order, as_quaternion=True)
+
+    cases = [
+        ('欧拉角 -> 矩阵',
+         lambda: CoordinateTransform.euler_angles_rotation(angles, order),
+         lambda: Rotation.from_euler(order, angles).as_matrix()),
+        ('欧拉角 -> 四元数',
+         lambda: CoordinateTransform.euler_angles_rotation(angles, order, as_quaternion=True),
+         lambda: Rotation.from_euler(order, angles).as_quat(scalar_first=True)),
+        ('矩阵 -> 欧拉角',
+         lambda: CoordinateTransform.rotation_to_euler_angles(matrices, order),
+         lambda: Rotation.from_matrix(matrices).as_euler(order)),
+        ('四元数 -> 欧拉角',
+         lambda: CoordinateTransform.rotation_to_euler_angles(quats, order),
+         lambda: Rotation.from_quat(quats, scalar_first=True).as_euler(order)),
+    ]
+    print(f"N = {n}, 转序 {order}")
+    print(f"{'操作':<14}{'本模块 (ms)':>14}{'scipy (ms)':>14}")
+    for name, ours, scipy_version in cases:
+        print(f"{name:<14}{best_of(ours) * 1e3:>14.1f}{best_of(scipy_version) * 1e3:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
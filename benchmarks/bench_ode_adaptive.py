@@ -0,0 +1,60 @@
+# 自适应 / 固定步长积分器的右端函数调用次数对比（双摆，t ∈ [0, 10]）
+# 运行方式（仓库根目录）: python -m benchmarks.bench_ode_adaptive
+import numpy as np
+
+from src._4_动力学._4_数值方法._1_微分方程求解器 import ODESolver
+
+m1, m2 = 1.0, 1.0
+l1, l2 = 1.0, 1.0
+g = 9.81
+
+
+def double_pendulum_ode(t, state):
+    theta1, omega1, theta2, omega2 = state
+    delta = theta2 - theta1
+    den1 = (m1 + m2) * l1 - m2 * l1 * np.cos(delta) * np.cos(delta)
+    den2 = (l2 / l1) * den1
+    domega1 = ((m2 * l1 * omega1 * omega1 * np.sin(delta) * np.cos(delta) +
+                m2 * g * np.sin(theta2) * np.cos(delta) +
+                m2 * l2 * omega2 * omega2 * np.sin(delta) -
+                (m1 + m2) * g * np.sin(theta1)) / den1)
+    domega2 = ((-m2 * l2 * omega2 * omega2 * np.sin(delta) * np.cos(delta) +
+                (m1 + m2) * g * np.sin(theta1) * np.cos(delta) -
+                (m1 + m2) * l1 * omega1 * omega1 * np.sin(delta) -
+                (m1 + m2) * g * np.sin(theta2)) / den2)
+    return np.array([omega1, domega1, omega2, domega2])
+
+
+class CountingRHS:
+    """统计右端函数调用次数"""
+
+    def __init__(self, func):
+        self.func = func
+        self.calls = 0
+
+    def __call__(self, t, y):
+        self.calls += 1
+        return self.func(t, y)
+
+
+def main():
+    y0 = np.array([np.pi / 2, 0, np.pi, 0])
+    t_eval = np.linspace(0, 10, 201)
+    _, reference = ODESolver.dop853(double_pendulum_ode, y0, [0, 10], t_eval=t_eval, rtol=1e-13, atol=1e-13)
+
+    print(f"{'方法':<24}{'RHS 调用次数':>14}{'最大角度误差':>16}")
+    for dt in (0.01, 0.002, 0.0005):
+        rhs = CountingRHS(double_pendulum_ode)
+        t, y = ODESolver.rk4(rhs, y0, [0, 10], dt, save_every=int(round(0.05 / dt)))
+        error = np.abs(y[:, [0, 2]] - reference[:len(y), [0, 2]]).max()
+        print(f"{f'RK4 dt={dt}':<24}{rhs.calls:>14}{error:>16.2e}")
+    for method in ('RK45', 'DOP853'):
+        for rtol in (1e-6, 1e-9, 1e-11):
+            t, y, info = ODESolver.solve_adaptive(double_pendulum_ode, y0, [0, 10], method=method,
+                                                  t_eval=t_eval, rtol=rtol, atol=rtol * 1e-2, full_output=True)
+            error = np.abs(y[:, [0, 2]] - reference[:, [0, 2]]).max()
+            print(f"{f'{method} rtol={rtol}':<24}{info['nfev']:>14}{error:>16.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# 矢量运算微基准：对比旧版 Vector3D 与当前实现的单次运算耗时
+# 运行方式（仓库根目录）: python -m benchmarks.bench_vectors
+import timeit
+import numpy as np
+
+from src._1_核心基础模块._1_矢量运算工具 import Vector3D
+
+
+class LegacyVector3D:
+    """旧版实现（无 __slots__，每次运算都拆包重建数组），仅作基准对照"""
+
+    def __init__(self, x: float, y: float, z: float = 0):
+        self.components = np.array([x, y, z], dtype=np.float64)
+
+    def __add__(self, other):
+        return LegacyVector3D(*(self.components + other.components))
+
+    def __sub__(self, other):
+        return LegacyVector3D(*(self.components - other.components))
+
+    def __mul__(self, scalar):
+        return LegacyVector3D(*(self.components * scalar))
+
+    def dot(self, other):
+        return np.dot(self.components, other.components)
+
+    def cross(self, other):
+        return LegacyVector3D(*np.cross(self.components, other.components))
+
+    def magnitude(self):
+        return np.linalg.norm(self.components)
+
+
+CASES = {
+    'a + b': lambda a, b: a + b,
+    'a - b': lambda a, b: a - b,
+    'a * 2.0': lambda a, b: a * 2.0,
+    'a.dot(b)': lambda a, b: a.dot(b),
+    'a.cross(b)': lambda a, b: a.cross(b),
+    'a.magnitude()': lambda a, b: a.magnitude(),
+}
+
+
+def per_op_ns(func, a, b, number: int) -> float:
+    """取多轮中的最短耗时，换算为单次运算纳秒数"""
+    times = timeit.repeat(lambda: func(a, b), number=number, repeat=5)
+    return min(times) / number * 1e9
+
+
+def main(number: int = 100_000):
+    legacy = (LegacyVector3D(1, 2, 3), LegacyVector3D(4, 5, 6))
+    current = (Vector3D(1, 2, 3), Vector3D(4, 5, 6))
+    print(f"{'运算':<16}{'旧版 (ns)':>12}{'当前 (ns)':>12}{'加速比':>10}")
+    for name, func in CASES.items():
+        t_old = per_op_ns(func, *legacy, number)
+        t_new = per_op_ns(func, *current, number)
+        print(f"{name:<16}{t_old:>12.0f}{t_new:>12.0f}{t_old / t_new:>10.2f}")
+
+    # 原地运算：旧版只能 a = a + b
+    a_old, b_old = legacy
+    a_new, b_new = current
+
+    def legacy_iadd():
+        nonlocal a_old
+        a_old = a_old + b_old
+
+    def current_iadd():
+        nonlocal a_new
+        a_new += b_new
+
+    t_old = min(timeit.repeat(legacy_iadd, number=number, repeat=5)) / number * 1e9
+    t_new = min(timeit.repeat(current_iadd, number=number, repeat=5)) / number * 1e9
+    print(f"{'a += b':<16}{t_old:>12.0f}{t_new:>12.0f}{t_old / t_new:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
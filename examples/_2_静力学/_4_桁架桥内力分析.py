@@ -1,5 +1,5 @@
 # examples/statics/truss_bridge_demo.py
-from src._2_静力学._3_桁架分析专用模块 import TrussModel, Node, Member, solve_truss
+from src._2_静力学._3_桁架分析专用模块 import TrussModel, Node, Member, TrussDiagnostics, solve_truss
 import numpy as np
 
 # 创建简支桁架模型
@@ -32,13 +32,17 @@ model.apply_load(2, np.array([0, -1e4]))  # 节点2竖向力
 model.apply_load(3, np.array([0, -1e4]))  # 节点3竖向力
 
 # 求解内力
-forces = solve_truss(model)
+diagnostics = TrussDiagnostics()
+forces = solve_truss(model, diagnostics)
 
 # 打印结果
 print("\n杆件内力分析结果 (单位：N):")
 for member_id, force in forces.items():
     print(f"杆件{member_id}: {force:.1f} ({'受拉' if force > 0 else '受压'})")
 
+print("\n求解诊断:")
+print(diagnostics)
+
 # 可视化桁架
 # from src.visualization.plot_2d import plot_truss
 # plot_truss(model, forces)  # 需实现此绘图函数
\ No newline at end of file
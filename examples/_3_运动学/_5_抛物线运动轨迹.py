@@ -28,8 +28,10 @@ def acceleration(r, v, t):
     a_y = -g - k * v[1]
     return np.array([a_x, a_y, 0])
 
-# 计算轨迹（持续到落地）
-trajectory = projectile.cartesian_acceleration(acceleration, t_end=10)
+# 计算轨迹（落地事件触发时停止积分）
+trajectory, events = projectile.cartesian_acceleration(acceleration, t_end=10,
+                                                       events=Particle.ground_contact())
+print(f"落地时刻: {events['t_events'][0][0]:.3f} s")
 
 # 提取数据
 t = trajectory[:,0]
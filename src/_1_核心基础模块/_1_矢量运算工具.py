@@ -1,25 +1,157 @@
 # 矢量运算工具
+import math
 import numpy as np
-from typing import Union, List
+from typing import Union, List, Iterable
+
+
+def _unit_axes(axis: np.ndarray) -> np.ndarray:
+    """逐行单位化旋转轴，零轴保持为零（此时旋转退化为 v cosθ）"""
+    norm = np.linalg.norm(axis, axis=-1, keepdims=True)
+    return np.divide(axis, norm, out=np.zeros(np.broadcast_shapes(axis.shape, norm.shape)), where=norm != 0)
+
+
+def rodrigues_matrix(axis, theta) -> np.ndarray:
+    """
+    罗德里格斯旋转矩阵（向量化）
+    :param axis: 旋转轴 (3,) 或 (M, 3)，无需预先单位化
+    :param theta: 转角，标量或 (M,)
+    :return: (3, 3) 或 (M, 3, 3)
+    """
+    axis = np.asarray(axis, dtype=np.float64)
+    theta = np.asarray(theta, dtype=np.float64)
+    k = _unit_axes(axis)
+    k, theta = np.broadcast_arrays(k, theta[..., None])
+    theta = theta[..., 0]
+    cos_t = np.cos(theta)[..., None, None]
+    sin_t = np.sin(theta)[..., None, None]
+    kx, ky, kz = k[..., 0], k[..., 1], k[..., 2]
+    zero = np.zeros_like(kx)
+    skew = np.stack([
+        np.stack([zero, -kz, ky], axis=-1),
+        np.stack([kz, zero, -kx], axis=-1),
+        np.stack([-ky, kx, zero], axis=-1),
+    ], axis=-2)
+    outer = k[..., :, None] * k[..., None, :]
+    return cos_t * np.eye(3) + (1 - cos_t) * outer + sin_t * skew
+
+
+def _rotate_single(v: np.ndarray, axis: np.ndarray, theta: float) -> np.ndarray:
+    """单个矢量单次旋转：纯标量展开，避免小数组运算的调用开销"""
+    kx, ky, kz = axis.tolist()
+    vx, vy, vz = v.tolist()
+    mag = math.sqrt(kx * kx + ky * ky + kz * kz)
+    if mag != 0:
+        kx, ky, kz = kx / mag, ky / mag, kz / mag
+    cos_t = math.cos(theta)
+    sin_t = math.sin(theta)
+    k_dot_v = (kx * vx + ky * vy + kz * vz) * (1 - cos_t)
+    return np.array([
+        vx * cos_t + (ky * vz - kz * vy) * sin_t + kx * k_dot_v,
+        vy * cos_t + (kz * vx - kx * vz) * sin_t + ky * k_dot_v,
+        vz * cos_t + (kx * vy - ky * vx) * sin_t + kz * k_dot_v,
+    ])
+
+
+def rotate_vectors(vectors, axis, theta, outer: bool = False) -> np.ndarray:
+    """
+    批量旋转矢量（无逐矢量 Python 循环）
+    三种用法：
+      - 单轴单角作用于 N 个矢量：axis (3,)，theta 标量 -> (N, 3)
+      - N 组轴角逐一作用：axis (N, 3) 或 (3,)，theta (N,) -> (N, 3)
+      - outer=True 时 M 个角（可配 M 个轴）分别作用于全部 N 个矢量 -> (M, N, 3)
+    :param vectors: (3,) 或 (N, 3)
+    :param axis: 旋转轴 (3,) 或 (N, 3) / (M, 3)
+    :param theta: 转角，标量或 (N,) / (M,)
+    :param outer: 是否按“角度 × 矢量”外积方式组合
+    """
+    v = np.asarray(vectors, dtype=np.float64)
+    axis = np.asarray(axis, dtype=np.float64)
+    theta = np.asarray(theta, dtype=np.float64)
+
+    if outer:
+        R = rodrigues_matrix(axis, np.atleast_1d(theta))
+        if R.ndim == 2:
+            R = R[None]
+        return np.matmul(v, R.transpose(0, 2, 1))
+
+    if axis.ndim == 1 and theta.ndim == 0:
+        if v.ndim == 1:
+            return _rotate_single(v, axis, float(theta))
+        # 单个旋转：构造一次矩阵后走 BLAS 矩阵乘
+        return v @ rodrigues_matrix(axis, theta).T
+
+    # 逐元素轴角：直接展开罗德里格斯公式 v cosθ + (k×v) sinθ + k(k·v)(1-cosθ)
+    k = _unit_axes(axis)
+    cos_t = np.cos(theta)[..., None]
+    sin_t = np.sin(theta)[..., None]
+    k_dot_v = np.sum(k * v, axis=-1, keepdims=True)
+    return v * cos_t + np.cross(k, v) * sin_t + k * k_dot_v * (1 - cos_t)
 
 
 class Vector3D:
     """三维矢量类，支持基本运算与物理量表示"""
 
+    __slots__ = ('components',)
+
     def __init__(self, x: float, y: float, z: float = 0):
         self.components = np.array([x, y, z], dtype=np.float64)
 
+    @classmethod
+    def from_array(cls, components: np.ndarray, copy: bool = False) -> 'Vector3D':
+        """
+        由已有缓冲区直接构造矢量
+        :param components: 长度为 3 的数组；若已是 float64 则默认不复制（共享内存）
+        :param copy: 是否强制复制
+        """
+        obj = object.__new__(cls)
+        components = np.asarray(components, dtype=np.float64)
+        if components.shape != (3,):
+            raise ValueError("矢量分量的形状必须为 (3,)")
+        obj.components = components.copy() if copy else components
+        return obj
+
     def __add__(self, other: 'Vector3D') -> 'Vector3D':
-        return Vector3D(*(self.components + other.components))
+        if not isinstance(other, Vector3D):
+            return NotImplemented  # 交给 Vector3DArray 的反射运算处理
+        return _wrap(self.components + other.components)
 
     def __sub__(self, other: 'Vector3D') -> 'Vector3D':
-        return Vector3D(*(self.components - other.components))
+        if not isinstance(other, Vector3D):
+            return NotImplemented  # 交给 Vector3DArray 的反射运算处理
+        return _wrap(self.components - other.components)
 
     def __mul__(self, scalar: float) -> 'Vector3D':
-        return Vector3D(*(self.components * scalar))
+        return _wrap(self.components * scalar)
+
+    __rmul__ = __mul__
 
     def __truediv__(self, scalar: float) -> 'Vector3D':
-        return Vector3D(*(self.components / scalar))
+        return _wrap(self.components / scalar)
+
+    def __neg__(self) -> 'Vector3D':
+        return _wrap(-self.components)
+
+    def __iadd__(self, other: 'Vector3D') -> 'Vector3D':
+        """原地加法（不分配新数组，共享缓冲区的视图会同步变化）"""
+        self.components += other.components
+        return self
+
+    def __isub__(self, other: 'Vector3D') -> 'Vector3D':
+        """原地减法"""
+        self.components -= other.components
+        return self
+
+    def __imul__(self, scalar: float) -> 'Vector3D':
+        """原地数乘"""
+        self.components *= scalar
+        return self
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Vector3D):
+            return NotImplemented
+        return bool(np.array_equal(self.components, other.components))
+
+    __hash__ = None  # 可变对象，不可哈希
 
     def dot(self, other: 'Vector3D') -> float:
         """矢量点积"""
@@ -27,33 +159,24 @@ class Vector3D:
 
     def cross(self, other: 'Vector3D') -> 'Vector3D':
         """矢量叉积"""
-        return Vector3D(*np.cross(self.components, other.components))
+        a = self.components
+        b = other.components
+        return _wrap(np.array([a[1] * b[2] - a[2] * b[1],
+                               a[2] * b[0] - a[0] * b[2],
+                               a[0] * b[1] - a[1] * b[0]]))
 
     def magnitude(self) -> float:
         """矢量模长"""
-        return np.linalg.norm(self.components)
+        return np.sqrt(np.dot(self.components, self.components))
 
     def unit_vector(self) -> 'Vector3D':
         """单位矢量"""
         mag = self.magnitude()
-        return Vector3D(*(self.components / mag)) if mag != 0 else Vector3D(0, 0, 0)
+        return _wrap(self.components / mag) if mag != 0 else Vector3D(0, 0, 0)
 
     def rotate(self, axis: 'Vector3D', theta: float) -> 'Vector3D':
         """绕任意轴旋转（使用罗德里格斯公式）"""
-        axis = axis.unit_vector().components
-        cos_t = np.cos(theta)
-        sin_t = np.sin(theta)
-        # 罗德里格斯旋转矩阵
-        rot_matrix = (
-                cos_t * np.eye(3) +
-                (1 - cos_t) * np.outer(axis, axis) +
-                sin_t * np.array([
-            [0, -axis[2], axis[1]],
-            [axis[2], 0, -axis[0]],
-            [-axis[1], axis[0], 0]
-        ])
-        )
-        return Vector3D(*np.dot(rot_matrix, self.components))
+        return _wrap(rotate_vectors(self.components, axis.components, theta))
 
     def to_polar(self) -> tuple:
         """转换为极坐标系（仅适用于二维情况）"""
@@ -64,4 +187,147 @@ class Vector3D:
         return (r, theta)
 
     def __repr__(self):
-        return f"Vector3D({self.components[0]:.2f}, {self.components[1]:.2f}, {self.components[2]:.2f})"
\ No newline at end of file
+        return f"Vector3D({self.components[0]:.2f}, {self.components[1]:.2f}, {self.components[2]:.2f})"
+
+
+def _wrap(components: np.ndarray) -> Vector3D:
+    """内部快速构造：直接接管运算结果数组，跳过拆包与校验"""
+    obj = object.__new__(Vector3D)
+    obj.components = components
+    return obj
+
+
+class Vector3DArray:
+    """
+    三维矢量数组（结构数组布局）
+    底层为一块连续的 (N, 3) float64 缓冲区，所有运算均为向量化批量计算，
+    可与单个 Vector3D 广播运算
+    """
+
+    def __init__(self, data):
+        """
+        :param data: 形如 (N, 3) 的数组；若已是 C 连续的 float64 数组则不复制（零拷贝视图）
+        """
+        data = np.ascontiguousarray(data, dtype=np.float64)
+        if data.ndim == 1:
+            data = data.reshape(1, -1)
+        if data.ndim != 2 or data.shape[1] != 3:
+            raise ValueError("矢量数组的形状必须为 (N, 3)")
+        self.data = data
+
+    @classmethod
+    def zeros(cls, n: int) -> 'Vector3DArray':
+        """创建 n 个零矢量"""
+        return cls(np.zeros((n, 3)))
+
+    @classmethod
+    def from_vectors(cls, vectors: Iterable[Vector3D]) -> 'Vector3DArray':
+        """由若干 Vector3D 组装矢量数组（复制数据）"""
+        return cls(np.array([v.components for v in vectors], dtype=np.float64).reshape(-1, 3))
+
+    def to_vectors(self) -> List[Vector3D]:
+        """拆分为 Vector3D 列表（逐个复制，仅用于与标量代码交互）"""
+        return [_wrap(row.copy()) for row in self.data]
+
+    def __array__(self, dtype=None, copy=None):
+        """支持 np.asarray(arr) 直接取得底层缓冲区（零拷贝）"""
+        if dtype is not None and np.dtype(dtype) != self.data.dtype:
+            return self.data.astype(dtype)
+        return self.data.copy() if copy else self.data
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    def __getitem__(self, index):
+        """整数索引返回共享缓冲区的 Vector3D 视图，切片/掩码索引返回 Vector3DArray"""
+        if isinstance(index, (int, np.integer)):
+            return _wrap(self.data[index])
+        return Vector3DArray(self.data[index])
+
+    def __setitem__(self, index, value):
+        self.data[index] = self._operand(value)
+
+    def __iter__(self):
+        return iter(self.to_vectors())
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.data[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.data[:, 1]
+
+    @property
+    def z(self) -> np.ndarray:
+        return self.data[:, 2]
+
+    @staticmethod
+    def _operand(other):
+        """将运算对象统一为可与 (N, 3) 广播的数组"""
+        if isinstance(other, Vector3DArray):
+            return other.data
+        if isinstance(other, Vector3D):
+            return other.components
+        return np.asarray(other, dtype=np.float64)
+
+    @staticmethod
+    def _scalar(scalar):
+        """标量或长度为 N 的系数数组，后者扩展为列向量以按行缩放"""
+        scalar = np.asarray(scalar, dtype=np.float64)
+        return scalar[:, None] if scalar.ndim == 1 else scalar
+
+    def __add__(self, other) -> 'Vector3DArray':
+        return Vector3DArray(self.data + self._operand(other))
+
+    __radd__ = __add__
+
+    def __sub__(self, other) -> 'Vector3DArray':
+        return Vector3DArray(self.data - self._operand(other))
+
+    def __rsub__(self, other) -> 'Vector3DArray':
+        return Vector3DArray(self._operand(other) - self.data)
+
+    def __mul__(self, scalar) -> 'Vector3DArray':
+        return Vector3DArray(self.data * self._scalar(scalar))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, scalar) -> 'Vector3DArray':
+        return Vector3DArray(self.data / self._scalar(scalar))
+
+    def __neg__(self) -> 'Vector3DArray':
+        return Vector3DArray(-self.data)
+
+    def dot(self, other) -> np.ndarray:
+        """逐行点积，返回 (N,)"""
+        other = self._operand(other)
+        return np.einsum('ij,ij->i', self.data, np.broadcast_to(other, self.data.shape))
+
+    def cross(self, other) -> 'Vector3DArray':
+        """逐行叉积"""
+        return Vector3DArray(np.cross(self.data, self._operand(other)))
+
+    def norm(self) -> np.ndarray:
+        """逐行模长，返回 (N,)"""
+        return np.sqrt(np.einsum('ij,ij->i', self.data, self.data))
+
+    magnitude = norm
+
+    def normalize(self) -> 'Vector3DArray':
+        """单位化，零矢量保持为零"""
+        mag = self.norm()
+        safe = np.where(mag == 0, 1.0, mag)
+        return Vector3DArray(self.data / safe[:, None])
+
+    def rotate(self, axis, theta, outer: bool = False):
+        """
+        绕轴批量旋转，参数含义同 rotate_vectors
+        :param axis: Vector3D、Vector3DArray 或数组
+        :return: outer=False 时为 Vector3DArray，否则为 (M, N, 3) 数组
+        """
+        result = rotate_vectors(self.data, self._operand(axis), theta, outer=outer)
+        return result if outer else Vector3DArray(result)
+
+    def __repr__(self):
+        return f"Vector3DArray(n={len(self)})"
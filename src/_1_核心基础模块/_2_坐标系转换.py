@@ -3,75 +3,425 @@ import numpy as np
 from sympy import symbols, sin, cos, Matrix
 from typing import Tuple
 
+# 绕各轴旋转时发生转动的坐标平面 (i, j)：R[i, j] = -sin, R[j, i] = sin
+_AXIS_PLANE = {'x': (1, 2), 'y': (2, 0), 'z': (0, 1)}
+# 三个轴编号的排列奇偶性：循环排列为 +1，否则为 -1
+_PARITY = {(0, 1, 2): 1, (1, 2, 0): 1, (2, 0, 1): 1, (0, 2, 1): -1, (2, 1, 0): -1, (1, 0, 2): -1}
+
 
 class CoordinateTransform:
-    """坐标系转换工具类"""
+    """
+    坐标系转换工具类
+    默认使用 NumPy 数值计算，所有坐标分量均可传入同形状数组批量转换；
+    需要符号结果时显式传入 symbolic=True
+    """
 
     @staticmethod
-    def cartesian_to_spherical(x: float, y: float, z: float) -> Tuple[float, float, float]:
-        """笛卡尔坐标转球坐标 (r, theta, phi)"""
+    def cartesian_to_spherical(x, y, z) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """笛卡尔坐标转球坐标 (r, theta, phi)，theta 为极角，原点处取 theta = 0"""
+        x, y, z = np.broadcast_arrays(*(np.asarray(c, dtype=np.float64) for c in (x, y, z)))
         r = np.sqrt(x ** 2 + y ** 2 + z ** 2)
-        theta = np.arccos(z / r) if r != 0 else 0
+        safe_r = np.where(r == 0, 1.0, r)
+        theta = np.where(r == 0, 0.0, np.arccos(np.clip(z / safe_r, -1.0, 1.0)))
         phi = np.arctan2(y, x)
-        return (r, theta, phi)
+        return (r[()], theta[()], phi[()])
 
     @staticmethod
-    def spherical_to_cartesian(r: float, theta: float, phi: float) -> Tuple[float, float, float]:
+    def spherical_to_cartesian(r, theta, phi, symbolic: bool = False) -> Tuple:
         """球坐标转笛卡尔坐标"""
-        x = r * sin(theta) * cos(phi)
-        y = r * sin(theta) * sin(phi)
-        z = r * cos(theta)
-        return (x, y, z)
+        if symbolic:
+            x = r * sin(theta) * cos(phi)
+            y = r * sin(theta) * sin(phi)
+            z = r * cos(theta)
+            return (x, y, z)
+        r, theta, phi = (np.asarray(c, dtype=np.float64) for c in (r, theta, phi))
+        sin_theta = np.sin(theta)
+        x = r * sin_theta * np.cos(phi)
+        y = r * sin_theta * np.sin(phi)
+        z = r * np.cos(theta)
+        return (x[()], y[()], z[()])
 
     @staticmethod
-    def rotation_matrix(axis: str, angle: float) -> Matrix:
-        """生成符号旋转矩阵（SymPy 符号运算）"""
-        theta = symbols('theta')
-        if axis == 'x':
-            return Matrix([
-                [1, 0, 0],
-                [0, cos(theta), -sin(theta)],
-                [0, sin(theta), cos(theta)]
-            ]).subs(theta, angle)
-        elif axis == 'y':
-            return Matrix([
-                [cos(theta), 0, sin(theta)],
-                [0, 1, 0],
-                [-sin(theta), 0, cos(theta)]
-            ]).subs(theta, angle)
-        elif axis == 'z':
+    def cartesian_to_cylindrical(x, y, z) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """笛卡尔坐标转柱坐标 (rho, phi, z)"""
+        x, y, z = (np.asarray(c, dtype=np.float64) for c in (x, y, z))
+        return (np.hypot(x, y)[()], np.arctan2(y, x)[()], z[()])
+
+    @staticmethod
+    def cylindrical_to_cartesian(rho, phi, z, symbolic: bool = False) -> Tuple:
+        """柱坐标转笛卡尔坐标"""
+        if symbolic:
+            return (rho * cos(phi), rho * sin(phi), z)
+        rho, phi, z = (np.asarray(c, dtype=np.float64) for c in (rho, phi, z))
+        return ((rho * np.cos(phi))[()], (rho * np.sin(phi))[()], z[()])
+
+    @staticmethod
+    def points_to_spherical(points: np.ndarray) -> np.ndarray:
+        """(N, 3) 笛卡尔点集 -> (N, 3) 球坐标 [r, theta, phi]"""
+        points = np.asarray(points, dtype=np.float64)
+        return np.stack(CoordinateTransform.cartesian_to_spherical(*np.moveaxis(points, -1, 0)), axis=-1)
+
+    @staticmethod
+    def points_from_spherical(points: np.ndarray) -> np.ndarray:
+        """(N, 3) 球坐标 [r, theta, phi] -> (N, 3) 笛卡尔点集"""
+        points = np.asarray(points, dtype=np.float64)
+        return np.stack(CoordinateTransform.spherical_to_cartesian(*np.moveaxis(points, -1, 0)), axis=-1)
+
+    @staticmethod
+    def points_to_cylindrical(points: np.ndarray) -> np.ndarray:
+        """(N, 3) 笛卡尔点集 -> (N, 3) 柱坐标 [rho, phi, z]"""
+        points = np.asarray(points, dtype=np.float64)
+        return np.stack(CoordinateTransform.cartesian_to_cylindrical(*np.moveaxis(points, -1, 0)), axis=-1)
+
+    @staticmethod
+    def points_from_cylindrical(points: np.ndarray) -> np.ndarray:
+        """(N, 3) 柱坐标 [rho, phi, z] -> (N, 3) 笛卡尔点集"""
+        points = np.asarray(points, dtype=np.float64)
+        return np.stack(CoordinateTransform.cylindrical_to_cartesian(*np.moveaxis(points, -1, 0)), axis=-1)
+
+    @staticmethod
+    def rotation_matrix(axis: str, angle, symbolic: bool = False):
+        """
+        绕坐标轴的基本旋转矩阵
+        :param axis: 'x' / 'y' / 'z'
+        :param angle: 转角，标量或 (N,) 数组（symbolic=True 时可为符号）
+        :param symbolic: 为 True 时返回 SymPy Matrix
+        :return: (3, 3) 或 (N, 3, 3) 数组
+        """
+        if axis not in ('x', 'y', 'z'):
+            raise ValueError(f"未知旋转轴: {axis}")
+        if symbolic:
+            theta = symbols('theta')
+            if axis == 'x':
+                return Matrix([
+                    [1, 0, 0],
+                    [0, cos(theta), -sin(theta)],
+                    [0, sin(theta), cos(theta)]
+                ]).subs(theta, angle)
+            elif axis == 'y':
+                return Matrix([
+                    [cos(theta), 0, sin(theta)],
+                    [0, 1, 0],
+                    [-sin(theta), 0, cos(theta)]
+                ]).subs(theta, angle)
             return Matrix([
                 [cos(theta), -sin(theta), 0],
                 [sin(theta), cos(theta), 0],
                 [0, 0, 1]
             ]).subs(theta, angle)
 
+        angle = np.asarray(angle, dtype=np.float64)
+        c = np.cos(angle)
+        s = np.sin(angle)
+        R = np.zeros(angle.shape + (3, 3))
+        i, j = _AXIS_PLANE[axis]
+        k = 3 - i - j
+        R[..., k, k] = 1.0
+        R[..., i, i] = c
+        R[..., j, j] = c
+        R[..., i, j] = -s
+        R[..., j, i] = s
+        return R
+
+    @staticmethod
+    def euler_angles_rotation(angles, order: str = 'zyx', as_quaternion: bool = False) -> np.ndarray:
+        """
+        欧拉角旋转矩阵生成器（支持全部 12 种转序，向量化）
+        :param angles: 三个转角 (3,) 或批量 (N, 3)，依次对应 order 中的三个轴
+        :param order: 转序，小写为外旋（绕固定轴，如 'zyx'），大写为内旋（绕随动轴，如 'ZYX'）
+        :param as_quaternion: 为 True 时返回标量在前的四元数 [w, x, y, z]
+        :return: (3, 3) / (N, 3, 3) 旋转矩阵，或 (4,) / (N, 4) 四元数
+        """
+        axes, intrinsic = _parse_euler_order(order)
+        angles = np.asarray(angles, dtype=np.float64)
+        if angles.shape[-1] != 3:
+            raise ValueError("欧拉角数组的最后一维长度必须为 3")
+        # 外旋 (a1, a2, a3) 等价于逆序轴上的内旋 (a3, a2, a1)，统一按内旋 R = R1 R2 R3 组合
+        if not intrinsic:
+            axes = axes[::-1]
+            angles = angles[..., ::-1]
+
+        if as_quaternion:
+            half = 0.5 * angles
+            c = np.cos(half)
+            s = np.sin(half)
+            q = np.zeros(angles.shape[:-1] + (4,))
+            q[..., 0] = c[..., 0]
+            q[..., 1 + axes[0]] = s[..., 0]
+            for n in (1, 2):
+                q_n = np.zeros_like(q)
+                q_n[..., 0] = c[..., n]
+                q_n[..., 1 + axes[n]] = s[..., n]
+                q = _quaternion_multiply(q, q_n)
+            return q
+
+        names = 'xyz'
+        R = CoordinateTransform.rotation_matrix(names[axes[0]], angles[..., 0])
+        R = np.matmul(R, CoordinateTransform.rotation_matrix(names[axes[1]], angles[..., 1]))
+        return np.matmul(R, CoordinateTransform.rotation_matrix(names[axes[2]], angles[..., 2]))
+
+    @staticmethod
+    def rotation_to_euler_angles(rotation, order: str = 'zyx', tol: float = 1e-7) -> np.ndarray:
+        """
+        旋转矩阵（或四元数）反求欧拉角，向量化处理
+        万向节锁（中间角使第一、三转轴共线）时，按等价内旋序列将最后一次转角置零，
+        全部转动归入第一次转角
+        :param rotation: (3, 3) / (N, 3, 3) 旋转矩阵，或 (4,) / (N, 4) 四元数 [w, x, y, z]
+        :param order: 转序，约定同 euler_angles_rotation
+        :param tol: 判定万向节锁的阈值
+        :return: (3,) 或 (N, 3) 欧拉角
+        """
+        axes, intrinsic = _parse_euler_order(order)
+        R = np.asarray(rotation, dtype=np.float64)
+        if R.shape[-1] == 4:
+            R = CoordinateTransform.quaternion_to_matrix(R)
+        if not intrinsic:
+            axes = axes[::-1]
+        i, j, k = axes
+
+        if i == k:
+            # 经典欧拉角 R_i(a) R_j(b) R_i(c)，m 为未出现的第三轴
+            m = 3 - i - j
+            e = _PARITY[(i, j, m)]
+            b = np.arccos(np.clip(R[..., i, i], -1.0, 1.0))
+            locked = np.abs(np.sin(b)) < tol
+            a = np.arctan2(R[..., j, i], -e * R[..., m, i])
+            c = np.arctan2(R[..., i, j], e * R[..., i, m])
+            a_locked = np.arctan2(e * R[..., m, j], R[..., j, j])
+        else:
+            # 卡尔丹角（泰特-布莱恩角）R_i(a) R_j(b) R_k(c)
+            e = _PARITY[(i, j, k)]
+            b = np.arcsin(np.clip(e * R[..., i, k], -1.0, 1.0))
+            locked = np.abs(np.cos(b)) < tol
+            a = np.arctan2(-e * R[..., j, k], R[..., k, k])
+            c = np.arctan2(-e * R[..., i, j], R[..., i, i])
+            a_locked = np.arctan2(e * R[..., k, j], R[..., j, j])
+
+        a = np.where(locked, a_locked, a)
+        c = np.where(locked, 0.0, c)
+        angles = np.stack([a, b, c], axis=-1)
+        return angles if intrinsic else angles[..., ::-1]
+
     @staticmethod
-    def euler_angles_rotation(angles: Tuple[float, float, float], order: str = 'zyx') -> Matrix:
-        """欧拉角旋转矩阵生成器"""
-        # 实现不同旋转顺序的组合
-        pass  # 具体实现可根据需求扩展
+    def quaternion_to_matrix(q) -> np.ndarray:
+        """四元数 [w, x, y, z]（无需预先单位化）转旋转矩阵，支持 (N, 4) 批量"""
+        q = np.asarray(q, dtype=np.float64)
+        w, x, y, z = np.moveaxis(q, -1, 0)
+        scale = 2.0 / (w * w + x * x + y * y + z * z)
+        xs, ys, zs = x * scale, y * scale, z * scale
+        wx, wy, wz = w * xs, w * ys, w * zs
+        xx, xy, xz = x * xs, x * ys, x * zs
+        yy, yz, zz = y * ys, y * zs, z * zs
+        R = np.empty(q.shape[:-1] + (3, 3))
+        R[..., 0, 0] = 1 - (yy + zz)
+        R[..., 0, 1] = xy - wz
+        R[..., 0, 2] = xz + wy
+        R[..., 1, 0] = xy + wz
+        R[..., 1, 1] = 1 - (xx + zz)
+        R[..., 1, 2] = yz - wx
+        R[..., 2, 0] = xz - wy
+        R[..., 2, 1] = yz + wx
+        R[..., 2, 2] = 1 - (xx + yy)
+        return R
+
+
+def _parse_euler_order(order: str) -> Tuple[Tuple[int, int, int], bool]:
+    """解析转序字符串，返回 (轴编号元组, 是否内旋)"""
+    if len(order) != 3 or not (order.islower() or order.isupper()) \
+            or any(ax not in 'xyz' for ax in order.lower()):
+        raise ValueError(f"无效的欧拉角转序: {order}")
+    axes = tuple('xyz'.index(ax) for ax in order.lower())
+    if axes[0] == axes[1] or axes[1] == axes[2]:
+        raise ValueError(f"相邻转轴不能相同: {order}")
+    return axes, order.isupper()
+
+
+def _quaternion_multiply(q1: np.ndarray, q2: np.ndarray) -> np.ndarray:
+    """四元数乘积 q1 ⊗ q2（标量在前，支持广播）"""
+    w1, x1, y1, z1 = np.moveaxis(q1, -1, 0)
+    w2, x2, y2, z2 = np.moveaxis(q2, -1, 0)
+    return np.stack([
+        w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+        w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+        w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+        w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+    ], axis=-1)
 
 
 class ReferenceFrame:
-    """参考坐标系管理类"""
+    """
+    参考坐标系管理类
+    坐标系之间组成树：每个坐标系保存相对父坐标系的旋转与平移，
+    并缓存相对根坐标系（世界系）的合成变换；局部变换改变时仅使自身及其子孙的缓存失效
+    """
 
-    def __init__(self, name: str, parent=None):
+    def __init__(self, name: str, parent: 'ReferenceFrame' = None):
         self.name = name
+        self._parent = None
+        self._children = []
+        self._rotation_matrix = _frozen(np.eye(3))
+        self._translation = _frozen(np.zeros(3))
+        # 缓存：world_from_frame 的旋转与平移
+        self._world_rotation = None
+        self._world_translation = None
+        self._dirty = True
         self.parent = parent
-        self.rotation_matrix = np.eye(3)
+
+    @property
+    def parent(self) -> 'ReferenceFrame':
+        return self._parent
+
+    @parent.setter
+    def parent(self, parent: 'ReferenceFrame'):
+        """改挂父坐标系（禁止成环）"""
+        ancestor = parent
+        while ancestor is not None:
+            if ancestor is self:
+                raise ValueError("坐标系树中不允许出现环")
+            ancestor = ancestor._parent
+        if self._parent is not None:
+            self._parent._children.remove(self)
+        self._parent = parent
+        if parent is not None:
+            parent._children.append(self)
+        self._invalidate()
+
+    @property
+    def children(self) -> tuple:
+        return tuple(self._children)
+
+    @property
+    def rotation_matrix(self) -> np.ndarray:
+        """父坐标系到本坐标系的旋转矩阵（只读，修改请整体赋值）"""
+        return self._rotation_matrix
+
+    @rotation_matrix.setter
+    def rotation_matrix(self, matrix: np.ndarray):
+        self._rotation_matrix = _frozen(matrix)
+        self._invalidate()
+
+    @property
+    def translation(self) -> np.ndarray:
+        """本坐标系原点在父坐标系中的位置（只读，修改请整体赋值）"""
+        return self._translation
+
+    @translation.setter
+    def translation(self, offset: np.ndarray):
+        self._translation = _frozen(offset)
+        self._invalidate()
+
+    def _invalidate(self):
+        """标记自身及全部子孙的世界变换缓存失效；已失效的子树无需再向下传播"""
+        stack = [self]
+        while stack:
+            frame = stack.pop()
+            if frame._dirty and frame is not self:
+                continue
+            frame._dirty = True
+            stack.extend(frame._children)
 
     def transform_vector(self, vector: np.ndarray) -> np.ndarray:
-        """将矢量转换到父坐标系"""
+        """将矢量转换到父坐标系（自由矢量，只旋转不平移）"""
         if self.parent is None:
             return vector
         return self.rotation_matrix.T @ vector
 
     def add_rotation(self, axis: str, angle: float):
         """累积旋转操作"""
-        rot_map = {
-            'x': np.array([[1, 0, 0], [0, np.cos(angle), -np.sin(angle)], [0, np.sin(angle), np.cos(angle)]]),
-            'y': np.array([[np.cos(angle), 0, np.sin(angle)], [0, 1, 0], [-np.sin(angle), 0, np.cos(angle)]]),
-            'z': np.array([[np.cos(angle), -np.sin(angle), 0], [np.sin(angle), np.cos(angle), 0], [0, 0, 1]])
-        }
-        self.rotation_matrix = rot_map[axis] @ self.rotation_matrix
\ No newline at end of file
+        self.rotation_matrix = CoordinateTransform.rotation_matrix(axis, angle) @ self._rotation_matrix
+
+    def add_translation(self, offset: np.ndarray):
+        """累积平移操作（在父坐标系中表示）"""
+        self.translation = self._translation + np.asarray(offset, dtype=np.float64)
+
+    def world_transform(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        本坐标系到根坐标系的合成变换 (R, t)，满足 p_world = R @ p_local + t
+        结果带缓存，仅在自身或祖先的局部变换改变后重新计算
+        """
+        if self._dirty:
+            # 自上而下找到最高的失效祖先，再逐级向下重算
+            chain = []
+            frame = self
+            while frame is not None and frame._dirty:
+                chain.append(frame)
+                frame = frame._parent
+            for frame in reversed(chain):
+                R_local = frame._rotation_matrix.T
+                if frame._parent is None:
+                    R, t = R_local, frame._translation
+                else:
+                    R_parent, t_parent = frame._parent._world_rotation, frame._parent._world_translation
+                    R = R_parent @ R_local
+                    t = R_parent @ frame._translation + t_parent
+                frame._world_rotation = _frozen(R)
+                frame._world_translation = _frozen(t)
+                frame._dirty = False
+        return self._world_rotation, self._world_translation
+
+    def root(self) -> 'ReferenceFrame':
+        frame = self
+        while frame._parent is not None:
+            frame = frame._parent
+        return frame
+
+    def depth(self) -> int:
+        depth = 0
+        frame = self._parent
+        while frame is not None:
+            depth += 1
+            frame = frame._parent
+        return depth
+
+    @staticmethod
+    def lowest_common_ancestor(a: 'ReferenceFrame', b: 'ReferenceFrame') -> 'ReferenceFrame':
+        """两个坐标系的最近公共祖先；不在同一棵树上时返回 None"""
+        depth_a, depth_b = a.depth(), b.depth()
+        while depth_a > depth_b:
+            a, depth_a = a._parent, depth_a - 1
+        while depth_b > depth_a:
+            b, depth_b = b._parent, depth_b - 1
+        while a is not b:
+            a, b = a._parent, b._parent
+        return a
+
+    def transform_to_ancestor(self, ancestor: 'ReferenceFrame') -> Tuple[np.ndarray, np.ndarray]:
+        """本坐标系到某个祖先坐标系的变换 (R, t)，由两者的缓存世界变换合成"""
+        R_frame, t_frame = self.world_transform()
+        if ancestor is self:
+            return np.eye(3), np.zeros(3)
+        R_anc, t_anc = ancestor.world_transform()
+        return R_anc.T @ R_frame, R_anc.T @ (t_frame - t_anc)
+
+    @staticmethod
+    def relative_transform(from_frame: 'ReferenceFrame', to_frame: 'ReferenceFrame') -> Tuple[np.ndarray, np.ndarray]:
+        """from_frame 到 to_frame 的变换 (R, t)，经由两者的最近公共祖先合成"""
+        lca = ReferenceFrame.lowest_common_ancestor(from_frame, to_frame)
+        if lca is None:
+            raise ValueError(f"坐标系 {from_frame.name} 与 {to_frame.name} 不在同一棵坐标系树上")
+        R_from, t_from = from_frame.transform_to_ancestor(lca)
+        if to_frame is lca:
+            return R_from, t_from
+        R_to, t_to = to_frame.transform_to_ancestor(lca)
+        return R_to.T @ R_from, R_to.T @ (t_from - t_to)
+
+    @staticmethod
+    def transform_points(points: np.ndarray, from_frame: 'ReferenceFrame', to_frame: 'ReferenceFrame') -> np.ndarray:
+        """
+        批量变换点坐标
+        :param points: (3,) 或 (N, 3)，在 from_frame 中表示
+        :return: 在 to_frame 中表示的点，整批只做一次矩阵乘法
+        """
+        R, t = ReferenceFrame.relative_transform(from_frame, to_frame)
+        return np.asarray(points, dtype=np.float64) @ R.T + t
+
+    def __repr__(self):
+        parent = self._parent.name if self._parent is not None else None
+        return f"ReferenceFrame({self.name!r}, parent={parent!r})"
+
+
+def _frozen(array) -> np.ndarray:
+    """复制为只读 float64 数组，防止绕过失效标记原地修改"""
+    array = np.array(array, dtype=np.float64)
+    array.flags.writeable = False
+    return array
@@ -4,20 +4,147 @@ from scipy.integrate import simpson
 from sympy import symbols, Function, diff
 
 
+# numpy 2.0 起 np.trapz 更名为 np.trapezoid
+_trapezoid = getattr(np, 'trapezoid', None) or np.trapz
+
+# Gauss-Kronrod G7-K15 节点与权重（取自 QUADPACK qk15），按 [-1, 1] 上的 15 个节点展开
+_XGK = np.array([0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+                 0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+                 0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+                 0.207784955007898467600689403773245])
+_WGK = np.array([0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+                 0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+                 0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+                 0.204432940075298892414161999234649])
+_WGK_CENTER = 0.209482141084727828012999174891714
+_WG = np.array([0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+                0.381830050505118944950369775488975])
+_WG_CENTER = 0.417959183673469387755102040816327
+_GK_NODES = np.concatenate([-_XGK, [0.0], _XGK[::-1]])
+_GK_WEIGHTS = np.concatenate([_WGK, [_WGK_CENTER], _WGK[::-1]])
+_G_WEIGHTS = np.zeros(15)
+_G_WEIGHTS[[1, 3, 5]] = _WG
+_G_WEIGHTS[7] = _WG_CENTER
+_G_WEIGHTS[[13, 11, 9]] = _WG
+
+
+def _evaluate(f, x: np.ndarray) -> np.ndarray:
+    """调用被积函数，标量结果广播到 x 的形状"""
+    y = np.asarray(f(x), dtype=np.float64)
+    return np.broadcast_to(y, x.shape) if y.ndim == 0 else y
+
+
+def _gauss_kronrod(f, a: float, b: float, atol: float, rtol: float, max_intervals: int):
+    """
+    向量化自适应 Gauss-Kronrod 积分
+    每轮把所有待细分子区间的节点合并为一次 f 调用；局部误差达标的子区间退出，其余二分
+    """
+    lo = np.array([a], dtype=np.float64)
+    hi = np.array([b], dtype=np.float64)
+    done_value = done_error = 0.0
+    n_eval = 0
+    length = abs(b - a) if b != a else 1.0
+    while True:
+        center = 0.5 * (lo + hi)
+        half = 0.5 * (hi - lo)
+        x = center[:, None] + half[:, None] * _GK_NODES
+        y = _evaluate(f, x.ravel())
+        n_eval += x.size
+        y = y.reshape(y.shape[:-1] + x.shape)  # (..., m, 15)
+        kronrod = half * (y @ _GK_WEIGHTS)
+        error = np.abs(kronrod - half * (y @ _G_WEIGHTS))
+
+        value = done_value + kronrod.sum(axis=-1)
+        total_error = done_error + error.sum(axis=-1)
+        tol = np.maximum(atol, rtol * np.abs(value))
+        if np.all(total_error <= tol) or lo.size >= max_intervals:
+            return value, total_error, n_eval
+
+        # 误差按区间长度分配：满足 error <= tol * 区间占比 的子区间视为收敛
+        share = np.abs(2 * half) / length
+        accept = np.all(error <= np.asarray(tol)[..., None] * share, axis=tuple(range(error.ndim - 1)))
+        done_value = done_value + kronrod[..., accept].sum(axis=-1)
+        done_error = done_error + error[..., accept].sum(axis=-1)
+        refine = ~accept
+        lo = np.concatenate([lo[refine], center[refine]])
+        hi = np.concatenate([center[refine], hi[refine]])
+
+
+def _tanh_sinh(f, a: float, b: float, atol: float, rtol: float, max_level: int = 12, t_max: float = 3.5,
+               min_level: int = 3):
+    """
+    tanh-sinh（双指数）积分：x = c + r·tanh(π/2·sinh t)
+    每层步长减半只新增奇数点，用相邻两层结果之差估计误差；节点到端点的距离直接计算以免相消。
+    至少细分到 min_level 层才检验收敛，以免粗层节点同时错过尖峰而误判
+    """
+    if a > b:
+        value, error, n_eval = _tanh_sinh(f, b, a, atol, rtol, max_level, t_max, min_level)
+        return -value, error, n_eval
+    r = 0.5 * (b - a)
+    h = 1.0
+    value = None
+    n_eval = 0
+    total = 0.0
+    for level in range(max_level + 1):
+        if level == 0:
+            t = np.arange(0.0, t_max + h, h)
+        else:
+            t = np.arange(h, t_max + h, 2 * h)  # 仅新增的奇数点
+        u = 0.5 * np.pi * np.sinh(t)
+        dist = 2 * r / (1 + np.exp(2 * u))       # 节点到最近端点的距离
+        weight = 0.5 * np.pi * np.cosh(t) / np.cosh(u) ** 2 * r
+        keep = (dist != 0) & (weight > 0)
+        dist, weight, t = dist[keep], weight[keep], t[keep]
+        x = np.concatenate([a + dist, b - dist[t > 0]])
+        w = np.concatenate([weight, weight[t > 0]])
+        y = _evaluate(f, x)
+        n_eval += x.size
+        total = total + y @ w
+        previous = value
+        value = h * total
+        if previous is not None:
+            error = np.abs(value - previous)
+            if level >= min_level and np.all(error <= np.maximum(atol, rtol * np.abs(value))):
+                return value, error, n_eval
+        h /= 2
+    return value, error, n_eval
+
+
 class MathUtils:
     """通用数学工具集合"""
 
     @staticmethod
-    def numerical_integrate(f, a: float, b: float, n: int = 1000, method: str = 'trapezoid') -> float:
-        """数值积分工具"""
-        x = np.linspace(a, b, n)
-        y = f(x)
-        if method == 'trapezoid':
-            return np.trapz(y, x)
-        elif method == 'simpson':
-            return simpson(y, x)
+    def numerical_integrate(f, a: float, b: float, n: int = 1000, method: str = 'trapezoid',
+                            atol: float = 1e-10, rtol: float = 1e-10, max_intervals: int = 10000,
+                            full_output: bool = False):
+        """
+        数值积分工具
+        f 需支持数组输入：对 (n,) 的 x 返回 (n,)，或返回 (K, n) 以一次性批量积分 K 个被积函数（如 K 组参数）
+        :param method: 'trapezoid' / 'simpson'（固定 n 点网格），
+                       'gauss_kronrod'（自适应 G7-K15）/ 'tanh_sinh'（双指数变换，适合端点奇异）
+        :param atol, rtol: 自适应方法的误差控制
+        :param max_intervals: 自适应 Gauss-Kronrod 的最大子区间数
+        :param full_output: 为 True 时返回 {'value', 'error', 'n_eval'}
+        :return: 积分值（批量时为 (K,) 数组）
+        """
+        if method in ('trapezoid', 'simpson'):
+            x = np.linspace(a, b, n)
+            y = _evaluate(f, x)
+            rule = _trapezoid if method == 'trapezoid' else (lambda y_, x_: simpson(y_, x=x_))
+            value = rule(y, x)
+            # 误差估计：与隔点抽样（半分辨率，保留右端点）结果之差
+            coarse = np.unique(np.r_[0:n:2, n - 1])
+            error = np.abs(value - rule(y[..., coarse], x[coarse])) if n >= 5 else np.full_like(value, np.nan)
+            n_eval = n
+        elif method == 'gauss_kronrod':
+            value, error, n_eval = _gauss_kronrod(f, a, b, atol, rtol, max_intervals)
+        elif method == 'tanh_sinh':
+            value, error, n_eval = _tanh_sinh(f, a, b, atol, rtol)
         else:
             raise ValueError("Unsupported integration method")
+        if full_output:
+            return {'value': value, 'error': error, 'n_eval': n_eval}
+        return value
 
     @staticmethod
     def solve_linear_system(A: np.ndarray, b: np.ndarray) -> np.ndarray:
@@ -25,13 +152,115 @@ class MathUtils:
         return np.linalg.solve(A, b)
 
     @staticmethod
-    def rk4_step(f, t: float, y: np.ndarray, dt: float) -> np.ndarray:
-        """四阶龙格-库塔法单步计算"""
-        k1 = f(t, y)
-        k2 = f(t + dt / 2, y + dt * k1 / 2)
-        k3 = f(t + dt / 2, y + dt * k2 / 2)
-        k4 = f(t + dt, y + dt * k3)
-        return y + dt * (k1 + 2 * k2 + 2 * k3 + k4) / 6
+    def rk4_step(f, t: float, y: np.ndarray, dt: float, mask: np.ndarray = None,
+                 workspace: 'RK4Workspace' = None, out: np.ndarray = None,
+                 inplace_rhs: bool = False) -> np.ndarray:
+        """
+        四阶龙格-库塔法单步计算
+        y 可为单个状态 (n,)，也可为系综状态 (M, n)：此时 f(t, Y) 须按行向量化，M 个成员同步推进
+        :param mask: (M,) 布尔数组，仅推进为 True 的成员，其余成员保持不变且不参与 f 的计算
+        :param workspace: 预分配的阶段缓冲区，跨步复用以避免每步分配临时数组
+        :param out: 结果写入的数组（可与 y 相同以原地更新）
+        :param inplace_rhs: 右端函数是否为 f(t, y, out) 形式（仅在未提供 workspace 时使用）
+        """
+        if workspace is None:
+            workspace = RK4Workspace(y.shape, inplace_rhs)
+        if mask is None:
+            return workspace.step(f, t, y, dt, out=out)
+
+        result = y.copy() if out is None else out
+        if out is not None and out is not y:
+            result[...] = y
+        idx = np.flatnonzero(mask)
+        if idx.size:
+            result[idx] = workspace.step(f, t, y[idx], dt)
+        return result
+
+
+class RK4Workspace:
+    """
+    RK4 阶段缓冲区
+    按最大状态形状预分配，系综掩码压缩后的子集复用前若干行；
+    inplace_rhs=True 时右端函数形如 f(t, y, out)，斜率也写入预分配缓冲区，整步不分配新数组
+    """
+
+    def __init__(self, shape, inplace_rhs: bool = False):
+        self.stage = np.empty(shape)  # 各阶段的试探状态
+        self.acc = np.empty(shape)  # k1 + 2k2 + 2k3 + k4 累加量
+        self.k = np.empty(shape) if inplace_rhs else None  # 原地右端函数的斜率输出
+
+    def _views(self, y: np.ndarray):
+        if y.ndim > 1 and y.shape[0] != self.stage.shape[0]:
+            m = y.shape[0]
+            return self.stage[:m], self.acc[:m], None if self.k is None else self.k[:m]
+        return self.stage, self.acc, self.k
+
+    def step(self, f, t: float, y: np.ndarray, dt: float, out: np.ndarray = None) -> np.ndarray:
+        stage, acc, k_buf = self._views(y)
+        if k_buf is None:
+            rhs = f
+        else:
+            def rhs(t_, y_):
+                f(t_, y_, k_buf)
+                return k_buf
+
+        k = rhs(t, y)
+        np.copyto(acc, k)
+        np.multiply(k, dt / 2, out=stage)
+        stage += y
+        k = rhs(t + dt / 2, stage)
+        acc += k
+        acc += k
+        np.multiply(k, dt / 2, out=stage)
+        stage += y
+        k = rhs(t + dt / 2, stage)
+        acc += k
+        acc += k
+        np.multiply(k, dt, out=stage)
+        stage += y
+        acc += rhs(t + dt, stage)
+
+        acc *= dt / 6
+        if out is None:
+            return y + acc
+        np.add(y, acc, out=out)
+        return out
+
+    def derivative(self, f, t: float, y: np.ndarray) -> np.ndarray:
+        """单独求斜率（供事件定位的插值使用），不占用阶段缓冲区"""
+        if self.k is None:
+            return np.asarray(f(t, y), dtype=np.float64)
+        out = np.empty_like(y)
+        f(t, y, out)
+        return out
+
+
+class EulerWorkspace:
+    """显式欧拉法缓冲区，接口同 RK4Workspace"""
+
+    def __init__(self, shape, inplace_rhs: bool = False):
+        self.k = np.empty(shape)
+        self.inplace_rhs = inplace_rhs
+
+    def step(self, f, t: float, y: np.ndarray, dt: float, out: np.ndarray = None) -> np.ndarray:
+        k = self.k[:y.shape[0]] if y.ndim > 1 else self.k
+        if self.inplace_rhs:
+            f(t, y, k)
+        else:
+            np.copyto(k, f(t, y))
+        k *= dt
+        if out is None:
+            return y + k
+        np.add(y, k, out=out)
+        return out
+
+    def derivative(self, f, t: float, y: np.ndarray) -> np.ndarray:
+        """单独求斜率，约定同 RK4Workspace.derivative"""
+        if not self.inplace_rhs:
+            return np.asarray(f(t, y), dtype=np.float64)
+        out = np.empty_like(y)
+        f(t, y, out)
+        return out
 
 
 class SymbolicTools:
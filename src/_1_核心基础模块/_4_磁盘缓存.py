@@ -0,0 +1,165 @@
+"""
+磁盘缓存
+内容寻址、按容量 LRU 淘汰的持久化缓存，用于保存符号推导结果与生成的代码，
+多个进程可共享同一缓存目录
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+import sympy
+
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+_MISSING = object()
+
+
+def default_cache_dir() -> Path:
+    """默认缓存目录：环境变量 THEORETICAL_MECHANICS_CACHE，否则为 ~/.cache/theoretical_mechanics_py"""
+    env = os.environ.get('THEORETICAL_MECHANICS_CACHE')
+    if env:
+        return Path(env)
+    return Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'theoretical_mechanics_py'
+
+
+class DiskCache:
+    """
+    内容寻址磁盘缓存
+    键由命名空间与内容描述（符号表达式取 srepr）的 SHA-256 组成，值以 pickle 存为单独文件；
+    写入先写临时文件再原子替换，读命中时刷新修改时间，超出容量时按修改时间淘汰最久未用的条目
+    """
+
+    def __init__(self, directory=None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        :param directory: 缓存目录，默认见 default_cache_dir
+        :param max_bytes: 缓存总容量上限（字节）
+        """
+        self.directory = Path(directory) if directory is not None else default_cache_dir()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(namespace: str, *parts) -> str:
+        """
+        由内容计算缓存键；缓存格式版本与 SymPy 版本参与哈希，升级后旧条目自然失效
+        :param namespace: 条目类别（如 'eom'、'hamiltonian'、'compiled'），可按类别清除
+        :param parts: 描述内容的对象；SymPy 对象取 srepr，其余取 repr
+        """
+        digest = hashlib.sha256()
+        digest.update(f'{CACHE_VERSION}|{sympy.__version__}'.encode())
+        for part in parts:
+            text = sympy.srepr(part) if isinstance(part, (sympy.Basic, list, tuple)) else repr(part)
+            digest.update(b'|' + text.encode())
+        return f'{namespace}-{digest.hexdigest()}'
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f'{key}.pkl'
+
+    def get(self, key: str, default=None):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as fh:
+                value = pickle.load(fh)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return default
+        try:
+            os.utime(path)  # 刷新最近使用时间
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._evict()
+
+    def get_or_compute(self, key: str, compute):
+        """命中则直接返回，否则调用 compute() 并写入缓存"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def invalidate(self, key: str = None, namespace: str = None) -> int:
+        """
+        删除条目：指定 key 时删除单个条目，指定 namespace 时删除该类别全部条目，都不指定则清空
+        :return: 删除的条目数
+        """
+        if key is not None:
+            paths = [self._path(key)]
+        else:
+            paths = self._entries(namespace)
+        removed = 0
+        for path in paths:
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def clear(self) -> int:
+        return self.invalidate()
+
+    def _entries(self, namespace: str = None):
+        pattern = f'{namespace}-*.pkl' if namespace else '*.pkl'
+        return list(self.directory.glob(pattern))
+
+    def size(self) -> int:
+        """缓存当前占用的字节数"""
+        total = 0
+        for path in self._entries():
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+
+    def _evict(self):
+        """按最近使用时间淘汰条目，直至总大小不超过容量上限"""
+        entries = []
+        for path in self._entries():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+def resolve_cache(cache):
+    """将 cache 参数整理为 DiskCache：None / False 不缓存，True 使用默认目录，字符串或路径为缓存目录"""
+    if cache is None or cache is False:
+        return None
+    if cache is True:
+        return DiskCache()
+    if isinstance(cache, DiskCache):
+        return cache
+    return DiskCache(cache)
@@ -1,7 +1,10 @@
 """
 桁架结构分析模块
 包含节点法和截面法实现
-支持二维平面桁架
+支持二维平面桁架与三维空间桁架
 """
 from .truss_model import TrussModel, Node, Member  # 导出 Node 和 Member
-from .solver import solve_truss
\ No newline at end of file
+from .solver import solve_truss, TrussSolver
+from .diagnostics import TrussDiagnostics
+from .reanalysis import IncrementalTrussSolver
+from .storage import save_truss, load_truss, read_json, read_csv
@@ -0,0 +1,70 @@
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from scipy.sparse.linalg import LinearOperator, onenormest
+
+
+class TrussDiagnostics:
+    """
+    桁架求解诊断信息（按需启用）
+    将实例传给 TrussSolver / solve_truss 后记录各阶段耗时（assembly、elimination、
+    factorization、solve、recovery，秒）、矩阵规模与非零元数、条件数估计和残差范数；
+    不传时求解流程不做任何额外计算
+    """
+
+    def __init__(self, condition: bool = True, residual: bool = True):
+        """
+        :param condition: 是否估计 K_free 的 1-范数条件数（需额外若干次回代）
+        :param residual: 是否计算相对残差 ‖K u - F‖ / ‖F‖（需一次稀疏矩阵乘）
+        """
+        self.condition = condition
+        self.residual = residual
+        self.timings = {}
+        self.n_dof = None
+        self.n_free = None
+        self.nnz = None
+        self.condition_estimate = None
+        self.residual_norm = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """计时上下文；同名阶段多次进入时累加耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def record_matrix(self, n_dof: int, K_free, factor=None):
+        """记录矩阵规模；启用 condition 时用分解结果估计 ‖K‖₁·‖K⁻¹‖₁"""
+        self.n_dof = n_dof
+        self.n_free = K_free.shape[0]
+        self.nnz = K_free.nnz
+        if self.condition and factor is not None and self.n_free:
+            inverse = LinearOperator(K_free.shape, matvec=factor.solve,
+                                     rmatvec=lambda x: factor.solve(x, trans='T'), dtype=np.float64)
+            self.condition_estimate = onenormest(K_free) * onenormest(inverse)
+
+    def record_residual(self, K_free, U_free, F_free):
+        """记录相对残差，多工况时取各工况最大值"""
+        if not self.residual:
+            return
+        R = K_free @ U_free - F_free
+        scale = np.linalg.norm(F_free, axis=0)
+        norms = np.linalg.norm(R, axis=0) / np.where(scale > 0, scale, 1.0)
+        self.residual_norm = float(np.max(norms)) if np.size(norms) else 0.0
+
+    def as_dict(self) -> dict:
+        return {'timings': dict(self.timings), 'n_dof': self.n_dof, 'n_free': self.n_free,
+                'nnz': self.nnz, 'condition_estimate': self.condition_estimate,
+                'residual_norm': self.residual_norm}
+
+    def __str__(self):
+        lines = [f"自由度: {self.n_free} / {self.n_dof}，K_free 非零元: {self.nnz}"]
+        if self.condition_estimate is not None:
+            lines.append(f"条件数估计: {self.condition_estimate:.3e}")
+        if self.residual_norm is not None:
+            lines.append(f"相对残差: {self.residual_norm:.3e}")
+        lines += [f"{name}: {seconds * 1e3:.3f} ms" for name, seconds in self.timings.items()]
+        return '\n'.join(lines)
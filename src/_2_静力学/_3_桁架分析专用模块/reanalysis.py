@@ -0,0 +1,200 @@
+"""
+桁架增量重分析
+修改或删除少量杆件后，以低秩修正复用已有的刚度矩阵分解，无需重新组装与分解
+"""
+from src._2_静力学._3_桁架分析专用模块.truss_model import TrussModel
+from src._2_静力学._3_桁架分析专用模块.diagnostics import TrussDiagnostics
+from src._2_静力学._3_桁架分析专用模块.solver import TrussSolver, factorize_stiffness, member_dofs, member_geometry
+
+import numpy as np
+from scipy.linalg import lu_factor, lu_solve
+from scipy.sparse import coo_matrix
+
+PIVOT_TOL = 1e-12  # 对称正定分解中最小主元与最大主元之比低于此值视为奇异
+
+
+class IncrementalTrussSolver(TrussSolver):
+    """
+    增量重分析求解器
+    修改杆件 E、A 或删除杆件后不重新组装与分解：r 根杆件的刚度变化为低秩修正 ΔK = G D Gᵀ，
+    由 Sherman–Morrison–Woodbury 公式
+        (K₀ + G D Gᵀ)⁻¹ F = u₀ - Z (D⁻¹ + Gᵀ Z)⁻¹ Gᵀ u₀,  u₀ = K₀⁻¹ F,  Z = K₀⁻¹ G
+    每次求解只需一次前代回代与 r × r 的小矩阵运算；Z 的每一列在杆件首次被修改时求一次并缓存。
+    修正秩超过 max_rank 或电容矩阵 D⁻¹ + Gᵀ Z 病态（结构接近机构）时，把修改并入 K₀ 重新分解；
+    若修改确使结构成为机构则撤销该修改并抛出 ValueError
+    """
+
+    def __init__(self, model: TrussModel, diagnostics: TrussDiagnostics = None,
+                 max_rank: int = 32, rcond: float = 1e-10):
+        """
+        :param max_rank: 低秩修正的最大秩，超过后重新分解
+        :param rcond: 电容矩阵（按 |D| 归一化后）倒条件数下限，低于此值视为接近机构
+        """
+        super().__init__(model, diagnostics)
+        self.max_rank = max_rank
+        self.rcond = rcond
+        self.E = model.E.astype(np.float64)
+        self.A = model.A.astype(np.float64)
+        self.active = np.ones(len(self.member_ids), dtype=bool)
+        self._original = (self.E.copy(), self.A.copy())
+        self._base_EA = self.EA.copy()
+        self.L, e = member_geometry(self.coords, self.connectivity)
+
+        # 各杆件的 g = [-e, e] 在自由自由度上的位置与取值，约束自由度处取值为零
+        position = np.full(self.ndof, -1)
+        position[self.free_dof] = np.arange(self.free_dof.size)
+        position = position[member_dofs(self.connectivity, self.dim)]
+        self._g_value = np.where(position >= 0, np.concatenate([-e, e], axis=1), 0.0)
+        self._g_position = np.maximum(position, 0)
+
+        self._columns = {}  # 当前被修改杆件的下标 → K₀⁻¹ g
+        self._modified = np.zeros(0, dtype=np.int64)
+        self._update = None  # (Z, 电容矩阵 LU 分解, 杆件下标)
+        self._default_u0 = None
+        self.refactorizations = 0
+
+    @property
+    def rank(self) -> int:
+        """当前低秩修正的秩（被修改且尚未并入分解的杆件数）"""
+        return self._modified.size
+
+    # ---- 修改 ----
+    def modify(self, member_ids, E=None, A=None):
+        """
+        修改杆件弹性模量和/或截面积
+        :param member_ids: 杆件 id（单个或序列）
+        :param E: 新弹性模量，标量或与 member_ids 等长
+        :param A: 新截面积，标量或与 member_ids 等长
+        """
+        index = self.member_index.lookup(np.reshape(member_ids, -1))
+        E_new = self.E.copy()
+        A_new = self.A.copy()
+        if E is not None:
+            E_new[index] = E
+        if A is not None:
+            A_new[index] = A
+        self._apply(E_new, A_new, self.active)
+
+    def remove(self, member_ids):
+        """删除杆件（刚度置零，内力为零）"""
+        active = self.active.copy()
+        active[self.member_index.lookup(np.reshape(member_ids, -1))] = False
+        self._apply(self.E, self.A, active)
+
+    def restore(self, member_ids=None):
+        """恢复杆件（默认全部）为模型中的原始 E、A 并重新加入结构"""
+        index = np.arange(len(self.member_ids)) if member_ids is None \
+            else self.member_index.lookup(np.reshape(member_ids, -1))
+        E_new, A_new, active = self.E.copy(), self.A.copy(), self.active.copy()
+        E_new[index] = self._original[0][index]
+        A_new[index] = self._original[1][index]
+        active[index] = True
+        self._apply(E_new, A_new, active)
+
+    def _apply(self, E, A, active):
+        """应用新的杆件参数；结构成为机构时撤销并抛出 ValueError"""
+        previous = (self.E, self.A, self.active, self.EA)
+        self.E, self.A, self.active = E, A, active
+        self.EA = np.where(active, E * A, 0.0)
+        try:
+            self._rebuild_update()
+        except ValueError:
+            self.E, self.A, self.active, self.EA = previous
+            self._rebuild_update()
+            raise
+
+    def _rebuild_update(self):
+        modified = np.flatnonzero(self.EA != self._base_EA)
+        self._modified = modified
+        self._update = None
+        # 只保留仍被修改杆件的列，逐杆件试算的大量工况下缓存不随历史增长
+        self._columns = {k: self._columns[k] for k in modified.tolist() if k in self._columns}
+        if modified.size == 0:
+            return
+        if modified.size > self.max_rank:
+            self.refactorize()
+            return
+
+        for k in modified.tolist():
+            if k not in self._columns:
+                g = np.zeros(self.free_dof.size)
+                np.add.at(g, self._g_position[k], self._g_value[k])
+                self._columns[k] = self.factor.solve(g)
+        Z = np.column_stack([self._columns[k] for k in modified.tolist()])
+        d = (self.EA[modified] - self._base_EA[modified]) / self.L[modified]
+
+        # 电容矩阵 C = D⁻¹ + Gᵀ Z；以 S = |D|^½ 归一化为 sign(D) + S Gᵀ Z S 后判断是否病态
+        GtZ = self._g_transpose(Z, modified)
+        scale = np.sqrt(np.abs(d))
+        scaled = np.diag(np.sign(d)) + scale[:, None] * GtZ * scale[None, :]
+        if 1.0 / np.linalg.cond(scaled) < self.rcond:
+            self.refactorize()
+            return
+        self._update = (Z, lu_factor(np.diag(1.0 / d) + GtZ), modified)
+
+    def _g_transpose(self, X: np.ndarray, members: np.ndarray) -> np.ndarray:
+        """Gᵀ X，G 的列为给定杆件的 g（X 形状 (nfree, k)）"""
+        return np.einsum('ri,rik->rk', self._g_value[members], X[self._g_position[members]])
+
+    def _current_stiffness(self):
+        """当前杆件参数下的 K_free（K₀ 加上由被修改杆件低秩项稀疏构造的 ΔK）"""
+        modified = np.flatnonzero(self.EA != self._base_EA)
+        if modified.size == 0:
+            return self.K_free
+        d = (self.EA[modified] - self._base_EA[modified]) / self.L[modified]
+        size = self._g_value.shape[1]
+        values = d[:, None, None] * self._g_value[modified][:, :, None] * self._g_value[modified][:, None, :]
+        rows = np.repeat(self._g_position[modified], size, axis=1)
+        cols = np.tile(self._g_position[modified], (1, size))
+        n = self.free_dof.size
+        return (self.K_free + coo_matrix((values.ravel(), (rows.ravel(), cols.ravel())), shape=(n, n))).tocsr()
+
+    def refactorize(self):
+        """
+        把当前修改并入 K₀ 并重新分解（无需重新组装：ΔK 由被修改杆件的低秩项稀疏构造）
+        重新分解失败（矩阵奇异）说明结构已成为机构，抛出 ValueError
+        """
+        K_free = self._current_stiffness()
+        with self._phase('factorization'):
+            try:
+                factor = factorize_stiffness(K_free)
+            except RuntimeError as error:
+                raise ValueError(f"杆件修改后结构成为机构: {error}") from None
+        # 舍入误差使机构的零主元不严格为零，故按主元相对大小判断
+        pivots = np.abs(factor.U.diagonal())
+        if pivots.size and pivots.min() <= PIVOT_TOL * pivots.max():
+            raise ValueError("杆件修改后结构成为机构")
+
+        self.K_free = K_free
+        self.factor = factor
+        self._base_EA = self.EA.copy()
+        self._columns = {}
+        self._modified = np.zeros(0, dtype=np.int64)
+        self._update = None
+        self._default_u0 = None
+        self.refactorizations += 1
+
+    # ---- 求解 ----
+    def displacements(self, F) -> np.ndarray:
+        """
+        求当前杆件参数下的节点位移（低秩修正），约束自由度处为零
+        :param F: 全局荷载 (ndof,) 或 (ndof, ncases)
+        """
+        F = np.asarray(F, dtype=np.float64)
+        U = np.zeros(F.shape)
+        with self._phase('solve'):
+            if F is self.loads:
+                if self._default_u0 is None:
+                    self._default_u0 = self.factor.solve(np.ascontiguousarray(F[self.free_dof]))
+                u = self._default_u0.copy()
+            else:
+                u = self.factor.solve(np.ascontiguousarray(F[self.free_dof]))
+            if self._update is not None:
+                Z, capacitance, members = self._update
+                u0 = u.reshape(u.shape[0], -1)
+                y = lu_solve(capacitance, self._g_transpose(u0, members))
+                u = (u0 - Z @ y).reshape(u.shape)
+            U[self.free_dof] = u
+        if self.diagnostics is not None:
+            self.diagnostics.record_residual(self._current_stiffness(), u, F[self.free_dof])
+        return U
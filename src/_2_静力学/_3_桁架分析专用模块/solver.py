@@ -1,81 +1,222 @@
-from src._2_静力学._3_桁架分析专用模块.truss_model import TrussModel
+from src._2_静力学._3_桁架分析专用模块.truss_model import IndexMap, TrussModel
+from src._2_静力学._3_桁架分析专用模块.diagnostics import TrussDiagnostics
+
+from contextlib import nullcontext
 
 import numpy as np
-from scipy.sparse import coo_matrix, csr_matrix
-from scipy.sparse.linalg import spsolve
+from scipy.sparse import coo_matrix
+from scipy.sparse.linalg import splu
+
+
+def model_arrays(model: TrussModel) -> dict:
+    """
+    取出桁架模型的列数组（节点按行下标编号，节点 id 不必连续）
+    :return: {'coords': (n, dim), 'connectivity': (m, 2) 节点下标, 'EA': (m,),
+              'member_ids', 'constrained': (dim·n,) 布尔约束掩码, 'F': (dim·n,) 荷载向量}
+    """
+    return {'coords': model.coords.copy(), 'connectivity': model.connectivity.copy(),
+            'EA': model.E * model.A, 'member_ids': model.member_ids.copy(),
+            'constrained': model.constrained_mask(), 'F': model.load_array.ravel().copy()}
+
+
+def member_geometry(coords: np.ndarray, connectivity: np.ndarray):
+    """
+    向量化计算杆件长度与方向余弦
+    :return: (L, e)，L 形状 (m,)，e 为单位方向向量 (m, dim)
+    """
+    d = coords[connectivity[:, 1]] - coords[connectivity[:, 0]]
+    L = np.sqrt(np.einsum('ij,ij->i', d, d))
+    return L, d / L[:, None]
+
+
+def member_dofs(connectivity: np.ndarray, dim: int) -> np.ndarray:
+    """杆件两端节点的全局自由度编号 (m, 2*dim)，顺序为 [起点各轴, 终点各轴]"""
+    axes = np.arange(dim)
+    return (dim * connectivity[:, :, None] + axes).reshape(len(connectivity), 2 * dim)
+
+
+def assemble_stiffness(coords: np.ndarray, connectivity: np.ndarray, EA: np.ndarray):
+    """
+    以 COO 三元组一次性组装全局刚度矩阵
+    单元刚度 k = EA/L · g gᵀ，g = [-e, e]；重复的 (行, 列) 在转换为 CSR 时自动求和
+    :return: CSR 格式的全局刚度矩阵 (dim·n, dim·n)
+    """
+    n, dim = coords.shape
+    L, e = member_geometry(coords, connectivity)
+    g = np.concatenate([-e, e], axis=1)
+    values = (EA / L)[:, None, None] * g[:, :, None] * g[:, None, :]
+    dofs = member_dofs(connectivity, dim)
+    size = 2 * dim
+    rows = np.repeat(dofs, size, axis=1)
+    cols = np.tile(dofs, (1, size))
+    return coo_matrix((values.ravel(), (rows.ravel(), cols.ravel())),
+                      shape=(dim * n, dim * n)).tocsr()
+
+
+def member_forces(coords: np.ndarray, connectivity: np.ndarray, EA: np.ndarray, U: np.ndarray) -> np.ndarray:
+    """
+    由节点位移向量化计算杆件轴力（拉为正）
+    :param U: 全局位移 (dim·n,)，或多工况 (dim·n, ncases)
+    :return: (m,) 或 (m, ncases)
+    """
+    n, dim = coords.shape
+    L, e = member_geometry(coords, connectivity)
+    disp = U.reshape((n, dim) + U.shape[1:])
+    du = disp[connectivity[:, 1]] - disp[connectivity[:, 0]]
+    axial = np.einsum('mi...,mi->m...', du, e)
+    return (EA / L).reshape((-1,) + (1,) * (U.ndim - 1)) * axial
+
+
+def factorize_stiffness(K_free):
+    """
+    稀疏 LU 分解约束后的刚度矩阵
+    K_free 对称正定，按 AᵀA 结构取最小度排序并关闭主元选取，填充远少于默认的列排序
+    :return: SuperLU 对象，其 solve 方法可重复求解不同荷载
+    """
+    return splu(K_free.tocsc(), permc_spec='MMD_AT_PLUS_A',
+                diag_pivot_thresh=0.0, options={'SymmetricMode': True})
+
+
+class TrussSolver:
+    """
+    一次组装、一次分解、多工况求解的桁架求解器
+    构造时组装并分解 K_free，之后每个工况只需一次前代回代；
+    荷载矩阵的每一列为一个工况，内力以 (杆件数, 工况数) 数组返回，行顺序同 member_ids
+    """
+
+    def __init__(self, model: TrussModel, diagnostics: TrussDiagnostics = None):
+        """
+        :param diagnostics: 可选的 TrussDiagnostics，用于记录各阶段耗时与数值诊断
+        """
+        self.diagnostics = diagnostics
+        with self._phase('assembly'):
+            data = model_arrays(model)
+            self.coords = data['coords']
+            self.connectivity = data['connectivity']
+            self.EA = data['EA']
+            self.member_ids = data['member_ids']
+            self.node_index = IndexMap(model.node_ids.copy())
+            self.member_index = IndexMap(self.member_ids)
+            self.loads = data['F']
+            self.dim = self.coords.shape[1]
+            self.ndof = self.loads.size
+            self.K = assemble_stiffness(self.coords, self.connectivity, self.EA)
+
+        with self._phase('elimination'):
+            self.constrained_dof = np.flatnonzero(data['constrained'])
+            self.free_dof = np.flatnonzero(~data['constrained'])
+            self.K_free = self.K[self.free_dof][:, self.free_dof]
+
+        with self._phase('factorization'):
+            self.factor = factorize_stiffness(self.K_free)
+        if diagnostics is not None:
+            diagnostics.record_matrix(self.ndof, self.K_free, self.factor)
+
+    def _phase(self, name: str):
+        return self.diagnostics.phase(name) if self.diagnostics is not None else nullcontext()
+
+    def load_matrix(self, cases) -> np.ndarray:
+        """
+        由荷载工况组装荷载矩阵
+        :param cases: 工况序列，每个工况为 {node_id: [Fx, Fy(, Fz)]}
+        :return: (ndof, ncases)
+        """
+        cases = list(cases)
+        F = np.zeros((self.ndof, len(cases)))
+        for k, case in enumerate(cases):
+            if case:
+                rows = self.node_index.lookup(list(case.keys()))
+                F.reshape(-1, self.dim, len(cases))[rows, :, k] += np.array(list(case.values()), dtype=np.float64)
+        return F
+
+    def displacements(self, F) -> np.ndarray:
+        """
+        求节点位移，约束自由度处为零
+        :param F: 全局荷载 (ndof,) 或 (ndof, ncases)
+        :return: 与 F 同形状
+        """
+        F = np.asarray(F, dtype=np.float64)
+        U = np.zeros(F.shape)
+        with self._phase('solve'):
+            F_free = np.ascontiguousarray(F[self.free_dof])
+            U[self.free_dof] = self.factor.solve(F_free)
+        if self.diagnostics is not None:
+            self.diagnostics.record_residual(self.K_free, U[self.free_dof], F_free)
+        return U
+
+    def solve(self, F=None) -> np.ndarray:
+        """
+        求杆件内力（拉为正）
+        :param F: 全局荷载 (ndof,) 或 (ndof, ncases)，省略时为模型自身的节点荷载
+        :return: (m,) 或 (m, ncases)
+        """
+        U = self.displacements(self.loads if F is None else F)
+        with self._phase('recovery'):
+            return member_forces(self.coords, self.connectivity, self.EA, U)
+
+    def _downward(self) -> np.ndarray:
+        """竖直向下的单位向量（平面桁架为 -y，空间桁架为 -z）"""
+        direction = np.zeros(self.dim)
+        direction[-1] = -1.0
+        return direction
+
+    def influence_line(self, nodes, direction=None) -> np.ndarray:
+        """
+        影响线：单位荷载依次作用于各节点时的杆件内力
+        :param nodes: 节点 id 序列（通常为行车道节点）
+        :param direction: 单位荷载方向，默认竖直向下
+        :return: (m, len(nodes))，第 j 列为单位荷载作用于 nodes[j] 时的内力
+        """
+        direction = self._downward() if direction is None else np.asarray(direction, dtype=np.float64)
+        F = np.zeros((self.ndof // self.dim, self.dim, len(nodes)))
+        F[self.node_index.lookup(nodes), :, np.arange(len(nodes))] = direction
+        return self.solve(F.reshape(self.ndof, len(nodes)))
+
+    def moving_load(self, path, axle_loads, axle_offsets=(0.0,), positions=None, direction=None):
+        """
+        移动荷载：一组轴重沿节点路径行进时的杆件内力
+        轴重按杠杆原理分配给所在节间的两端节点，故内力由影响线线性插值叠加而得，无需逐位置求解
+        :param path: 行车路径上的节点 id（按行进顺序），连续重复的节点（零长度节间）会被忽略
+        :param axle_loads: 各轴重（沿 direction 的大小）
+        :param axle_offsets: 各轴相对首轴的后退距离，首轴为 0
+        :param positions: 首轴沿路径的位置（弧长）；默认取任一轴恰好位于节点的全部位置，
+                          内力随位置分段线性，极值必出现在这些位置
+        :return: (positions, forces)，forces 形状 (m, len(positions))
+        """
+        axle_loads = np.asarray(axle_loads, dtype=np.float64).reshape(-1)
+        axle_offsets = np.asarray(axle_offsets, dtype=np.float64).reshape(-1)
+        path = np.asarray(path, dtype=np.int64).reshape(-1)
+        path_coords = self.coords[self.node_index.lookup(path)]
+        segment = np.linalg.norm(np.diff(path_coords, axis=0), axis=1)
+        keep = np.concatenate([[True], segment > 0])
+        path, segment = path[keep], segment[keep[1:]]
+        if path.size < 2:
+            raise ValueError("行车路径至少需要两个不重合的节点")
+        station = np.concatenate([[0.0], np.cumsum(segment)])
+        if positions is None:
+            positions = np.unique((station[:, None] + axle_offsets).ravel())
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1)
+
+        # 节点荷载分配矩阵 W (路径节点数, 位置数)
+        W = np.zeros((len(path), positions.size))
+        columns = np.arange(positions.size)
+        for load, offset in zip(axle_loads, axle_offsets):
+            s = positions - offset
+            on = (s >= station[0]) & (s <= station[-1])
+            j = np.clip(np.searchsorted(station, s, side='right') - 1, 0, len(path) - 2)
+            w = np.where(on, (s - station[j]) / (station[j + 1] - station[j]), 0.0)
+            np.add.at(W, (j[on], columns[on]), load * (1.0 - w[on]))
+            np.add.at(W, (j[on] + 1, columns[on]), load * w[on])
+
+        return positions, self.influence_line(path, direction) @ W
+
 
-def solve_truss(model: TrussModel) -> dict:
+def solve_truss(model: TrussModel, diagnostics: TrussDiagnostics = None) -> dict:
     """
-    求解桁架内力（节点法）
+    求解桁架内力（直接刚度法，稀疏组装）
+    :param diagnostics: 可选的 TrussDiagnostics，求解后其中记录各阶段耗时、矩阵规模、条件数估计与残差
     返回: {member_id: force_value}
     """
-    # 构建全局刚度矩阵
-    n_nodes = len(model.nodes)
-    total_dof = 2 * n_nodes
-    K = np.zeros((total_dof, total_dof))
-    F = np.zeros(total_dof)
-
-    # 组装荷载向量
-    for node_id, load in model.loads.items():
-        idx = 2 * node_id
-        F[idx:idx + 2] = load
-
-    # 组装刚度矩阵
-    for member in model.members.values():
-        n1 = model.nodes[member.start_node]
-        n2 = model.nodes[member.end_node]
-        L = np.hypot(n2.x - n1.x, n2.y - n1.y)
-        c = (n2.x - n1.x) / L
-        s = (n2.y - n1.y) / L
-        k_local = (member.E * member.A / L) * np.array([
-            [ c*c,  c*s, -c*c, -c*s],
-            [ c*s,  s*s, -c*s, -s*s],
-            [-c*c, -c*s,  c*c,  c*s],
-            [-c*s, -s*s,  c*s,  s*s]
-        ])
-        dof_indices = [2*n1.id, 2*n1.id+1, 2*n2.id, 2*n2.id+1]
-        for i in range(4):
-            for j in range(4):
-                K[dof_indices[i], dof_indices[j]] += k_local[i, j]
-
-    # 处理约束
-    constrained_dof = []
-    for node in model.nodes.values():
-        if node.is_supported:
-            idx = 2 * node.id
-            if node.support_type == 'pin':
-                constrained_dof.extend([idx, idx + 1])
-            elif node.support_type == 'roller':
-                constrained_dof.append(idx)  # 假设水平滚动支座
-
-    # 打印约束信息
-    print(f"约束自由度: {constrained_dof}")
-
-    # 求解方程组
-    free_dof = [i for i in range(total_dof) if i not in constrained_dof]
-    K_free = csr_matrix(K[np.ix_(free_dof, free_dof)])  # 转换为CSR格式
-    F_free = F[free_dof]
-
-    # 打印自由度信息
-    print(f"自由自由度: {free_dof}")
-    print(f"K_free: {K_free}")
-    print(f"F_free: {F_free}")
-
-    U = np.zeros(total_dof)
-    U[free_dof] = spsolve(K_free, F_free)
-
-    # 计算杆件内力
-    forces = {}
-    for member in model.members.values():
-        n1 = model.nodes[member.start_node]
-        n2 = model.nodes[member.end_node]
-        L = np.hypot(n2.x - n1.x, n2.y - n1.y)
-        c = (n2.x - n1.x) / L
-        s = (n2.y - n1.y) / L
-        u = U[2 * n1.id:2 * n1.id + 2]
-        v = U[2 * n2.id:2 * n2.id + 2]
-        delta = (v[0] - u[0]) * c + (v[1] - u[1]) * s
-        force = (member.E * member.A / L) * delta
-        forces[member.id] = force
-
-    return forces
\ No newline at end of file
+    solver = TrussSolver(model, diagnostics)
+    forces = solver.solve()
+    return dict(zip(solver.member_ids.tolist(), forces.tolist()))
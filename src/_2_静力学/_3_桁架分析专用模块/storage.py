@@ -0,0 +1,167 @@
+"""
+桁架模型与结果的文件读写
+二进制格式为未压缩的 .npz：每个数组在 zip 中连续存放，读取时可直接内存映射而不读入内存；
+另提供 JSON / CSV 文本格式的导入
+"""
+import csv
+import json
+import struct
+import zipfile
+
+import numpy as np
+
+from src._2_静力学._3_桁架分析专用模块.truss_model import TrussModel, support_code
+
+FORMAT_VERSION = 1
+MODEL_ARRAYS = ('node_ids', 'coords', 'supports', 'loads', 'loaded',
+                'member_ids', 'connectivity', 'E', 'A')
+RESULT_ARRAYS = ('load_cases', 'displacements', 'forces')
+
+
+def save_truss(path, model: TrussModel, load_cases=None, displacements=None, forces=None):
+    """
+    保存模型及（可选的）荷载工况与结果
+    :param load_cases: 荷载矩阵 (ndof, ncases)
+    :param displacements: 节点位移 (ndof,) 或 (ndof, ncases)
+    :param forces: 杆件内力 (m,) 或 (m, ncases)，行顺序同 model.member_ids
+    """
+    arrays = {'format_version': np.array(FORMAT_VERSION),
+              'node_ids': model.node_ids, 'coords': model.coords, 'supports': model.supports,
+              'loads': model.load_array, 'loaded': model.loaded,
+              'member_ids': model.member_ids, 'connectivity': model.connectivity,
+              'E': model.E, 'A': model.A}
+    for name, value in zip(RESULT_ARRAYS, (load_cases, displacements, forces)):
+        if value is not None:
+            arrays[name] = np.asarray(value, dtype=np.float64)
+    with open(path, 'wb') as fh:
+        np.savez(fh, **arrays)
+
+
+def load_truss(path, mmap: bool = True) -> dict:
+    """
+    读取 save_truss 保存的文件
+    :param mmap: 是否内存映射各数组（写时复制，修改不会写回文件），大模型与结果可即时打开并按需切片
+    :return: {'model': TrussModel, 'load_cases', 'displacements', 'forces'}，缺少的结果为 None
+    """
+    arrays = _mmap_npz(path) if mmap else None
+    if arrays is None:
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+    version = int(arrays['format_version'])
+    if version > FORMAT_VERSION:
+        raise ValueError(f"不支持的文件格式版本: {version}")
+    missing = [name for name in MODEL_ARRAYS if name not in arrays]
+    if missing:
+        raise ValueError(f"文件缺少数组: {', '.join(missing)}")
+
+    model = TrussModel.from_arrays(arrays['node_ids'], arrays['coords'], arrays['member_ids'],
+                                   arrays['connectivity'], arrays['E'], arrays['A'],
+                                   supports=arrays['supports'], loads=arrays['loads'],
+                                   loaded=arrays['loaded'])
+    result = {'model': model}
+    for name in RESULT_ARRAYS:
+        result[name] = arrays.get(name)
+    return result
+
+
+def _mmap_npz(path):
+    """
+    将未压缩 .npz 中的各数组映射为 np.memmap
+    :return: {名称: 数组}；文件含压缩成员时返回 None，由调用方整体读入
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as fh:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                return None
+            # 本地文件头 30 字节，其后为文件名与扩展字段，再之后才是 .npy 数据
+            fh.seek(info.header_offset)
+            name_length, extra_length = struct.unpack('<HH', fh.read(30)[26:30])
+            fh.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(fh)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(fh)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(fh)
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+            elif shape == ():
+                arrays[name] = np.fromfile(fh, dtype=dtype, count=1).reshape(())
+            else:
+                arrays[name] = np.memmap(path, dtype=dtype, mode='c', offset=fh.tell(),
+                                         shape=shape, order='F' if fortran else 'C')
+    return arrays
+
+
+def _support(value) -> int:
+    if value in ('', None):
+        return 0
+    if isinstance(value, int) or str(value).isdigit():
+        return int(value)
+    return support_code(value)
+
+
+def _build_model(nodes: dict, members: dict, loads: dict = None) -> TrussModel:
+    """
+    由列字典批量建模；节点含 z 列时为空间桁架
+    支座列可为类型名（'pin' / 'roller' / 空）或逐轴约束位掩码（第 k 位约束第 k 轴）
+    """
+    axes = 'xyz' if 'z' in nodes else 'xy'
+    model = TrussModel(len(axes))
+    size = len(nodes['id'])
+    supports = [_support(s) for s in _column(nodes, 'support', size, None)]
+    model.add_nodes(np.asarray(nodes['id'], dtype=np.int64),
+                    np.column_stack([np.asarray(nodes[axis], dtype=np.float64) for axis in axes]),
+                    np.asarray(supports, dtype=np.uint8))
+    size = len(members['id'])
+    model.add_members(np.asarray(members['id'], dtype=np.int64),
+                      np.asarray(members['start'], dtype=np.int64), np.asarray(members['end'], dtype=np.int64),
+                      E=np.asarray(_column(members, 'E', size, 2.1e11), dtype=np.float64),
+                      A=np.asarray(_column(members, 'A', size, 1e-4), dtype=np.float64))
+    if loads and len(loads['node']):
+        size = len(loads['node'])
+        model.apply_loads(np.asarray(loads['node'], dtype=np.int64),
+                          np.column_stack([np.asarray(_column(loads, f'f{axis}', size, 0.0), dtype=np.float64)
+                                           for axis in axes]))
+    return model
+
+
+def _columns(records) -> dict:
+    """记录列表 → 列字典；各列与记录逐条对齐，缺失的字段与空的 CSV 单元格记为 None"""
+    records = list(records)
+    keys = dict.fromkeys(key for record in records for key in record)
+    return {key: [None if record.get(key) in ('', None) else record[key] for record in records] for key in keys}
+
+
+def _column(columns: dict, name: str, size: int, default) -> list:
+    """取出可省略的列，以默认值填补缺失项"""
+    return [default if value is None else value for value in columns.get(name, [None] * size)]
+
+
+def read_json(path) -> TrussModel:
+    """
+    从 JSON 文本导入模型，格式为
+    {"nodes": [{"id", "x", "y", "z", "support"}], "members": [{"id", "start", "end", "E", "A"}],
+     "loads": [{"node", "fx", "fy", "fz"}]}
+    z（平面桁架）、support、E、A 与 loads 可省略
+    """
+    with open(path, encoding='utf-8') as fh:
+        data = json.load(fh)
+    return _build_model(_columns(data['nodes']), _columns(data['members']), _columns(data.get('loads', [])))
+
+
+def _read_csv(path) -> dict:
+    with open(path, newline='', encoding='utf-8') as fh:
+        return _columns(csv.DictReader(fh))
+
+
+def read_csv(nodes_path, members_path, loads_path=None) -> TrussModel:
+    """
+    从 CSV 文本导入模型（首行为列名）
+    :param nodes_path: 列 id, x, y[, z, support]
+    :param members_path: 列 id, start, end[, E, A]
+    :param loads_path: 列 node, fx, fy[, fz]
+    """
+    loads = _read_csv(loads_path) if loads_path is not None else None
+    return _build_model(_read_csv(nodes_path), _read_csv(members_path), loads)
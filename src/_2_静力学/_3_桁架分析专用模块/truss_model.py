@@ -1,5 +1,13 @@
 import numpy as np
-from dataclasses import dataclass
+from collections.abc import Mapping, MutableMapping
+from dataclasses import FrozenInstanceError, astuple, dataclass
+
+# 支座以逐轴约束掩码表示：第 k 位为 1 表示第 k 个平移自由度（x, y, z）被约束
+FIX_X = 0b001
+FIX_Y = 0b010
+FIX_Z = 0b100
+# 兼容的支座类型名：'pin' 约束全部平移，'roller' 为二维水平滚动支座，只约束竖向 (y) 位移
+SUPPORT_CODES = {None: 0, 'pin': FIX_X | FIX_Y | FIX_Z, 'roller': FIX_Y}
 
 
 @dataclass
@@ -9,6 +17,8 @@ class Node:
     y: float
     is_supported: bool = False
     support_type: str = None  # 'pin' 或 'roller'
+    z: float = 0.0
+    fixed: tuple = None  # 逐轴约束掩码，如 (True, True, False)；给出时优先于 support_type
 
 
 @dataclass
@@ -20,18 +30,456 @@ class Member:
     A: float = 1e-4  # 截面积 (m²)
 
 
+def support_code(support) -> int:
+    """将支座类型名（'pin' / 'roller' / None）、逐轴布尔掩码或位掩码整理为位掩码"""
+    if support is None or isinstance(support, str):
+        return SUPPORT_CODES[support]
+    if isinstance(support, (tuple, list, np.ndarray)):
+        return sum(1 << k for k, fixed in enumerate(support) if fixed)
+    return int(support)
+
+
+def node_support_code(node: Node) -> int:
+    if node.fixed is not None:
+        return support_code(node.fixed)
+    return support_code(node.support_type) if node.is_supported else 0
+
+
+def support_type(code: int, dim: int) -> str:
+    """由位掩码还原兼容的支座类型名，不对应 'pin' / 'roller' 时为 None"""
+    code &= (1 << dim) - 1
+    if code == (1 << dim) - 1:
+        return 'pin'
+    if dim == 2 and code == FIX_Y:
+        return 'roller'
+    return None
+
+
+class IndexMap(Mapping):
+    """
+    id → 行下标映射
+    id 恰为 0..n-1 时下标即 id；否则批量查询按需排序后用 searchsorted 向量化完成，
+    单个查询使用增量维护的字典，故逐个建模与批量建模都不会反复重建映射
+    """
+    SCALAR_QUERIES = 16
+
+    def __init__(self, ids=()):
+        self.ids = np.zeros(0, dtype=np.int64)
+        self._contiguous = True
+        self._dict = None
+        self._order = None
+        self.extend(np.asarray(ids, dtype=np.int64))
+
+    def extend(self, ids: np.ndarray):
+        """更新为追加后的全部 id（前段须与原 id 相同）"""
+        old, new = self.ids.size, ids[self.ids.size:]
+        if new.size == 1:
+            key = int(new[0])
+            self._contiguous = self._contiguous and key == old
+            if self._dict is not None:
+                self._dict[key] = old
+        else:
+            if self._contiguous and not np.array_equal(new, np.arange(old, ids.size)):
+                self._contiguous = False
+            if self._dict is not None:
+                self._dict.update(zip(new.tolist(), range(old, ids.size)))
+        self._order = None
+        self.ids = ids
+
+    def _locate(self, ids: np.ndarray):
+        if self._contiguous:
+            found = (ids >= 0) & (ids < self.ids.size)
+            return np.where(found, ids, 0), found
+        if self.ids.size == 0:
+            return np.zeros(ids.shape, dtype=np.int64), np.zeros(ids.shape, dtype=bool)
+        if self._order is None and ids.size <= self.SCALAR_QUERIES:
+            # 少量查询（逐个建模时）走字典，避免每次追加后重新排序
+            if self._dict is None:
+                self._dict = dict(zip(self.ids.tolist(), range(self.ids.size)))
+            index = np.array([self._dict.get(i, -1) for i in ids.ravel().tolist()], dtype=np.int64).reshape(ids.shape)
+            return np.maximum(index, 0), index >= 0
+        if self._order is None:
+            self._order = np.argsort(self.ids, kind='stable')
+        pos = np.minimum(np.searchsorted(self.ids, ids, sorter=self._order), self.ids.size - 1)
+        index = self._order[pos]
+        return index, self.ids[index] == ids
+
+    def contains(self, ids) -> np.ndarray:
+        """批量判断 id 是否存在"""
+        return self._locate(np.asarray(ids, dtype=np.int64))[1]
+
+    def lookup(self, ids) -> np.ndarray:
+        """批量查询下标，任一 id 不存在时抛出 KeyError"""
+        ids = np.asarray(ids, dtype=np.int64)
+        index, found = self._locate(ids)
+        if not np.all(found):
+            raise KeyError(ids[~found].ravel()[0].item())
+        return index
+
+    def __getitem__(self, key) -> int:
+        if self._contiguous:
+            if isinstance(key, (int, np.integer)) and 0 <= key < self.ids.size:
+                return int(key)
+            raise KeyError(key)
+        if self._order is None:
+            if self._dict is None:
+                self._dict = dict(zip(self.ids.tolist(), range(self.ids.size)))
+            return self._dict[key]
+        index, found = self._locate(np.array([key], dtype=np.int64))
+        if not found[0]:
+            raise KeyError(key)
+        return int(index[0])
+
+    def __contains__(self, key) -> bool:
+        try:
+            self[key]
+        except (KeyError, TypeError, ValueError, OverflowError):
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self.ids.tolist())
+
+    def __len__(self):
+        return self.ids.size
+
+
+class _ReadOnlyRecord:
+    """视图构造的数据类记录：修改不会写回模型，故赋值属性直接报错；与同值的原数据类相等"""
+    _frozen = False
+
+    def __setattr__(self, name, value):
+        if self._frozen:
+            raise FrozenInstanceError(f"模型视图中的记录只读，请用 TrussModel 的 add_* 方法修改: {name}")
+        super().__setattr__(name, value)
+
+    def __eq__(self, other):
+        return isinstance(other, self._record_type) and astuple(self) == astuple(other)
+
+    __hash__ = None
+
+
+class _NodeRecord(_ReadOnlyRecord, Node):
+    _record_type = Node
+
+
+class _MemberRecord(_ReadOnlyRecord, Member):
+    _record_type = Member
+
+
+class _RecordView(Mapping):
+    """以 id 为键、按需构造数据类的只读视图"""
+
+    def __init__(self, index: IndexMap, build):
+        self._index = index
+        self._build = build
+
+    def __getitem__(self, key):
+        record = self._build(self._index[key])
+        object.__setattr__(record, '_frozen', True)
+        return record
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+
+class _LoadView(MutableMapping):
+    """
+    {node_id: 荷载} 写透视图，只含已施加荷载的节点
+    赋值等同 apply_load，删除即撤去该节点荷载；取出的荷载为只读副本
+    """
+
+    def __init__(self, model: 'TrussModel'):
+        self._model = model
+
+    def __getitem__(self, key):
+        i = self._model.node_index[key]
+        if not self._model._loaded[i]:
+            raise KeyError(key)
+        load = self._model._loads[i].copy()
+        load.flags.writeable = False
+        return load
+
+    def __setitem__(self, key, load):
+        self._model.apply_load(key, load)
+
+    def __delitem__(self, key):
+        i = self._model.node_index[key]
+        if not self._model._loaded[i]:
+            raise KeyError(key)
+        self._model._loads[i] = 0.0
+        self._model._loaded[i] = False
+
+    def __iter__(self):
+        model = self._model
+        return iter(model._node_ids[np.flatnonzero(model._loaded[:model._n])].tolist())
+
+    def __len__(self):
+        return int(np.count_nonzero(self._model.loaded))
+
+
+def _reserve(array: np.ndarray, size: int) -> np.ndarray:
+    """保证数组容量不小于 size，不足时按倍增扩容（摊还 O(1) 追加）"""
+    if size <= len(array):
+        return array
+    grown = np.zeros((max(size, 2 * len(array), 16),) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
 class TrussModel:
-    def __init__(self):
-        self.nodes: dict[int, Node] = {}
-        self.members: dict[int, Member] = {}
-        self.loads: dict[int, np.ndarray] = {}  # 节点荷载
+    """
+    列式存储的桁架模型
+    节点坐标、支座约束掩码、节点荷载与杆件连接（节点行下标）、E、A 均存于定长类型数组，
+    可用 add_nodes / add_members 由数组批量建模；nodes / members 为以 id 为键的只读视图，loads 为写透视图，
+    保留原数据类接口（add_node / add_member / apply_load 仍可逐个添加，同 id 则覆盖）；
+    dim = 2 为平面桁架，dim = 3 为空间桁架（每节点 3 个平移自由度）
+    """
+
+    def __init__(self, dim: int = 2):
+        if dim not in (2, 3):
+            raise ValueError(f"桁架维数应为 2 或 3，实际为 {dim}")
+        self.dim = dim
+        self._n = 0
+        self._m = 0
+        self._node_ids = np.zeros(0, dtype=np.int64)
+        self._coords = np.zeros((0, dim))
+        self._supports = np.zeros(0, dtype=np.uint8)
+        self._loads = np.zeros((0, dim))
+        self._loaded = np.zeros(0, dtype=bool)
+        self._member_ids = np.zeros(0, dtype=np.int64)
+        self._connectivity = np.zeros((0, 2), dtype=np.int64)
+        self._E = np.zeros(0)
+        self._A = np.zeros(0)
+        self.node_index = IndexMap()
+        self.member_index = IndexMap()
+
+    @classmethod
+    def from_arrays(cls, node_ids, coords, member_ids, connectivity, E, A, supports=None,
+                    loads=None, loaded=None):
+        """
+        直接以列数组构造模型，数组不经复制即被采用（可为内存映射数组）
+        :param coords: 节点坐标 (n, dim)，维数由其列数决定
+        :param connectivity: 杆件两端节点的行下标 (m, 2)（不是节点 id）
+        :param loads: 节点荷载 (n, dim)；loaded 为已施加荷载节点的布尔标记，默认取荷载非零的节点
+        """
+        coords = np.asarray(coords, dtype=np.float64)
+        n, m = len(node_ids), len(member_ids)
+        model = cls(coords.shape[1] if coords.ndim == 2 else 2)
+        dim = model.dim
+        model._n, model._m = n, m
+        model._node_ids = np.asarray(node_ids, dtype=np.int64)
+        model._coords = coords.reshape(n, dim)
+        model._supports = np.zeros(n, dtype=np.uint8) if supports is None else np.asarray(supports, dtype=np.uint8)
+        model._loads = np.zeros((n, dim)) if loads is None else np.asarray(loads, dtype=np.float64).reshape(n, dim)
+        model._loaded = np.any(model._loads != 0, axis=1) if loaded is None else np.asarray(loaded, dtype=bool)
+        model._member_ids = np.asarray(member_ids, dtype=np.int64)
+        model._connectivity = np.asarray(connectivity, dtype=np.int64).reshape(m, 2)
+        model._E = np.broadcast_to(np.asarray(E, dtype=np.float64), (m,)).copy() if np.ndim(E) == 0 \
+            else np.asarray(E, dtype=np.float64)
+        model._A = np.broadcast_to(np.asarray(A, dtype=np.float64), (m,)).copy() if np.ndim(A) == 0 \
+            else np.asarray(A, dtype=np.float64)
+        model.node_index = IndexMap(model._node_ids)
+        model.member_index = IndexMap(model._member_ids)
+        return model
+
+    # ---- 列数组（长度为当前节点 / 杆件数的视图） ----
+    @property
+    def node_ids(self) -> np.ndarray:
+        return self._node_ids[:self._n]
+
+    @property
+    def coords(self) -> np.ndarray:
+        """节点坐标 (n, dim)"""
+        return self._coords[:self._n]
+
+    @property
+    def supports(self) -> np.ndarray:
+        """支座逐轴约束位掩码 (n,)"""
+        return self._supports[:self._n]
+
+    @property
+    def load_array(self) -> np.ndarray:
+        """节点荷载 (n, dim)，未加载节点为零"""
+        return self._loads[:self._n]
+
+    @property
+    def loaded(self) -> np.ndarray:
+        """已施加荷载节点的布尔标记 (n,)"""
+        return self._loaded[:self._n]
+
+    @property
+    def member_ids(self) -> np.ndarray:
+        return self._member_ids[:self._m]
+
+    @property
+    def connectivity(self) -> np.ndarray:
+        """杆件两端节点的行下标 (m, 2)"""
+        return self._connectivity[:self._m]
+
+    @property
+    def E(self) -> np.ndarray:
+        return self._E[:self._m]
+
+    @property
+    def A(self) -> np.ndarray:
+        return self._A[:self._m]
+
+    # ---- 自由度 ----
+    def constrained_mask(self) -> np.ndarray:
+        """被约束自由度的布尔掩码 (dim·n,)，由支座位掩码逐位展开"""
+        bits = np.arange(self.dim, dtype=np.uint8)
+        return ((self.supports[:, None] >> bits) & 1).astype(bool).ravel()
+
+    def constrained_dofs(self) -> np.ndarray:
+        return np.flatnonzero(self.constrained_mask())
+
+    def free_dofs(self) -> np.ndarray:
+        return np.flatnonzero(~self.constrained_mask())
+
+    # ---- 批量建模 ----
+    def add_nodes(self, ids, coords, supports=None):
+        """
+        批量添加节点
+        :param ids: 节点 id (k,)，不得与已有节点重复
+        :param coords: 坐标 (k, dim)
+        :param supports: 支座约束，可为位掩码 (k,)、逐轴布尔掩码 (k, dim) 或支座类型名序列；默认无支座
+        """
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        coords = np.asarray(coords, dtype=np.float64).reshape(ids.size, self.dim)
+        if supports is None:
+            codes = np.zeros(ids.size, dtype=np.uint8)
+        elif np.ndim(supports) == 2:
+            codes = (np.asarray(supports, dtype=bool) << np.arange(self.dim)).sum(axis=1).astype(np.uint8)
+        elif np.asarray(supports).dtype.kind in 'iub':
+            codes = np.asarray(supports, dtype=np.uint8).reshape(-1)
+        else:
+            codes = np.array([support_code(s) for s in supports], dtype=np.uint8)
+        if len(np.unique(ids)) != ids.size or np.any(self.node_index.contains(ids)):
+            raise ValueError("节点 id 重复")
+
+        n = self._n + ids.size
+        self._node_ids = _reserve(self._node_ids, n)
+        self._coords = _reserve(self._coords, n)
+        self._supports = _reserve(self._supports, n)
+        self._loads = _reserve(self._loads, n)
+        self._loaded = _reserve(self._loaded, n)
+        self._node_ids[self._n:n] = ids
+        self._coords[self._n:n] = coords
+        self._supports[self._n:n] = codes
+        self._n = n
+        self.node_index.extend(self.node_ids)
+
+    def add_members(self, ids, start_nodes, end_nodes, E=2.1e11, A=1e-4):
+        """
+        批量添加杆件
+        :param ids: 杆件 id (k,)，不得与已有杆件重复
+        :param start_nodes: 起点节点 id (k,)
+        :param end_nodes: 终点节点 id (k,)
+        :param E: 弹性模量，标量或 (k,)
+        :param A: 截面积，标量或 (k,)
+        """
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        connectivity = np.column_stack([self.node_index.lookup(np.reshape(start_nodes, -1)),
+                                        self.node_index.lookup(np.reshape(end_nodes, -1))])
+        if len(np.unique(ids)) != ids.size or np.any(self.member_index.contains(ids)):
+            raise ValueError("杆件 id 重复")
+
+        m = self._m + ids.size
+        self._member_ids = _reserve(self._member_ids, m)
+        self._connectivity = _reserve(self._connectivity, m)
+        self._E = _reserve(self._E, m)
+        self._A = _reserve(self._A, m)
+        self._member_ids[self._m:m] = ids
+        self._connectivity[self._m:m] = connectivity
+        self._E[self._m:m] = E
+        self._A[self._m:m] = A
+        self._m = m
+        self.member_index.extend(self.member_ids)
+
+    def apply_loads(self, node_ids, loads):
+        """批量施加节点荷载 (k, dim)，覆盖原有荷载"""
+        index = self.node_index.lookup(np.reshape(node_ids, -1))
+        self._loads[index] = np.asarray(loads, dtype=np.float64).reshape(index.size, self.dim)
+        self._loaded[index] = True
+
+    def clear_loads(self):
+        self._loads[:self._n] = 0.0
+        self._loaded[:self._n] = False
+
+    # ---- 数据类视图 ----
+    @property
+    def nodes(self) -> Mapping:
+        """{node_id: Node} 只读视图，元素按需由数组构造且属性只读（修改请用 add_node / add_nodes）"""
+        def build(i):
+            code = int(self._supports[i]) & ((1 << self.dim) - 1)
+            xyz = self._coords[i].tolist() + [0.0]
+            return _NodeRecord(int(self._node_ids[i]), xyz[0], xyz[1], code != 0, support_type(code, self.dim),
+                        xyz[2], tuple(bool(code >> k & 1) for k in range(self.dim)))
+        return _RecordView(self.node_index, build)
+
+    @property
+    def members(self) -> Mapping:
+        """{member_id: Member} 只读视图（修改请用 add_member / add_members）"""
+        def build(i):
+            start, end = self._node_ids[self._connectivity[i]]
+            return _MemberRecord(int(self._member_ids[i]), int(start), int(end), float(self._E[i]), float(self._A[i]))
+        return _RecordView(self.member_index, build)
+
+    @property
+    def loads(self) -> MutableMapping:
+        """
+        {node_id: 荷载} 写透视图，只含已施加荷载的节点
+        model.loads[nid] = load 等同 apply_load，整体赋值字典则替换全部荷载；
+        批量修改荷载请用 apply_loads / clear_loads
+        """
+        return _LoadView(self)
+
+    @loads.setter
+    def loads(self, loads: Mapping):
+        loads = dict(loads)  # 先取出，右侧可为本模型的 loads 视图
+        self.clear_loads()
+        if loads:
+            self.apply_loads(list(loads.keys()), np.array([np.asarray(v, dtype=np.float64) for v in loads.values()]))
 
     def add_node(self, node: Node):
-        self.nodes[node.id] = node
+        if self.dim == 2 and node.z != 0:
+            raise ValueError("平面桁架节点的 z 坐标应为 0")
+        code = node_support_code(node)
+        if node.id in self.node_index:
+            i = self.node_index[node.id]
+        else:
+            i = self._n
+            self._node_ids = _reserve(self._node_ids, i + 1)
+            self._coords = _reserve(self._coords, i + 1)
+            self._supports = _reserve(self._supports, i + 1)
+            self._loads = _reserve(self._loads, i + 1)
+            self._loaded = _reserve(self._loaded, i + 1)
+            self._node_ids[i] = node.id
+            self._n = i + 1
+            self.node_index.extend(self.node_ids)
+        self._coords[i] = (node.x, node.y, node.z)[:self.dim]
+        self._supports[i] = code
 
     def add_member(self, member: Member):
-        self.members[member.id] = member
+        start, end = self.node_index[member.start_node], self.node_index[member.end_node]
+        if member.id in self.member_index:
+            i = self.member_index[member.id]
+        else:
+            i = self._m
+            self._member_ids = _reserve(self._member_ids, i + 1)
+            self._connectivity = _reserve(self._connectivity, i + 1)
+            self._E = _reserve(self._E, i + 1)
+            self._A = _reserve(self._A, i + 1)
+            self._member_ids[i] = member.id
+            self._m = i + 1
+            self.member_index.extend(self.member_ids)
+        self._connectivity[i] = (start, end)
+        self._E[i], self._A[i] = member.E, member.A
 
     def apply_load(self, node_id: int, load: np.ndarray):
-        """施加节点荷载 [Fx, Fy]"""
-        self.loads[node_id] = load
\ No newline at end of file
+        """施加节点荷载 [Fx, Fy]（空间桁架为 [Fx, Fy, Fz]），覆盖原有荷载；修改荷载请用此方法或 apply_loads"""
+        self.apply_loads([node_id], [load])
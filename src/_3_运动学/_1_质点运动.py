@@ -6,6 +6,7 @@
 import numpy as np
 from scipy.integrate import odeint
 from typing import Callable, Optional
+from src._4_动力学._4_数值方法._1_微分方程求解器 import ODESolver
 
 
 class Particle:
@@ -28,24 +29,66 @@ class Particle:
     def cartesian_acceleration(self,
                                acceleration_func: Callable[[np.ndarray, float], np.ndarray],
                                t_end: float,
-                               dt: float = 0.01) -> np.ndarray:
+                               dt: float = 0.01,
+                               events=None):
         """
         计算直角坐标系下的运动轨迹（数值积分）
         :param acceleration_func: 加速度函数 a(r,v,t)
         :param t_end: 模拟总时长
-        :param dt: 时间步长
-        :return: 轨迹数组 [[t, x, y, z, vx, vy, vz], ...]
+        :param dt: 时间步长（输出间隔）
+        :param events: 事件函数 event(r, v, t) 或其列表，terminal / direction 属性约定同 ODESolver；
+                       终止事件发生即停止积分，轨迹末行为事件时刻的状态
+        :return: 轨迹数组 [[t, x, y, z, vx, vy, vz], ...]；给定 events 时返回 (轨迹, 事件信息)
         """
         t = np.arange(0, t_end + dt, dt)
 
-        def state_deriv(y, t):
-            r = y[:3]
-            v = y[3:]
-            a = acceleration_func(r, v, t)
-            return np.concatenate([v, a])
+        if events is None:
+            def state_deriv(y, t):
+                r = y[:3]
+                v = y[3:]
+                a = acceleration_func(r, v, t)
+                return np.concatenate([v, a])
 
-        trajectory = odeint(state_deriv, self.state, t)
-        return np.column_stack([t, trajectory])
+            trajectory = odeint(state_deriv, self.state, t)
+            return np.column_stack([t, trajectory])
+
+        def rhs(t, y):
+            return np.concatenate([y[3:], acceleration_func(y[:3], y[3:], t)])
+
+        events = [self._state_event(e) for e in (events if isinstance(events, (list, tuple)) else [events])]
+        # 与 odeint 默认容差相当的 DOP853，步长由误差控制而非输出间隔决定
+        t_out, trajectory, info = ODESolver.solve_adaptive(
+            rhs, self.state, [0, t_end], method='DOP853', t_eval=t, atol=1.49012e-8, rtol=1.49012e-8, events=events)
+        for e, t_event, y_event in zip(events, info['t_events'], info['y_events']):
+            if e.terminal and t_event.size:
+                # 终止事件：在截断的轨迹末尾补上事件点
+                t_out = np.append(t_out, t_event[-1])
+                trajectory = np.vstack([trajectory, y_event[-1]])
+        return np.column_stack([t_out, trajectory]), info
+
+    @staticmethod
+    def _state_event(event):
+        """将 event(r, v, t) 转为求解器约定的 event(t, y)，保留 terminal / direction 属性"""
+        def wrapped(t, y):
+            return event(y[:3], y[3:], t)
+
+        wrapped.terminal = getattr(event, 'terminal', False)
+        wrapped.direction = getattr(event, 'direction', 0.0)
+        return wrapped
+
+    @staticmethod
+    def ground_contact(height: float = 0.0, axis: int = 1):
+        """
+        落地事件：坐标 axis 自上而下穿过 height 时终止积分
+        :param height: 地面高度 (单位:m)
+        :param axis: 竖直方向的坐标轴（0/1/2 对应 x/y/z）
+        """
+        def event(r, v, t):
+            return r[axis] - height
+
+        event.terminal = True
+        event.direction = -1
+        return event
 
     def polar_coordinates(self) -> tuple:
         """转换为极坐标系(r, θ)（二维情况）"""
@@ -75,5 +118,5 @@ def projectile_motion():
         return np.array([0, -g, 0])
 
     p = Particle([0, 0, 0], [20, 30, 0])
-    trajectory = p.cartesian_acceleration(acceleration, t_end=6)
+    trajectory, _ = p.cartesian_acceleration(acceleration, t_end=10, events=Particle.ground_contact())
     return trajectory
\ No newline at end of file
@@ -2,14 +2,23 @@
 拉格朗日力学框架
 支持自动推导运动方程
 """
-from sympy import symbols, Function, diff, Matrix
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from sympy import symbols, Function, diff, Matrix, trigsimp
 from sympy.physics.mechanics import LagrangesMethod, Lagrangian
 from sympy.physics.vector import ReferenceFrame
+from src._1_核心基础模块._4_磁盘缓存 import resolve_cache
+from src._4_动力学._4_数值方法._4_代码生成工具 import CompiledODE, generate_source, resolve_params
+
 
 class LagrangianSystem:
-    def __init__(self, dof: int):
+    def __init__(self, dof: int, cache=None):
         """
         :param dof: 系统自由度数量
+        :param cache: 持久化缓存（DiskCache、缓存目录，或 True 使用默认目录）；
+                      运动方程、哈密顿量与编译代码按拉格朗日量与选项的内容哈希缓存
         """
         self.N = dof
         self.t = symbols('t')
@@ -18,29 +27,313 @@ class LagrangianSystem:
 
         self.L = None  # 拉格朗日量表达式
         self.equations = None  # 运动方程
+        self._lm = None  # 最近一次推导的 LagrangesMethod（含质量矩阵与广义力项）
+        self._mass_forcing_cache = None  # 普通符号下的 (M, F)
+        self.cache = resolve_cache(cache)
+        self.timings = {}  # 最近一次推导 / 编译各阶段耗时（秒）
+
+    @contextmanager
+    def _timed(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] = time.perf_counter() - start
+
+    def derive_equations(self, simplify=True, fast=False) -> Matrix:
+        """
+        推导欧拉-拉格朗日方程，各阶段耗时记录在 self.timings
+        :param simplify: 常规模式下对每个方程做 simplify；快速模式下只对质量矩阵做 trigsimp
+        :param fast: 快速模式：不经 LagrangesMethod，在普通符号上直接求质量矩阵与广义力项，
+                     方程保持 M·q̈ - F 的未化简形式，公共子表达式留给编译阶段的 CSE 处理；
+                     避免了 simplify 在多连杆系统上的指数级耗时
+        """
+        if self.L is None:
+            raise ValueError("未定义拉格朗日量")
+        self.timings = {}
+
+        def derive():
+            if fast:
+                return self._fast_equations(simplify)
+            with self._timed('lagrange'):
+                equations = list(self._lagranges_method().eom)
+            if simplify:
+                with self._timed('simplify'):
+                    equations = [eq.simplify() for eq in equations]
+            return equations
+
+        with self._timed('total'):
+            self.equations = self._cached('eom', derive, simplify, fast)
+        return Matrix(self.equations)
+
+    def _fast_equations(self, simplify):
+        M, F = self.mass_forcing()
+        if simplify:
+            with self._timed('simplify'):
+                M = M.applyfunc(trigsimp)
+        q_sym, u_sym = self.state_symbols()
+        back = dict(zip(q_sym, self.q))
+        back.update(zip(u_sym, self.qdot))
+        qddot = [diff(qd, self.t) for qd in self.qdot]
+        with self._timed('assemble'):
+            return [(sum(M[i, j] * qddot[j] for j in range(self.N)) - F[i]).xreplace(back) for i in range(self.N)]
+
+    def mass_forcing(self):
+        """
+        质量矩阵与广义力项（以普通符号 q_i、u_i 表示），满足 M·q̈ = F：
+        M = ∂²L/∂u∂u，F = ∂L/∂q - (∂²L/∂u∂q)·u - ∂²L/∂u∂t
+        直接在普通符号上求导，避免对 Function / Derivative 求导及提取 q̈ 系数的开销
+        """
+        if self._mass_forcing_cache is None:
+            derivatives, functions = self._numeric_substitutions()
+            q_sym, u_sym = self.state_symbols()
+            with self._timed('substitute'):
+                L = self.L.xreplace(derivatives).xreplace(functions)
+            with self._timed('mass_matrix'):
+                dL_du = [diff(L, u) for u in u_sym]
+                M = Matrix.zeros(self.N, self.N)
+                for i in range(self.N):
+                    for j in range(i, self.N):
+                        M[i, j] = M[j, i] = diff(dL_du[i], u_sym[j])
+            with self._timed('forcing'):
+                F = Matrix([diff(L, q_sym[i]) - sum(diff(dL_du[i], q) * u for q, u in zip(q_sym, u_sym))
+                            - diff(dL_du[i], self.t) for i in range(self.N)])
+            self._mass_forcing_cache = (M, F)
+        return self._mass_forcing_cache
+
+    def _cached(self, namespace, compute, *options):
+        """以拉格朗日量、广义坐标与选项的内容哈希查询缓存，未命中时计算并写入"""
+        if self.cache is None:
+            return compute()
+        key = self.cache.key(namespace, self.L, self.q, *options)
+        return self.cache.get_or_compute(key, compute)
+
+    def _lagranges_method(self) -> LagrangesMethod:
+        if self._lm is None:
+            lm = LagrangesMethod(self.L, self.q)
+            lm.form_lagranges_equations()
+            self._lm = lm
+        return self._lm
 
     def set_lagrangian(self, T, V):
         """设置系统动能和势能"""
         self.L = T - V
+        self._lm = None
+        self._mass_forcing_cache = None
+
+    def state_symbols(self):
+        """数值化用的状态符号 (q0..q{N-1}, u0..u{N-1})，u 即广义速度"""
+        return symbols(f'q0:{self.N}'), symbols(f'u0:{self.N}')
+
+    def _numeric_substitutions(self):
+        """q(t)、q̇(t) 到普通符号的替换表（导数须先于函数替换）"""
+        q_sym, u_sym = self.state_symbols()
+        return dict(zip(self.qdot, u_sym)), dict(zip(self.q, q_sym))
 
-    def derive_equations(self, simplify=True) -> Matrix:
-        """推导欧拉-拉格朗日方程"""
+    def compile(self, params=None, values=None, cse=True, jacobian=False) -> 'CompiledLagrangian':
+        """
+        将运动方程 M(q, q̇)·q̈ = F(q, q̇, t) 编译为向量化数值右端函数
+        质量矩阵与广义力项取自 mass_forcing()（与 LagrangesMethod 的结果相同），无需 simplify；
+        质量矩阵（只取上三角）与广义力的全部表达式共享一次公共子表达式消除，各阶段耗时记录在 self.timings
+        :param params: 参数符号顺序；默认取除 t 外的全部自由符号，按名称排序
+        :param values: 参数默认值（序列或以符号 / 名称为键的字典），调用时可覆盖
+        :param cse: 是否做公共子表达式消除
+        :param jacobian: 是否同时生成解析雅可比矩阵（∂M/∂y、∂F/∂y 与右端项共享 CSE）
+        :return: CompiledLagrangian，可直接传给 ODESolver
+        """
         if self.L is None:
             raise ValueError("未定义拉格朗日量")
 
-        lm = LagrangesMethod(self.L, self.q)
-        lm.form_lagranges_equations()
+        self.timings = {}
 
-        self.equations = lm.eom
-        if simplify:
-            self.equations = [eq.simplify() for eq in self.equations]
-        return Matrix(self.equations)
+        def generate():
+            M, F = self.mass_forcing()
+            q_sym, u_sym = self.state_symbols()
+            symbols_ = self._parameter_symbols([M, F], q_sym + u_sym, params)
+            args = (self.t,) + q_sym + u_sym + tuple(symbols_)
+            mass = [M[i, j] for i in range(self.N) for j in range(i, self.N)]
+            exprs = mass + list(F)
+            with self._timed('codegen'):
+                source = generate_source('lagrangian_rhs', args, exprs, use_cse=cse)
+            jac_index = None
+            if jacobian:
+                # 状态按 q0, q̇0, q1, q̇1, ... 交错排列，k 为状态分量编号
+                state = [v for pair in zip(q_sym, u_sym) for v in pair]
+                with self._timed('jacobian'):
+                    dM = [(k, m, mass[m].diff(v)) for k, v in enumerate(state) for m in range(len(mass))]
+                    dF = [(i, k, F[i].diff(v)) for i in range(self.N) for k, v in enumerate(state)]
+                    dM = [e for e in dM if e[2] != 0]
+                    dF = [e for e in dF if e[2] != 0]
+                with self._timed('codegen_jacobian'):
+                    source += '\n' + generate_source('lagrangian_rhs_jac', args,
+                                                     exprs + [e[2] for e in dM] + [e[2] for e in dF], use_cse=cse)
+                jac_index = {'mass': [e[:2] for e in dM], 'forcing': [e[:2] for e in dF]}
+            return {'source': source, 'param_names': [str(p) for p in symbols_], 'jac_index': jac_index}
+
+        with self._timed('total'):
+            # 缓存生成的源码而非函数对象，命中时只需一次 exec
+            generated = self._cached('compiled', generate, 'lagrangian_rhs',
+                                     None if params is None else [str(p) for p in params], cse, jacobian)
+            with self._timed('load'):
+                compiled = CompiledLagrangian(generated['source'], self.N, generated['param_names'], values,
+                                              generated['jac_index'])
+        return compiled
+
+    def _parameter_symbols(self, exprs, state, params):
+        if params is not None:
+            return list(params)
+        free = set().union(*(e.free_symbols for e in exprs)) - set(state) - {self.t}
+        return sorted(free, key=str)
+
+    def linearize(self, equilibrium, values=None, inputs=None, t=0.0):
+        """
+        在平衡点附近线性化为状态空间模型 δẏ = A·δy + B·δu
+        :param equilibrium: 平衡状态 y*（按 [q0, q̇0, q1, q̇1, ...] 交错排列）
+        :param values: 参数值（序列或以符号 / 名称为键的字典）
+        :param inputs: None 表示作用于各广义坐标的广义力（B 为 (2N, N)）；
+                       或参数符号 / 名称列表，此时 B 的第 k 列为 ∂f/∂inputs[k]
+        :return: A (2N, 2N), B
+        """
+        compiled = self.compile(values=values, jacobian=True)
+        y = np.asarray(equilibrium, dtype=np.float64)
+        dydt, A = compiled.rhs_and_jacobian(t, y)
+        M = compiled.mass_matrix(t, y)
+        if inputs is None:
+            B = np.zeros((2 * self.N, self.N))
+            B[1::2] = np.linalg.inv(M)
+            return A, B
+
+        # 参数输入：∂q̈/∂p = M⁻¹·(∂F/∂p - ∂M/∂p·q̈)
+        M_sym, F_sym = self.mass_forcing()
+        point = self._numeric_point(M_sym, F_sym, y, compiled, t)
+        qddot = dydt[1::2]
+        B = np.zeros((2 * self.N, len(inputs)))
+        for k, symbol in enumerate(self._lookup_symbols(inputs, [M_sym, F_sym])):
+            dM = np.array(M_sym.diff(symbol).subs(point), dtype=np.float64)
+            dF = np.array(F_sym.diff(symbol).subs(point), dtype=np.float64).ravel()
+            B[1::2, k] = np.linalg.solve(M, dF - dM @ qddot)
+        return A, B
+
+    def _numeric_point(self, M_sym, F_sym, y, compiled, t):
+        """线性化点的符号替换表：状态分量、时间与参数取值"""
+        q_sym, u_sym = self.state_symbols()
+        point = dict(zip(q_sym, y[0::2]))
+        point.update(zip(u_sym, y[1::2]))
+        point[self.t] = t
+        values = dict(zip(compiled.param_names, compiled._values(None)))
+        for symbol in set().union(M_sym.free_symbols, F_sym.free_symbols):
+            if str(symbol) in values:
+                point[symbol] = values[str(symbol)]
+        return point
+
+    @staticmethod
+    def _lookup_symbols(names, exprs):
+        free = {str(s): s for e in exprs for s in e.free_symbols}
+        found = []
+        for name in names:
+            if str(name) not in free:
+                raise ValueError(f"方程中不含参数: {name}")
+            found.append(free[str(name)])
+        return found
 
     def to_ode_system(self):
         """将二阶方程转换为一阶ODE系统"""
         substitutions = {diff(q, self.t): qd for q, qd in zip(self.q, self.qdot)}
         return [eq.subs(substitutions) for eq in self.equations]
 
+
+class CompiledLagrangian(CompiledODE):
+    """
+    编译后的拉格朗日系统右端函数 f(t, y, params)
+    状态按 [q0, q̇0, q1, q̇1, ...] 交错排列；y 为 (M, 2N) 时按行向量化，
+    参数值可为标量或 (M,) 数组（逐成员参数）
+    雅可比矩阵由 ∂q̈/∂y = M⁻¹·(∂F/∂y - ∂M/∂y·q̈) 组装，与右端项共用一次生成代码调用
+    """
+    FUNCTION = 'lagrangian_rhs'
+
+    def __init__(self, source: str, n_dof: int, param_names, values=None, jac_index=None):
+        super().__init__(source, 2 * n_dof, param_names, values, jac_index)
+        self.N = n_dof
+        self._triu = np.triu_indices(n_dof)
+        self._n_mass = n_dof * (n_dof + 1) // 2
+
+    def _call(self, func, t, y, params):
+        columns = np.moveaxis(y, -1, 0)
+        return func(t, *columns[0::2], *columns[1::2], *self._values(params))
+
+    def __call__(self, t, y, params=None) -> np.ndarray:
+        y = np.asarray(y, dtype=np.float64)
+        out = self._call(self._func, t, y, params)
+        dydt = np.empty(y.shape)
+        dydt[..., 0::2] = y[..., 1::2]
+        self._solve(out, dydt)
+        return dydt
+
+    def _solve(self, out, dydt):
+        """解 M·q̈ = F 并写入 dydt 的加速度分量；一、二自由度用闭式解，其余批量 LU"""
+        n = self.N
+        m, f = out[:self._n_mass], out[self._n_mass:self._n_mass + n]
+        if n == 1:
+            dydt[..., 1] = f[0] / m[0]
+        elif n == 2:
+            a, b, d = m
+            det = a * d - b * b
+            dydt[..., 1] = (d * f[0] - b * f[1]) / det
+            dydt[..., 3] = (a * f[1] - b * f[0]) / det
+        else:
+            batch = dydt.shape[:-1]
+            F = np.empty(batch + (n, 1))
+            for i in range(n):
+                F[..., i, 0] = f[i]
+            dydt[..., 1::2] = np.linalg.solve(self._assemble_mass(m, batch), F)[..., 0]
+
+    def _assemble_mass(self, m, batch) -> np.ndarray:
+        M = np.empty(batch + (self.N, self.N))
+        for k, (i, j) in enumerate(zip(*self._triu)):
+            M[..., i, j] = m[k]
+            M[..., j, i] = m[k]
+        return M
+
+    def mass_matrix(self, t, y, params=None) -> np.ndarray:
+        """质量矩阵 M(q, q̇)，形状 (..., N, N)"""
+        y = np.asarray(y, dtype=np.float64)
+        return self._assemble_mass(self._call(self._func, t, y, params)[:self._n_mass], y.shape[:-1])
+
+    def rhs_and_jacobian(self, t, y, params=None):
+        """一次调用同时求右端项与雅可比矩阵 ∂f/∂y（形状 (..., 2N, 2N)）"""
+        if self._jac_func is None:
+            raise ValueError("编译时未生成雅可比矩阵（需 jacobian=True）")
+        y = np.asarray(y, dtype=np.float64)
+        batch = y.shape[:-1]
+        n, n_state = self.N, self.n
+        out = self._call(self._jac_func, t, y, params)
+        M = self._assemble_mass(out[:self._n_mass], batch)
+        F = np.empty(batch + (n,))
+        for i in range(n):
+            F[..., i] = out[self._n_mass + i]
+        qddot = np.linalg.solve(M, F[..., None])[..., 0]
+
+        offset = self._n_mass + n
+        n_dM = len(self.jac_index['mass'])
+        dM = np.zeros(batch + (n_state, n, n))
+        for (k, m), value in zip(self.jac_index['mass'], out[offset:offset + n_dM]):
+            i, j = self._triu[0][m], self._triu[1][m]
+            dM[..., k, i, j] = value
+            dM[..., k, j, i] = value
+        R = np.zeros(batch + (n, n_state))
+        for (i, k), value in zip(self.jac_index['forcing'], out[offset + n_dM:]):
+            R[..., i, k] = value
+        R -= np.einsum('...kij,...j->...ik', dM, qddot)
+
+        dydt = np.empty(y.shape)
+        dydt[..., 0::2] = y[..., 1::2]
+        dydt[..., 1::2] = qddot
+        J = np.zeros(batch + (n_state, n_state))
+        J[..., 0::2, 1::2] = np.eye(n)
+        J[..., 1::2, :] = np.linalg.solve(M, R)
+        return dydt, J
+
+
 # 示例：单摆系统
 def pendulum_example():
     # 定义符号
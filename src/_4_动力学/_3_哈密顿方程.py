@@ -2,37 +2,65 @@
 哈密顿力学实现
 包含勒让德变换、正则方程推导
 """
-from sympy import symbols, diff, Matrix, simplify
+import numpy as np
+from sympy import symbols, diff, Matrix, simplify, Function
 from src._4_动力学._2_拉格朗日方程 import LagrangianSystem
+from src._4_动力学._4_数值方法._1_微分方程求解器 import ODESolver, _SYMPLECTIC_SCHEMES
+from src._4_动力学._4_数值方法._4_代码生成工具 import CompiledODE, generate_explicit_ode, generate_source, load_source
 
 
 class HamiltonianSystem(LagrangianSystem):
-    def __init__(self, dof: int):
-        super().__init__(dof)
+    def __init__(self, dof: int, cache=None):
+        super().__init__(dof, cache)
         self.p = [symbols(f'p{i}') for i in range(self.N)]  # 广义动量
+        self.H = None  # 直接给定的哈密顿量（未给定时由勒让德变换得到）
+
+    def set_hamiltonian(self, H):
+        """直接设置哈密顿量 H(q, p, t)，q 取 self.q，p 取 self.p"""
+        self.H = H
+
+    def hamiltonian(self):
+        return self.H if self.H is not None else self.legendre_transform()
 
     def legendre_transform(self):
-        """执行勒让德变换生成哈密顿量"""
+        """执行勒让德变换生成哈密顿量（配置了缓存时按拉格朗日量的内容哈希复用）"""
         if self.L is None:
             raise ValueError("需要先定义拉格朗日量")
+        return self._cached('hamiltonian', self._legendre_transform, self.p)
 
-        # 计算广义动量 p = ∂L/∂qdot
-        p = [diff(self.L, qd) for qd in self.qdot]
+    def _quadratic_form(self):
+        """
+        将拉格朗日量写成 L = ½·q̇ᵀM(q)q̇ + b(q)ᵀq̇ - V(q) 的系数，广义动量 p = ∂L/∂q̇ = M·q̇ + b
+        :return: (L, M, b)，均以普通符号 q_i、u_i 表示
+        """
+        derivatives, functions = self._numeric_substitutions()
+        _, u_sym = self.state_symbols()
+        L = self.L.xreplace(derivatives).xreplace(functions)
+        momenta = [diff(L, u) for u in u_sym]
+        M = Matrix(self.N, self.N, lambda i, j: diff(momenta[i], u_sym[j]))
+        if any(m.has(*u_sym) for m in M):
+            raise ValueError("勒让德变换要求动能为广义速度的二次型")
+        at_rest = dict.fromkeys(u_sym, 0)
+        b = Matrix([m.xreplace(at_rest) for m in momenta])
+        return L, M, b
 
-        # 表达式替换：用p表示qdot
-        substitutions = {}
-        H = 0
-        for i in range(self.N):
-            qd_expr = self.solve_qdot(p[i])
-            substitutions[self.qdot[i]] = qd_expr
-            H += self.p[i] * qd_expr
+    def _legendre_transform(self):
+        # 由 p = M·q̇ + b 解出 q̇ = M⁻¹(p - b)，H = p·q̇ - L
+        L, M, b = self._quadratic_form()
+        q_sym, u_sym = self.state_symbols()
+        qdot = M.LUsolve(Matrix(self.p) - b)
+        substitutions = dict(zip(u_sym, qdot))
+        H = sum(p * qd for p, qd in zip(self.p, qdot)) - L.xreplace(substitutions)
+        return H.expand().xreplace(dict(zip(q_sym, self.q)))
 
-        H -= self.L.subs(substitutions)
-        return H
+    def is_separable(self) -> bool:
+        """哈密顿量是否可分离为 H = T(p) + V(q)（∂²H/∂q∂p ≡ 0），可分离时可用显式辛积分"""
+        H = self.hamiltonian()
+        return all(diff(H, q, p) == 0 for q in self.q for p in self.p)
 
     def canonical_equations(self):
         """推导正则方程"""
-        H = self.legendre_transform()
+        H = self.hamiltonian()
         equations = []
         for i in range(self.N):
             dqdt = diff(H, self.p[i])
@@ -40,6 +68,230 @@ class HamiltonianSystem(LagrangianSystem):
             equations.extend([dqdt, dpdt])
         return equations
 
+    def _canonical_state(self):
+        """正则方程的普通符号形式，状态按 [q0, p0, q1, p1, ...] 交错排列"""
+        q_sym, _ = self.state_symbols()
+        functions = dict(zip(self.q, q_sym))
+        exprs = [e.xreplace(functions) for e in self.canonical_equations()]
+        state = [v for pair in zip(q_sym, self.p) for v in pair]
+        return state, exprs
+
+    def _cached_on_hamiltonian(self, namespace, compute, *options):
+        """以哈密顿量（而非拉格朗日量）的内容哈希查询缓存，直接给定 H 时同样适用"""
+        if self.cache is None:
+            return compute()
+        key = self.cache.key(namespace, self.hamiltonian(), self.q, self.p, *options)
+        return self.cache.get_or_compute(key, compute)
+
+    def compile(self, params=None, values=None, cse=True, jacobian=False, legendre='symbolic') -> CompiledODE:
+        """
+        将正则方程编译为向量化数值右端函数 f(t, y, params)，状态按 [q0, p0, q1, p1, ...] 交错排列
+        :param params, values, cse: 约定同 LagrangianSystem.compile
+        :param jacobian: 是否同时生成与右端项共享 CSE 的解析雅可比矩阵
+        :param legendre: 未直接给定 H 时勒让德变换的方式：'symbolic' 符号求逆 M(q)；
+                         'numeric' 不求 H，每次调用数值求解 M(q)·q̇ = p - b(q)，再由 ṗ = ∂L/∂q 得到动量变化率，
+                         适合自由度较多、符号求逆代价过高的系统（不支持 jacobian）
+        """
+        self.timings = {}
+        key_params = None if params is None else [str(p) for p in params]
+        if legendre == 'numeric' and self.H is None:
+            if jacobian:
+                raise ValueError("数值勒让德变换不支持解析雅可比矩阵")
+            return self._compile_numeric_legendre(params, values, cse, key_params)
+        if legendre not in ('symbolic', 'numeric'):
+            raise ValueError(f"未知的勒让德变换方式: {legendre}")
+
+        def generate():
+            state, exprs = self._canonical_state()
+            symbols_ = self._parameter_symbols([Matrix(exprs)], state, params)
+            with self._timed('codegen'):
+                return generate_explicit_ode(self.t, state, exprs, symbols_, cse, jacobian)
+
+        with self._timed('total'):
+            generated = self._cached_on_hamiltonian('compiled', generate, 'hamiltonian_rhs', key_params, cse,
+                                                    jacobian)
+            with self._timed('load'):
+                compiled = CompiledODE(generated['source'], 2 * self.N, generated['param_names'], values,
+                                       generated['jac_index'])
+        return compiled
+
+    def _compile_numeric_legendre(self, params, values, cse, key_params):
+        def generate():
+            L, M, b = self._quadratic_form()
+            q_sym, u_sym = self.state_symbols()
+            force = [diff(L, q) for q in q_sym]
+            symbols_ = self._parameter_symbols([M, b, Matrix(force)], q_sym + u_sym, params)
+            mass = [M[i, j] for i in range(self.N) for j in range(i, self.N)] + list(b)
+            with self._timed('codegen'):
+                source = generate_source('legendre_mass', (self.t,) + q_sym + tuple(symbols_), mass, cse)
+                source += '\n' + generate_source('legendre_force', (self.t,) + q_sym + u_sym + tuple(symbols_),
+                                                 force, cse)
+            return {'source': source, 'param_names': [str(p) for p in symbols_]}
+
+        with self._timed('total'):
+            generated = self._cached('compiled', generate, 'legendre_rhs', key_params, cse)
+            with self._timed('load'):
+                compiled = CompiledLegendre(generated['source'], self.N, generated['param_names'], values)
+        return compiled
+
+    def compile_separable(self, params=None, values=None, cse=True) -> 'CompiledSeparable':
+        """
+        可分离哈密顿量 H = T(p) + V(q) 的辛积分所需函数：kick ṗ = -∂V/∂q(t, q) 与 drift q̇ = ∂T/∂p(t, p)
+        :param params, values, cse: 约定同 compile
+        """
+        if not self.is_separable():
+            raise ValueError("哈密顿量不可分离，不能使用显式辛积分")
+        self.timings = {}
+
+        def generate():
+            q_sym, _ = self.state_symbols()
+            functions = dict(zip(self.q, q_sym))
+            H = self.hamiltonian().xreplace(functions)
+            kick = [-diff(H, q) for q in q_sym]
+            drift = [diff(H, p) for p in self.p]
+            symbols_ = self._parameter_symbols([Matrix(kick), Matrix(drift)], list(q_sym) + self.p, params)
+            with self._timed('codegen'):
+                source = generate_source('kick', (self.t,) + q_sym + tuple(symbols_), kick, cse)
+                source += '\n' + generate_source('drift', (self.t,) + tuple(self.p) + tuple(symbols_), drift, cse)
+            return {'source': source, 'param_names': [str(p) for p in symbols_]}
+
+        with self._timed('total'):
+            generated = self._cached_on_hamiltonian('compiled', generate, 'separable',
+                                                    None if params is None else [str(p) for p in params], cse)
+            with self._timed('load'):
+                compiled = CompiledSeparable(generated['source'], self.N, generated['param_names'], values)
+        return compiled
+
+    def integrate(self, y0, t_span, dt=None, values=None, method=None, **options):
+        """
+        数值积分正则方程，状态按 [q0, p0, q1, p1, ...] 交错排列（系综模式下为 (M, 2N)）
+        可分离哈密顿量且给定 dt 时默认采用 4 阶 Yoshida 辛积分，长时间积分能量误差有界；
+        否则默认用 DOP853 自适应积分
+        :param dt: 辛积分 / RK4 的固定步长
+        :param values: 参数值
+        :param method: 辛格式名（'velocity'、'yoshida4' 等，见 ODESolver.verlet）、'RK4'，或自适应方法名
+        :param options: 透传给所用积分器的其余参数
+        :return: t, y
+        """
+        if method is None:
+            method = 'yoshida4' if dt is not None and self.is_separable() else 'DOP853'
+        y0 = np.asarray(y0, dtype=np.float64)
+        if method in _SYMPLECTIC_SCHEMES:
+            if dt is None:
+                raise ValueError("辛积分需要给定步长 dt")
+            split = self.compile_separable(values=values)
+            # 辛积分器使用 [q, p] 拼接布局
+            y0 = np.concatenate([y0[..., 0::2], y0[..., 1::2]], axis=-1)
+            result = ODESolver.verlet(split.accel, y0, t_span, dt, method=method, velocity_func=split.velocity,
+                                      **options)
+            y = np.empty_like(result[1])
+            y[..., 0::2] = result[1][..., :self.N]
+            y[..., 1::2] = result[1][..., self.N:]
+            return (result[0], y) + tuple(result[2:])
+
+        f = self.compile(values=values)
+        if method.upper() == 'RK4':
+            return ODESolver.rk4(f, y0, t_span, dt, **options)
+        return ODESolver.solve_adaptive(f, y0, t_span, method=method, **options)
+
+    def linearize(self, equilibrium, values=None, inputs=None, t=0.0):
+        """
+        在平衡点附近线性化为 δẏ = A·δy + B·δu，状态按 [q0, p0, q1, p1, ...] 交错排列
+        :param inputs: None 表示作用于各广义坐标的广义力（进入 ṗ，B 为 (2N, N)）；
+                       或参数符号 / 名称列表，此时 B 的第 k 列为 ∂f/∂inputs[k]
+        :return: A (2N, 2N), B
+        """
+        compiled = self.compile(values=values, jacobian=True)
+        y = np.asarray(equilibrium, dtype=np.float64)
+        A = compiled.jacobian(t, y)
+        if inputs is None:
+            B = np.zeros((2 * self.N, self.N))
+            B[1::2] = np.eye(self.N)
+            return A, B
+
+        state, exprs = self._canonical_state()
+        f = Matrix(exprs)
+        point = dict(zip(state, y))
+        point[self.t] = t
+        values = dict(zip(compiled.param_names, compiled._values(None)))
+        point.update({s: values[str(s)] for s in f.free_symbols if str(s) in values})
+        B = np.zeros((2 * self.N, len(inputs)))
+        for k, symbol in enumerate(self._lookup_symbols(inputs, [f])):
+            B[:, k] = np.array(f.diff(symbol).subs(point), dtype=np.float64).ravel()
+        return A, B
+
+
+class CompiledLegendre(CompiledODE):
+    """
+    数值勒让德变换的正则方程右端函数，状态按 [q0, p0, q1, p1, ...] 交错排列
+    每次调用先由生成代码求 M(q)、b(q)，解 M·q̇ = p - b 得广义速度，再求 ṗ = ∂L/∂q(q, q̇)
+    """
+    FUNCTION = 'legendre_mass'
+
+    def __init__(self, source: str, n_dof: int, param_names, values=None):
+        super().__init__(source, 2 * n_dof, param_names, values)
+        self.N = n_dof
+        self._force = load_source(source, 'legendre_force')
+        self._triu = np.triu_indices(n_dof)
+
+    def __call__(self, t, y, params=None) -> np.ndarray:
+        y = np.asarray(y, dtype=np.float64)
+        values = self._values(params)
+        columns = np.moveaxis(y, -1, 0)
+        q, p = columns[0::2], columns[1::2]
+        out = self._func(t, *q, *values)
+        n_mass = len(self._triu[0])
+        batch = y.shape[:-1]
+        M = np.empty(batch + (self.N, self.N))
+        for k, (i, j) in enumerate(zip(*self._triu)):
+            M[..., i, j] = out[k]
+            M[..., j, i] = out[k]
+        rhs = np.empty(batch + (self.N, 1))
+        for i in range(self.N):
+            rhs[..., i, 0] = p[i] - out[n_mass + i]
+        qdot = np.linalg.solve(M, rhs)[..., 0]
+        dydt = np.empty(y.shape)
+        dydt[..., 0::2] = qdot
+        for i, value in enumerate(self._force(t, *q, *np.moveaxis(qdot, -1, 0), *values)):
+            dydt[..., 2 * i + 1] = value
+        return dydt
+
+    def rhs_and_jacobian(self, t, y, params=None):
+        raise ValueError("数值勒让德变换不支持解析雅可比矩阵")
+
+
+class CompiledSeparable(CompiledODE):
+    """
+    可分离哈密顿量的分裂函数：accel(t, q) = -∂V/∂q，velocity(t, p) = ∂T/∂p，均对 (..., N) 数组向量化
+    直接调用时给出交错排列的正则方程右端项，可作为普通 CompiledODE 使用
+    """
+    FUNCTION = 'kick'
+
+    def __init__(self, source: str, n_dof: int, param_names, values=None):
+        super().__init__(source, 2 * n_dof, param_names, values)
+        self.N = n_dof
+        self._drift = load_source(source, 'drift')
+
+    def _evaluate(self, func, t, x, params) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float64)
+        out = np.empty(x.shape)
+        for i, value in enumerate(func(t, *np.moveaxis(x, -1, 0), *self._values(params))):
+            out[..., i] = value
+        return out
+
+    def accel(self, t, q, params=None) -> np.ndarray:
+        return self._evaluate(self._func, t, q, params)
+
+    def velocity(self, t, p, params=None) -> np.ndarray:
+        return self._evaluate(self._drift, t, p, params)
+
+    def __call__(self, t, y, params=None) -> np.ndarray:
+        y = np.asarray(y, dtype=np.float64)
+        dydt = np.empty(y.shape)
+        dydt[..., 0::2] = self.velocity(t, y[..., 1::2], params)
+        dydt[..., 1::2] = self.accel(t, y[..., 0::2], params)
+        return dydt
+
 
 # 示例：谐振子系统
 def harmonic_oscillator_example():
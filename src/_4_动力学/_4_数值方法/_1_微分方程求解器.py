@@ -3,39 +3,1126 @@
 实现常用积分方法
 """
 import numpy as np
+from src._1_核心基础模块._3_数学工具函数 import RK4Workspace, EulerWorkspace
+from scipy.linalg import lu_factor, lu_solve
+from scipy.sparse import csc_matrix, identity, issparse
+from scipy.sparse.linalg import splu
+from src._4_动力学._4_数值方法 import _2_龙格库塔系数表 as tableau
+from src._4_动力学._4_数值方法._3_雅可比矩阵工具 import EPS, FiniteDifferenceJacobian, as_jacobian
 
 
 class ODESolver:
+    """
+    固定步长积分器的通用约定：
+      - y0 为 (M, n) 时按系综模式同步积分，func 须按行向量化
+      - inplace_rhs=True 时 func 形如 func(t, y, out)，斜率写入 out，积分全程不分配新数组
+      - save_every=1 保存每一步，k 保存每 k 步（终态总会保存），0 只保留终态
+      - dt 之后的参数只能按关键字传入
+      - events 为事件函数或其列表（约定见 EventTracker），给定时额外返回事件信息字典
+        {'t_events', 'y_events'}（系综模式另含 'member_events', 't_terminal'）；
+        终止事件发生后该成员冻结在事件状态，全部成员终止即提前结束积分并截断输出
+    """
+
     @staticmethod
-    def euler(func, y0, t_span, dt):
+    def euler(func, y0, t_span, dt, *, active=None, inplace_rhs=False, save_every=1, events=None):
         """显式欧拉法"""
-        t = np.arange(t_span[0], t_span[1] + dt, dt)
-        y = np.zeros((len(t), len(y0)))
-        y[0] = y0
-        for i in range(1, len(t)):
-            y[i] = y[i - 1] + func(t[i - 1], y[i - 1]) * dt
-        return t, y
-
-    @staticmethod
-    def rk4(func, y0, t_span, dt):
-        """经典四阶龙格-库塔法"""
-        t = np.arange(t_span[0], t_span[1] + dt, dt)
-        y = np.zeros((len(t), len(y0)))
-        y[0] = y0
-        for i in range(1, len(t)):
-            k1 = func(t[i - 1], y[i - 1])
-            k2 = func(t[i - 1] + dt / 2, y[i - 1] + dt * k1 / 2)
-            k3 = func(t[i - 1] + dt / 2, y[i - 1] + dt * k2 / 2)
-            k4 = func(t[i - 1] + dt, y[i - 1] + dt * k3)
-            y[i] = y[i - 1] + (k1 + 2 * k2 + 2 * k3 + k4) * dt / 6
-        return t, y
-
-    @staticmethod
-    def verlet(accel_func, y0, t_span, dt):
-        """Verlet算法（适用于保守系统）"""
-        t = np.arange(t_span[0], t_span[1] + dt, dt)
-        y = np.zeros((len(t), len(y0)))
-        y[0] = y0
-        # 需要初始速度信息，此处简化为位置-速度格式
-        # 实际实现需根据具体问题调整
-        return t, y
\ No newline at end of file
+        workspace = EulerWorkspace(np.shape(y0), inplace_rhs)
+        return ODESolver._fixed_step(workspace, func, y0, t_span, dt, save_every, active, events)
+
+    @staticmethod
+    def rk4(func, y0, t_span, dt, *, active=None, inplace_rhs=False, save_every=1, events=None):
+        """
+        经典四阶龙格-库塔法
+        :param active: 可选回调 active(t, Y) -> (M,) 布尔数组，返回 False 的成员冻结并不再计算
+        :param events: 事件函数或其列表，根在步内三次埃尔米特插值上精化
+        :return: t, y（系综模式下 y 形状为 (len(t), M, n)）；给定 events 时另返回事件信息
+        """
+        workspace = RK4Workspace(np.shape(y0), inplace_rhs)
+        return ODESolver._fixed_step(workspace, func, y0, t_span, dt, save_every, active, events)
+
+    @staticmethod
+    def _fixed_step(workspace, func, y0, t_span, dt, save_every, active, events=None):
+        """固定步长主循环：时间点按需计算，只为需要保存的状态分配输出"""
+        y0 = np.asarray(y0, dtype=np.float64)
+        tracker = EventTracker(events, t_span[0], y0) if events is not None else None
+        t0 = t_span[0]
+        n_steps = int(np.ceil((t_span[1] + dt - t_span[0]) / dt)) - 1  # 与 np.arange 的点数一致
+        if save_every:
+            saved_steps = np.arange(0, n_steps + 1, save_every)
+            if saved_steps[-1] != n_steps:
+                saved_steps = np.append(saved_steps, n_steps)
+        else:
+            saved_steps = np.array([n_steps])
+        y = np.empty((len(saved_steps),) + y0.shape)
+
+        if save_every == 1:
+            # 每步保存：直接写入输出数组，无需中间缓冲
+            y[0] = y0
+            for i in range(1, n_steps + 1):
+                t_prev = t0 + (i - 1) * dt
+                mask = ODESolver._member_mask(active, tracker, t_prev, y[i - 1])
+                ODESolver._advance(workspace, func, t_prev, y[i - 1], dt, mask, y[i])
+                if tracker is not None and tracker.after_step(workspace, func, t_prev, dt, y[i - 1], y[i], mask):
+                    return ODESolver._event_output(t0 + saved_steps[:i + 1] * dt, y[:i + 1], tracker)
+            return ODESolver._event_output(t0 + saved_steps * dt, y, tracker)
+
+        current = y0.copy()
+        spare = np.empty_like(current)
+        j = 0
+        if saved_steps[0] == 0:
+            y[0] = current
+            j = 1
+        for i in range(1, n_steps + 1):
+            t_prev = t0 + (i - 1) * dt
+            mask = ODESolver._member_mask(active, tracker, t_prev, current)
+            ODESolver._advance(workspace, func, t_prev, current, dt, mask, spare)
+            current, spare = spare, current
+            stop = tracker is not None and tracker.after_step(workspace, func, t_prev, dt, spare, current, mask)
+            if j < len(saved_steps) and saved_steps[j] == i:
+                y[j] = current
+                j += 1
+            elif stop:
+                # 提前终止时补存终态
+                saved_steps[j] = i
+                y[j] = current
+                j += 1
+            if stop:
+                return ODESolver._event_output(t0 + saved_steps[:j] * dt, y[:j], tracker)
+        return ODESolver._event_output(t0 + saved_steps * dt, y, tracker)
+
+    @staticmethod
+    def _member_mask(active, tracker, t, y):
+        """合并用户掩码与事件终止掩码；全部成员活跃时返回 None 以走无掩码快速路径"""
+        mask = active(t, y) if active is not None else None
+        if tracker is None or tracker.alive.all():
+            return mask
+        return tracker.alive if mask is None else mask & tracker.alive
+
+    @staticmethod
+    def _event_output(t, y, tracker):
+        if tracker is None:
+            return t, y
+        if tracker.t_stop is not None and not tracker.ensemble:
+            t[-1] = tracker.t_stop  # 单轨迹终止时末点即事件点
+        return t, y, tracker.result()
+
+    @staticmethod
+    def _advance(workspace, func, t, y, dt, mask, out):
+        """推进一步写入 out；有掩码时仅推进活跃成员"""
+        if mask is None:
+            workspace.step(func, t, y, dt, out=out)
+            return
+        out[...] = y
+        idx = np.flatnonzero(mask)
+        if idx.size:
+            out[idx] = workspace.step(func, t, y[idx], dt)
+
+    @staticmethod
+    def solve_adaptive(func, y0, t_span, method='RK45', t_eval=None, atol=1e-6, rtol=1e-3,
+                       first_step=None, max_step=np.inf, full_output=False, jac=None, jac_sparsity=None,
+                       events=None):
+        """
+        自适应步长积分
+        :param method: 显式 'RK45'（Dormand-Prince 5(4)）/ 'DOP853'（8(5,3) 阶）；
+                       刚性问题用隐式 'BDF'（1~5 阶变阶）/ 'Radau'（5 阶 Radau IIA）
+        :param t_eval: 输出时刻；给定时由每步的稠密输出插值得到，不额外缩短步长，
+                       否则返回积分器实际走过的全部步点
+        :param atol, rtol: 绝对/相对误差限
+        :param full_output: 为 True 时额外返回 {'nfev', 'n_steps', 'n_rejected'}（隐式法另含 'njev', 'nlu'）
+        :param jac: 仅隐式法使用：雅可比矩阵 ∂f/∂y，可为常矩阵（稠密或稀疏）或回调 jac(t, y)；
+                    回调返回稀疏矩阵时全程使用稀疏 LU
+        :param jac_sparsity: 仅隐式法且未给 jac 时使用：雅可比稀疏结构，有限差分按列分组计算并以 CSR 存储
+        :param events: 事件函数或其列表，根在各步稠密输出上精化；终止事件发生时输出截断至事件时刻
+        :return: t, y；full_output 或给定 events 时另返回信息字典（含 't_events', 'y_events'）
+        """
+        key_method = method.upper()
+        if key_method in ('RK45', 'DOP853'):
+            stepper = AdaptiveRKStepper(func, t_span[0], y0, t_span[1], method=method, atol=atol, rtol=rtol,
+                                        first_step=first_step, max_step=max_step)
+        elif key_method in ('BDF', 'RADAU'):
+            stepper_cls = BDFStepper if key_method == 'BDF' else RadauStepper
+            stepper = stepper_cls(func, t_span[0], y0, t_span[1], atol=atol, rtol=rtol, first_step=first_step,
+                                  max_step=max_step, jac=jac, jac_sparsity=jac_sparsity)
+        else:
+            raise ValueError(f"未知的自适应积分方法: {method}")
+        direction = stepper.direction
+        tracker = EventTracker(events, stepper.t, stepper.y, ensemble=False) if events is not None else None
+        if t_eval is None:
+            ts = [stepper.t]
+            ys = [stepper.y.copy()]
+        else:
+            t_eval = np.asarray(t_eval, dtype=np.float64)
+            ys = np.empty((len(t_eval),) + stepper.y.shape)
+            key = direction * t_eval  # 统一为递增序列以便二分查找
+            idx = int(np.searchsorted(key, direction * stepper.t, side='right'))
+            ys[:idx] = stepper.y
+
+        while direction * (stepper.t_bound - stepper.t) > 0:
+            stepper.step()
+            t_new, y_new = stepper.t, stepper.y
+            terminated = None
+            if tracker is not None:
+                terminated = tracker.update(stepper.t_old, t_new, y_new,
+                                            lambda members: lambda t, _: stepper.dense(t).reshape(len(t), -1))
+                if terminated is not None:
+                    t_new, y_new = terminated[1][0], terminated[2][0].reshape(stepper.y.shape)
+            if t_eval is None:
+                ts.append(t_new)
+                ys.append(y_new.copy())
+            else:
+                end = int(np.searchsorted(key, direction * t_new, side='right'))
+                if end > idx:
+                    ys[idx:end] = stepper.dense(t_eval[idx:end])
+                    idx = end
+            if terminated is not None:
+                break
+
+        if t_eval is None:
+            t_out, y_out = np.array(ts), np.array(ys)
+        else:
+            t_out, y_out = t_eval[:idx], ys[:idx]
+        if full_output or tracker is not None:
+            info = tracker.result() if tracker is not None else {}
+            if full_output:
+                info.update(nfev=stepper.nfev, n_steps=stepper.n_accepted, n_rejected=stepper.n_rejected)
+                if isinstance(stepper, _ImplicitStepper):
+                    info.update(njev=stepper.njev, nlu=stepper.nlu)
+            return t_out, y_out, info
+        return t_out, y_out
+
+    @staticmethod
+    def rk45(func, y0, t_span, **options):
+        """Dormand-Prince 5(4) 自适应积分，参数同 solve_adaptive"""
+        return ODESolver.solve_adaptive(func, y0, t_span, method='RK45', **options)
+
+    @staticmethod
+    def dop853(func, y0, t_span, **options):
+        """DOP853 高阶自适应积分（适合高精度要求），参数同 solve_adaptive"""
+        return ODESolver.solve_adaptive(func, y0, t_span, method='DOP853', **options)
+
+    @staticmethod
+    def bdf(func, y0, t_span, **options):
+        """变阶 BDF 隐式积分（刚性问题），参数同 solve_adaptive"""
+        return ODESolver.solve_adaptive(func, y0, t_span, method='BDF', **options)
+
+    @staticmethod
+    def radau(func, y0, t_span, **options):
+        """5 阶 Radau IIA 隐式积分（刚性问题，高精度），参数同 solve_adaptive"""
+        return ODESolver.solve_adaptive(func, y0, t_span, method='Radau', **options)
+
+    @staticmethod
+    def verlet(accel_func, y0, t_span, dt, method='velocity', save_every=1, inplace_accel=False, events=None,
+               velocity_func=None):
+        """
+        辛积分器（适用于保守系统，长时间积分能量误差有界）
+        状态按 [q, v] 拼接（质量归一时 v 即广义动量 p），系综模式下形状为 (M, 2n)
+        :param accel_func: 加速度函数 a(t, q)；inplace_accel=True 时为 a(t, q, out)
+        :param velocity_func: 可分离哈密顿量 H = T(p) + V(q) 的漂移速度 ∂T/∂p = velocity_func(t, p)；
+                              给定时状态为 [q, p]，accel_func 应返回 ṗ = -∂V/∂q
+        :param y0: 拼接状态 [q0, v0]，或二元组 (q0, v0)
+        :param method: 'velocity'（速度 Verlet）/ 'position'（位置 Verlet）/
+                       'yoshida4' / 'yoshida6' / 'forest_ruth'（高阶辛复合格式）
+        :param save_every: 输出间隔，约定同 rk4
+        :param events: 事件函数 event(t, y)，y 为 [q, v] 拼接状态；约定同 rk4
+        :return: t, y（y 的每个状态均为 [q, v] 拼接）
+        """
+        if isinstance(y0, tuple):
+            y0 = np.concatenate([np.asarray(y0[0], dtype=np.float64), np.asarray(y0[1], dtype=np.float64)], axis=-1)
+        if method not in _SYMPLECTIC_SCHEMES:
+            raise ValueError(f"未知的辛积分格式: {method}")
+        workspace = SymplecticWorkspace(np.shape(y0), _SYMPLECTIC_SCHEMES[method], inplace_accel, velocity_func)
+        return ODESolver._fixed_step(workspace, accel_func, y0, t_span, dt, save_every, None, events)
+
+
+def _rms(x) -> float:
+    """均方根范数"""
+    return np.sqrt(np.mean(np.square(x)))
+
+
+def select_initial_step(func, t0, y0, f0, t_bound, error_order, atol, rtol, max_step=np.inf) -> float:
+    """Hairer 初始步长估计：使首步的局部误差约为 0.01 倍容差"""
+    interval = abs(t_bound - t0)
+    if interval == 0:
+        return 0.0
+    direction = np.sign(t_bound - t0)
+    scale = atol + np.abs(y0) * rtol
+    d0 = _rms(y0 / scale)
+    d1 = _rms(f0 / scale)
+    h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+    h0 = min(h0, interval)
+    f1 = func(t0 + direction * h0, y0 + direction * h0 * f0)
+    d2 = _rms((f1 - f0) / scale) / h0
+    if d1 <= 1e-15 and d2 <= 1e-15:
+        h1 = max(1e-6, h0 * 1e-3)
+    else:
+        h1 = (0.01 / max(d1, d2)) ** (1 / (error_order + 1))
+    return min(100 * h0, h1, interval, max_step)
+
+
+def _hermite(t, t0, h, y0, y1, f0, f1) -> np.ndarray:
+    """三次埃尔米特插值；t 为 (k,) 逐行时刻，其余为 (k, n) 的步首/步末状态与斜率"""
+    s = ((t - t0) / h)[:, None]
+    s2 = s * s
+    s3 = s2 * s
+    return ((2 * s3 - 3 * s2 + 1) * y0 + (s3 - 2 * s2 + s) * (h * f0)
+            + (3 * s2 - 2 * s3) * y1 + (s3 - s2) * (h * f1))
+
+
+class EventTracker:
+    """
+    事件检测与定位
+    事件函数 event(t, y) 返回标量，约定同 scipy.integrate.solve_ivp：
+      - 属性 terminal=True 时首次发生即终止（系综模式下只终止该成员）
+      - 属性 direction > 0 / < 0 只检测由负到正 / 由正到负的穿越，0（默认）两者都检测
+    系综模式下 event(t, Y) 须按行向量化返回 (M,)；根精化时 Y 为发生穿越的成员子集，t 为逐行的 (k,) 时刻数组
+    每步只在步末求一次事件函数值，仅对变号的成员在插值多项式上用 Illinois 法求根
+    """
+    MAX_ITER = 60
+
+    def __init__(self, events, t0, y0, ensemble=None):
+        self.events = list(events) if isinstance(events, (list, tuple)) else [events]
+        y0 = np.asarray(y0, dtype=np.float64)
+        self.ensemble = y0.ndim > 1 if ensemble is None else ensemble
+        self.shape = y0.shape[1:] if self.ensemble else y0.shape
+        self.n_members = y0.shape[0] if self.ensemble else 1
+        self.terminal = np.array([bool(getattr(e, 'terminal', False)) for e in self.events])
+        self.direction = np.array([float(getattr(e, 'direction', 0.0)) for e in self.events])
+        self.alive = np.ones(self.n_members, dtype=bool)
+        self.t_stop = None
+        self._t_terminal = np.full(self.n_members, np.nan)
+        self._records = [[] for _ in self.events]  # 每个事件的 (成员, 时刻, 状态) 批次
+        self.g = self._values(t0, y0)
+
+    def _call(self, event, t, Y) -> np.ndarray:
+        if self.ensemble:
+            return np.asarray(event(t, Y.reshape((-1,) + self.shape)), dtype=np.float64).reshape(-1)
+        return np.array([event(float(np.ravel(t)[0]), Y.reshape(self.shape))], dtype=np.float64)
+
+    def _values(self, t, y) -> np.ndarray:
+        Y = y.reshape(self.n_members, -1)
+        return np.array([self._call(e, t, Y) for e in self.events])
+
+    def update(self, t_old, t_new, y_new, interpolant, moved=None):
+        """
+        步末检测事件
+        :param interpolant: interpolant(members) -> interp(t, idx)，给出成员 idx 在逐行时刻 t 的状态 (k, n)；
+                            members 为本步发生穿越的成员，便于只为它们准备插值数据
+        :param moved: 本步实际推进的成员掩码（None 表示全部存活成员）
+        :return: None 或本步终止的 (成员, 时刻, 状态)
+        """
+        g_old = self.g
+        g_new = self._values(t_new, y_new)
+        self.g = g_new
+        moved = self.alive if moved is None else moved & self.alive
+        up = (g_old < 0) & (g_new >= 0)
+        down = (g_old > 0) & (g_new <= 0)
+        d = self.direction[:, None]
+        hit = ((up & (d >= 0)) | (down & (d <= 0))) & moved
+        if not hit.any():
+            return None
+
+        members = np.flatnonzero(hit.any(axis=0))
+        interp = interpolant(members)
+        h = t_new - t_old
+        stop = np.full(self.n_members, np.inf)  # 终止事件在步内的相对位置
+        roots = []
+        for k, event in enumerate(self.events):
+            idx = np.flatnonzero(hit[k])
+            s = self._refine(event, t_old, h, idx, g_old[k, idx], g_new[k, idx], interp) if idx.size else None
+            roots.append((idx, s))
+            if idx.size and self.terminal[k]:
+                stop[idx] = np.minimum(stop[idx], s)
+        for k, (idx, s) in enumerate(roots):
+            if idx.size:
+                keep = s <= stop[idx]  # 终止之后的事件不再发生
+                idx, t_root = idx[keep], t_old + s[keep] * h
+                self._records[k].append((idx, t_root, interp(t_root, idx)))
+
+        term = np.flatnonzero(np.isfinite(stop))
+        if term.size == 0:
+            return None
+        self.alive[term] = False
+        t_term = t_old + stop[term] * h
+        self._t_terminal[term] = t_term
+        if not self.alive.any():
+            self.t_stop = t_term.max()
+        return term, t_term, interp(t_term, term)
+
+    def after_step(self, workspace, func, t_old, dt, y_old, y_new, moved=None) -> bool:
+        """
+        固定步长主循环的事件检测：步内以三次埃尔米特插值定位，斜率只对发生穿越的成员补算
+        终止成员的状态就地改写为事件时刻的状态；全部成员终止时返回 True
+        """
+        t_new = t_old + dt
+        Y0 = y_old.reshape(self.n_members, -1)
+        Y1 = y_new.reshape(self.n_members, -1)
+
+        def interpolant(members):
+            y0, y1 = Y0[members], Y1[members]
+            if self.ensemble:
+                f0 = workspace.derivative(func, t_old, y0)
+                f1 = workspace.derivative(func, t_new, y1)
+            else:
+                f0 = workspace.derivative(func, t_old, y_old).reshape(1, -1)
+                f1 = workspace.derivative(func, t_new, y_new).reshape(1, -1)
+
+            def interp(t, idx):
+                pos = np.searchsorted(members, idx)
+                return _hermite(t, t_old, dt, y0[pos], y1[pos], f0[pos], f1[pos])
+            return interp
+
+        terminated = self.update(t_old, t_new, y_new, interpolant, moved)
+        if terminated is not None:
+            Y1[terminated[0]] = terminated[2]
+        return not self.alive.any()
+
+    def _refine(self, event, t_old, h, idx, g_lo, g_hi, interp) -> np.ndarray:
+        """Illinois 法（改进的试位法）在步内相对位置 [0, 1] 上逐成员求根，全部成员同时迭代"""
+        lo = np.zeros(idx.size)
+        hi = np.ones(idx.size)
+        g_lo = g_lo.copy()
+        g_hi = g_hi.copy()
+        side = np.zeros(idx.size, dtype=np.int8)
+        xtol = 4 * EPS * max(abs(t_old), abs(t_old + h), 1.0) / abs(h)
+        for _ in range(self.MAX_ITER):
+            a = np.flatnonzero(hi - lo > xtol)
+            if a.size == 0:
+                break
+            s = np.clip((lo[a] * g_hi[a] - hi[a] * g_lo[a]) / (g_hi[a] - g_lo[a]), lo[a], hi[a])
+            t = t_old + s * h
+            gs = self._call(event, t, interp(t, idx[a]))
+            zero = gs == 0
+            left = (np.sign(gs) == np.sign(g_lo[a])) & ~zero  # 根在 [s, hi]
+            right = ~left & ~zero
+            al, ar, az = a[left], a[right], a[zero]
+            lo[al], g_lo[al] = s[left], gs[left]
+            g_hi[al[side[al] == -1]] /= 2
+            side[al] = -1
+            hi[ar], g_hi[ar] = s[right], gs[right]
+            g_lo[ar[side[ar] == 1]] /= 2
+            side[ar] = 1
+            lo[az] = hi[az] = s[zero]
+        return (lo + hi) / 2
+
+    def result(self) -> dict:
+        """事件信息：每个事件的发生时刻与状态（系综模式下另含成员编号与各成员终止时刻）"""
+        out = {'t_events': [], 'y_events': []}
+        if self.ensemble:
+            out['member_events'] = []
+        for records in self._records:
+            if records:
+                member = np.concatenate([r[0] for r in records])
+                t = np.concatenate([r[1] for r in records])
+                y = np.concatenate([r[2] for r in records])
+            else:
+                member, t, y = np.empty(0, dtype=np.intp), np.empty(0), np.empty((0, int(np.prod(self.shape))))
+            out['t_events'].append(t)
+            out['y_events'].append(y.reshape((-1,) + self.shape))
+            if self.ensemble:
+                out['member_events'].append(member)
+        if self.ensemble:
+            out['t_terminal'] = self._t_terminal.copy()
+        return out
+
+
+class AdaptiveRKStepper:
+    """
+    嵌入式龙格-库塔自适应步进器
+    误差范数：err / (atol + rtol·max(|y|, |y_new|)) 的均方根 ≤ 1 时接受该步；
+    步长由 PI 控制器给出；末级斜率即下一步首级斜率（FSAL），每步只需 n_stages 次右端函数调用
+    """
+    SAFETY = 0.9
+    MIN_FACTOR = 0.2
+    MAX_FACTOR = 10.0
+
+    def __init__(self, func, t0, y0, t_bound, method='RK45', atol=1e-6, rtol=1e-3,
+                 first_step=None, max_step=np.inf):
+        self.method = method.upper()
+        if self.method == 'RK45':
+            self.A, self.B, self.C = tableau.RK45_A, tableau.RK45_B, tableau.RK45_C
+            self.n_stages = tableau.RK45_N_STAGES
+            self.error_order = tableau.RK45_ERROR_ORDER
+            n_rows = self.n_stages + 1
+        elif self.method == 'DOP853':
+            self.A, self.B, self.C = tableau.DOP853_A, tableau.DOP853_B, tableau.DOP853_C
+            self.n_stages = tableau.DOP853_N_STAGES
+            self.error_order = tableau.DOP853_ERROR_ORDER
+            n_rows = tableau.DOP853_N_STAGES_EXTENDED
+        else:
+            raise ValueError(f"未知的自适应积分方法: {method}")
+
+        self.func = func
+        self.nfev = 0
+        self.atol = atol
+        self.rtol = rtol
+        self.max_step = max_step
+        self.t = t0
+        self.t_bound = t_bound
+        self.direction = np.sign(t_bound - t0) if t_bound != t0 else 1.0
+        self.y = np.array(y0, dtype=np.float64)
+        self.f = self._call(t0, self.y)
+        self.K = np.empty((n_rows,) + self.y.shape)
+        self.n_accepted = 0
+        self.n_rejected = 0
+        self.t_old = None
+        self.y_old = None
+        self._err_prev = None
+        self._dense_coeffs = None
+        # PI 控制器指数（Gustafsson）
+        k = self.error_order + 1
+        self._alpha = 0.7 / k
+        self._beta = 0.4 / k
+        self.h_abs = abs(first_step) if first_step is not None else select_initial_step(
+            self._call, t0, self.y, self.f, t_bound, self.error_order, atol, rtol, max_step)
+
+    def _call(self, t, y):
+        self.nfev += 1
+        return np.asarray(self.func(t, y), dtype=np.float64)
+
+    def _rk_stages(self, t, y, h):
+        """计算一步的各级斜率，返回 (y_new, f_new)"""
+        K = self.K
+        K[0] = self.f
+        for s in range(1, self.n_stages):
+            dy = np.tensordot(self.A[s, :s], K[:s], axes=1) * h
+            K[s] = self._call(t + self.C[s] * h, y + dy)
+        y_new = y + h * np.tensordot(self.B, K[:self.n_stages], axes=1)
+        f_new = self._call(t + h, y_new)
+        K[self.n_stages] = f_new
+        return y_new, f_new
+
+    def _error_norm(self, h, scale) -> float:
+        K = self.K[:self.n_stages + 1]
+        if self.method == 'RK45':
+            return _rms(h * np.tensordot(tableau.RK45_E, K, axes=1) / scale)
+        # DOP853：5 阶与 3 阶误差估计的组合范数
+        err5 = np.tensordot(tableau.DOP853_E5, K, axes=1) / scale
+        err3 = np.tensordot(tableau.DOP853_E3, K, axes=1) / scale
+        err5_sq = np.sum(err5 ** 2)
+        err3_sq = np.sum(err3 ** 2)
+        if err5_sq == 0 and err3_sq == 0:
+            return 0.0
+        return abs(h) * err5_sq / np.sqrt((err5_sq + 0.01 * err3_sq) * err5.size)
+
+    def step(self):
+        """推进一个被接受的步"""
+        t, y = self.t, self.y
+        min_step = 10 * abs(np.nextafter(t, self.direction * np.inf) - t)
+        h_abs = min(self.h_abs, self.max_step)
+        rejected = False
+        while True:
+            if h_abs < min_step:
+                raise RuntimeError(f"t = {t} 处步长过小，积分失败")
+            t_new = t + self.direction * h_abs
+            if self.direction * (t_new - self.t_bound) > 0:
+                t_new = self.t_bound
+            h = t_new - t
+            h_abs = abs(h)
+            y_new, f_new = self._rk_stages(t, y, h)
+            scale = self.atol + self.rtol * np.maximum(np.abs(y), np.abs(y_new))
+            err = self._error_norm(h, scale)
+            if err < 1:
+                if err == 0:
+                    factor = self.MAX_FACTOR
+                else:
+                    factor = self.SAFETY * err ** -self._alpha
+                    if self._err_prev is not None:
+                        factor *= self._err_prev ** self._beta
+                factor = min(self.MAX_FACTOR, max(self.MIN_FACTOR, factor))
+                if rejected:
+                    factor = min(1.0, factor)
+                self.h_abs = h_abs * factor
+                self._err_prev = max(err, 1e-4)
+                break
+            h_abs *= max(self.MIN_FACTOR, self.SAFETY * err ** (-1 / (self.error_order + 1)))
+            rejected = True
+            self.n_rejected += 1
+
+        self.t_old, self.y_old = t, y
+        self.t, self.y, self.f = t_new, y_new, f_new
+        self._dense_coeffs = None
+        self.n_accepted += 1
+
+    def dense(self, t) -> np.ndarray:
+        """
+        最近一步 [t_old, t] 内的稠密输出插值
+        RK45 直接复用已有各级斜率；DOP853 首次调用时补算 3 个附加级
+        :param t: 标量或 (m,) 时刻数组
+        """
+        t = np.asarray(t, dtype=np.float64)
+        h = self.t - self.t_old
+        x = (t - self.t_old) / h
+        if self._dense_coeffs is None:
+            self._dense_coeffs = self._build_dense()
+        coeffs = self._dense_coeffs
+        x = x.reshape(x.shape + (1,) * self.y.ndim)
+        if self.method == 'RK45':
+            y = np.zeros(t.shape + self.y.shape)
+            for j in range(coeffs.shape[0] - 1, -1, -1):  # 霍纳法则
+                y = (y + coeffs[j]) * x
+            return self.y_old + h * y
+        y = np.zeros(t.shape + self.y.shape)
+        for i, f in enumerate(reversed(coeffs)):
+            y += f
+            y *= x if i % 2 == 0 else (1 - x)
+        return self.y_old + y
+
+    def _build_dense(self):
+        K = self.K
+        h = self.t - self.t_old
+        if self.method == 'RK45':
+            return np.tensordot(tableau.RK45_P, K[:self.n_stages + 1], axes=(0, 0))
+        extra_a = self.A[self.n_stages + 1:]
+        extra_c = self.C[self.n_stages + 1:]
+        for s, (a, c) in enumerate(zip(extra_a, extra_c), start=self.n_stages + 1):
+            dy = np.tensordot(a[:s], K[:s], axes=1) * h
+            K[s] = self._call(self.t_old + c * h, self.y_old + dy)
+        F = np.empty((tableau.DOP853_INTERPOLATOR_POWER,) + self.y.shape)
+        f_old = K[0]
+        delta_y = self.y - self.y_old
+        F[0] = delta_y
+        F[1] = h * f_old - delta_y
+        F[2] = 2 * delta_y - h * (self.f + f_old)
+        F[3:] = h * np.tensordot(tableau.DOP853_D, K, axes=1)
+        return F
+
+
+def _compose(base, weights):
+    """以若干权重复合二阶基本格式，并合并相邻的同类子步"""
+    ops = []
+    for w in weights:
+        for kind, c in base:
+            if ops and ops[-1][0] == kind:
+                ops[-1] = (kind, ops[-1][1] + w * c)
+            else:
+                ops.append((kind, w * c))
+    return tuple(ops)
+
+
+_VELOCITY_VERLET = (('kick', 0.5), ('drift', 1.0), ('kick', 0.5))
+_POSITION_VERLET = (('drift', 0.5), ('kick', 1.0), ('drift', 0.5))
+_CBRT2 = 2 ** (1 / 3)
+_TRIPLE_JUMP = (1 / (2 - _CBRT2), -_CBRT2 / (2 - _CBRT2), 1 / (2 - _CBRT2))
+# Yoshida (1990) 六阶 A 组解
+_Y6_W = (0.784513610477560, 0.235573213359357, -1.17767998417887)
+_YOSHIDA6 = _Y6_W + (1 - 2 * sum(_Y6_W),) + _Y6_W[::-1]
+
+# 每种格式为一串 ('kick' | 'drift', 系数) 子步：kick 更新速度 v += c·dt·a(q)，drift 更新位置 q += c·dt·v
+_SYMPLECTIC_SCHEMES = {
+    'velocity': _VELOCITY_VERLET,
+    'position': _POSITION_VERLET,
+    'yoshida4': _compose(_VELOCITY_VERLET, _TRIPLE_JUMP),
+    'yoshida6': _compose(_VELOCITY_VERLET, _YOSHIDA6),
+    'forest_ruth': _compose(_POSITION_VERLET, _TRIPLE_JUMP),
+}
+
+
+class SymplecticWorkspace:
+    """
+    辛积分缓冲区：原地更新 [q, v]，并缓存最近一次加速度
+    位置未变化时复用缓存，故速度 Verlet 等格式每步只需一次力计算；
+    给定 velocity 时漂移步用 q += c·dt·velocity(t, p)，适用于一般可分离哈密顿量
+    """
+
+    def __init__(self, shape, scheme, inplace_accel: bool = False, velocity=None):
+        self.scheme = scheme
+        self.inplace_accel = inplace_accel
+        self.velocity = velocity
+        self.n = shape[-1] // 2
+        self.accel = np.empty(shape[:-1] + (self.n,))
+        self._cached_q = np.empty_like(self.accel)  # 缓存加速度对应的位置（工作区自有缓冲区）
+        self._cached_key = None  # 缓存对应的 (形状, dtype)，None 表示缓存无效
+
+    def _acceleration(self, f, t, q, accel):
+        if self.inplace_accel:
+            f(t, q, accel)
+        else:
+            np.copyto(accel, f(t, q))
+
+    def derivative(self, f, t: float, y: np.ndarray) -> np.ndarray:
+        """状态导数 [v, a(q)]（供事件定位的插值使用），不占用加速度缓存"""
+        q = y[..., :self.n]
+        accel = np.empty_like(q)
+        self._acceleration(f, t, q, accel)
+        v = y[..., self.n:] if self.velocity is None else self.velocity(t, y[..., self.n:])
+        return np.concatenate([np.broadcast_to(v, q.shape), accel], axis=-1)
+
+    def step(self, f, t: float, y: np.ndarray, dt: float, out: np.ndarray = None) -> np.ndarray:
+        if out is None:
+            out = y.copy()
+        elif out is not y:
+            out[...] = y
+        q = out[..., :self.n]
+        v = out[..., self.n:]
+        # 系综掩码压缩后的子集复用缓冲区前若干行
+        accel = self.accel if q.shape == self.accel.shape else self.accel[:q.shape[0]]
+        cached_q = self._cached_q if q.shape == self._cached_q.shape else self._cached_q[:q.shape[0]]
+        # 仅当本步位置与缓存位置逐元素相同时复用加速度（固定步长主循环中上一步输出即本步输入）
+        valid = self._cached_key == (y.shape, y.dtype) and np.array_equal(q, cached_q)
+        t_q = t
+        for kind, c in self.scheme:
+            if kind == 'drift':
+                q += (c * dt) * (v if self.velocity is None else self.velocity(t_q, v))
+                t_q += c * dt
+                valid = False
+            else:
+                if not valid:
+                    self._acceleration(f, t_q, q, accel)
+                    valid = True
+                v += (c * dt) * accel
+        if valid:
+            np.copyto(cached_q, q)
+            self._cached_key = (out.shape, out.dtype)
+        else:
+            self._cached_key = None
+        return out
+
+
+class _ImplicitStepper:
+    """
+    隐式刚性求解器的公共部分：右端函数计数、雅可比矩阵来源与线性系统 LU 分解
+    雅可比矩阵来源依次为：用户给定 jac（常矩阵或 jac(t, y) 回调）、
+    按 jac_sparsity 分组的有限差分（CSR 稀疏）、逐列有限差分（稠密）
+    """
+    NEWTON_MAXITER = 4
+    MIN_FACTOR = 0.2
+    MAX_FACTOR = 10.0
+
+    def __init__(self, func, t0, y0, t_bound, atol, rtol, max_step, jac, jac_sparsity):
+        self.func = func
+        self.nfev = 0
+        self.njev = 0
+        self.nlu = 0
+        self.n_accepted = 0
+        self.n_rejected = 0
+        self.atol = atol
+        self.rtol = max(rtol, 100 * EPS)
+        self.max_step = max_step
+        self.t = t0
+        self.t_old = None
+        self.t_bound = t_bound
+        self.direction = np.sign(t_bound - t0) if t_bound != t0 else 1.0
+        self.y = np.array(y0, dtype=np.float64)
+        if self.y.ndim != 1:
+            raise ValueError("隐式求解器的状态必须为一维数组")
+        self.f = self._call(t0, self.y)
+        self.newton_tol = max(10 * EPS / self.rtol, min(0.03, self.rtol ** 0.5))
+
+        n = self.y.size
+        if callable(jac):
+            first = jac(t0, self.y)
+            self.sparse = issparse(first)
+            self._jac_func = lambda t, y, f=None: jac(t, y)
+            self.J = as_jacobian(first, self.sparse)
+            self.njev += 1
+        elif jac is not None:
+            self.sparse = issparse(jac)
+            self._jac_func = None  # 常雅可比矩阵，永不重算
+            self.J = as_jacobian(jac, self.sparse)
+        else:
+            fd = FiniteDifferenceJacobian(self._call, n, jac_sparsity)
+            self.sparse = fd.sparse
+            self._jac_func = fd
+            self.J = as_jacobian(fd(t0, self.y, self.f), self.sparse)
+            self.njev += 1
+        self.I = identity(n, format='csc') if self.sparse else np.eye(n)
+
+    def _call(self, t, y):
+        self.nfev += 1
+        return np.asarray(self.func(t, y), dtype=np.float64)
+
+    def _jacobian(self, t, y, f=None):
+        self.njev += 1
+        return as_jacobian(self._jac_func(t, y, f), self.sparse)
+
+    def _lu(self, A):
+        self.nlu += 1
+        if self.sparse:
+            return splu(csc_matrix(A))
+        return lu_factor(A, overwrite_a=True, check_finite=False)
+
+    def _solve_lu(self, LU, b):
+        if self.sparse:
+            return LU.solve(b)
+        return lu_solve(LU, b, check_finite=False)
+
+    def _step_bounds(self):
+        return 10 * abs(np.nextafter(self.t, self.direction * np.inf) - self.t)
+
+
+class BDFStepper(_ImplicitStepper):
+    """
+    变阶（1~5 阶）变步长 BDF 法，采用准定步长的后向差分阵列实现
+    牛顿迭代复用雅可比矩阵与 (I - c·J) 的 LU 分解：仅在迭代不收敛时重算雅可比矩阵，
+    仅在步长或阶数改变时重新分解
+    """
+    MAX_ORDER = 5
+
+    def __init__(self, func, t0, y0, t_bound, atol=1e-6, rtol=1e-3, first_step=None, max_step=np.inf,
+                 jac=None, jac_sparsity=None, **_):
+        super().__init__(func, t0, y0, t_bound, atol, rtol, max_step, jac, jac_sparsity)
+        self.h_abs = abs(first_step) if first_step is not None else select_initial_step(
+            self._call, t0, self.y, self.f, t_bound, 1, atol, self.rtol, max_step)
+        self.h_abs_old = None
+        orders = np.arange(1, self.MAX_ORDER + 1)
+        self.gamma = np.hstack((0, np.cumsum(1 / orders)))
+        self.alpha = self.gamma
+        self.error_const = 1 / np.arange(1, self.MAX_ORDER + 2)
+
+        self.D = np.zeros((self.MAX_ORDER + 3, self.y.size))
+        self.D[0] = self.y
+        self.D[1] = self.f * self.h_abs * self.direction
+        self.order = 1
+        self.n_equal_steps = 0
+        self.LU = None
+        self._dense = None
+
+    @staticmethod
+    def _compute_R(order, factor):
+        """步长按 factor 缩放时后向差分阵列的变换矩阵"""
+        I = np.arange(1, order + 1)[:, None]
+        J = np.arange(1, order + 1)
+        M = np.zeros((order + 1, order + 1))
+        M[1:, 1:] = (I - 1 - factor * J) / I
+        M[0] = 1
+        return np.cumprod(M, axis=0)
+
+    def _change_D(self, order, factor):
+        R = self._compute_R(order, factor)
+        U = self._compute_R(order, 1)
+        RU = R.dot(U)
+        self.D[:order + 1] = RU.T.dot(self.D[:order + 1])
+
+    def _solve_bdf_system(self, t_new, y_predict, c, psi, LU, scale):
+        """简化牛顿迭代求解 BDF 隐式方程"""
+        d = 0
+        y = y_predict.copy()
+        dy_norm_old = None
+        converged = False
+        rate = None
+        for k in range(self.NEWTON_MAXITER):
+            f = self._call(t_new, y)
+            if not np.all(np.isfinite(f)):
+                break
+            dy = self._solve_lu(LU, c * f - psi - d)
+            dy_norm = _rms(dy / scale)
+            if dy_norm_old is not None:
+                rate = dy_norm / dy_norm_old
+            if rate is not None and (rate >= 1 or
+                                     rate ** (self.NEWTON_MAXITER - k) / (1 - rate) * dy_norm > self.newton_tol):
+                break
+            y += dy
+            d += dy
+            if dy_norm == 0 or (rate is not None and rate / (1 - rate) * dy_norm < self.newton_tol):
+                converged = True
+                break
+            dy_norm_old = dy_norm
+        return converged, k + 1, y, d
+
+    def step(self):
+        t = self.t
+        D = self.D
+        min_step = self._step_bounds()
+        if self.h_abs > self.max_step:
+            h_abs = self.max_step
+            self._change_D(self.order, self.max_step / self.h_abs)
+            self.n_equal_steps = 0
+        elif self.h_abs < min_step:
+            h_abs = min_step
+            self._change_D(self.order, min_step / self.h_abs)
+            self.n_equal_steps = 0
+        else:
+            h_abs = self.h_abs
+
+        order = self.order
+        alpha, gamma, error_const = self.alpha, self.gamma, self.error_const
+        J = self.J
+        LU = self.LU
+        current_jac = self._jac_func is None
+
+        while True:
+            if h_abs < min_step:
+                raise RuntimeError(f"t = {t} 处步长过小，积分失败")
+            h = h_abs * self.direction
+            t_new = t + h
+            if self.direction * (t_new - self.t_bound) > 0:
+                t_new = self.t_bound
+                self._change_D(order, abs(t_new - t) / h_abs)
+                self.n_equal_steps = 0
+                LU = None
+            h = t_new - t
+            h_abs = abs(h)
+
+            y_predict = np.sum(D[:order + 1], axis=0)
+            scale = self.atol + self.rtol * np.abs(y_predict)
+            psi = np.dot(D[1:order + 1].T, gamma[1:order + 1]) / alpha[order]
+            c = h / alpha[order]
+
+            converged = False
+            while not converged:
+                if LU is None:
+                    LU = self._lu(self.I - c * J)
+                converged, n_iter, y_new, d = self._solve_bdf_system(t_new, y_predict, c, psi, LU, scale)
+                if not converged:
+                    if current_jac:
+                        break
+                    J = self._jacobian(t_new, y_predict)
+                    LU = None
+                    current_jac = True
+
+            if not converged:
+                factor = 0.5
+                h_abs *= factor
+                self._change_D(order, factor)
+                self.n_equal_steps = 0
+                LU = None
+                self.n_rejected += 1
+                continue
+
+            safety = 0.9 * (2 * self.NEWTON_MAXITER + 1) / (2 * self.NEWTON_MAXITER + n_iter)
+            scale = self.atol + self.rtol * np.abs(y_new)
+            error = error_const[order] * d
+            error_norm = _rms(error / scale)
+            if error_norm > 1:
+                factor = max(self.MIN_FACTOR, safety * error_norm ** (-1 / (order + 1)))
+                h_abs *= factor
+                self._change_D(order, factor)
+                self.n_equal_steps = 0
+                LU = None
+                self.n_rejected += 1
+                continue
+            break
+
+        self.n_accepted += 1
+        self.n_equal_steps += 1
+        self.t_old = t
+        self.t = t_new
+        self.y = y_new
+        self.h_abs = h_abs
+        self.J = J
+        self.LU = LU
+
+        # 更新后向差分阵列
+        D[order + 2] = d - D[order + 1]
+        D[order + 1] = d
+        for i in reversed(range(order + 1)):
+            D[i] += D[i + 1]
+
+        if self.n_equal_steps >= order + 1:
+            # 以相邻阶的误差估计选择新阶数与步长
+            error_m_norm = _rms(error_const[order - 1] * D[order] / scale) if order > 1 else np.inf
+            error_p_norm = _rms(error_const[order + 1] * D[order + 2] / scale) \
+                if order < self.MAX_ORDER else np.inf
+            error_norms = np.array([error_m_norm, error_norm, error_p_norm])
+            with np.errstate(divide='ignore'):
+                factors = error_norms ** (-1 / np.arange(order, order + 3))
+            delta_order = int(np.argmax(factors)) - 1
+            order += delta_order
+            self.order = order
+            factor = min(self.MAX_FACTOR, safety * np.max(factors))
+            self.h_abs *= factor
+            self._change_D(order, factor)
+            self.n_equal_steps = 0
+            self.LU = None
+
+        self._dense = (self.h_abs * self.direction, self.order, self.D[:self.order + 1].copy())
+
+    def dense(self, t) -> np.ndarray:
+        """由后向差分阵列构造的插值多项式"""
+        t = np.asarray(t, dtype=np.float64)
+        h, order, D = self._dense
+        t_shift = self.t - h * np.arange(order)
+        denom = h * (1 + np.arange(order))
+        x = (t[..., None] - t_shift) / denom
+        p = np.cumprod(x, axis=-1)
+        return D[0] + p @ D[1:]
+
+
+class RadauStepper(_ImplicitStepper):
+    """
+    5 阶 Radau IIA 隐式龙格-库塔法（3 级配置法）
+    将 3n 维牛顿系统经特征分解变换为一个实系统与一个复系统，分别 LU 分解并跨步复用
+    """
+    NEWTON_MAXITER = 6
+    _S6 = 6 ** 0.5
+    C = np.array([(4 - _S6) / 10, (4 + _S6) / 10, 1])
+    E = np.array([-13 - 7 * _S6, -13 + 7 * _S6, -1]) / 3
+    MU_REAL = 3 + 3 ** (2 / 3) - 3 ** (1 / 3)
+    MU_COMPLEX = 3 + 0.5 * (3 ** (1 / 3) - 3 ** (2 / 3)) - 0.5j * (3 ** (5 / 6) + 3 ** (7 / 6))
+    T = np.array([
+        [0.09443876248897524, -0.14125529502095421, 0.03002919410514742],
+        [0.25021312296533332, 0.20412935229379994, -0.38294211275726192],
+        [1, 1, 0]])
+    TI = np.array([
+        [4.17871859155190428, 0.32768282076106237, 0.52337644549944951],
+        [-4.17871859155190428, -0.32768282076106237, 0.47662355450055044],
+        [0.50287263494578682, -2.57192694985560522, 0.59603920482822492]])
+    TI_REAL = TI[0]
+    TI_COMPLEX = TI[1] + 1j * TI[2]
+    # 稠密输出多项式系数
+    P = np.array([
+        [13 / 3 + 7 * _S6 / 3, -23 / 3 - 22 * _S6 / 3, 10 / 3 + 5 * _S6],
+        [13 / 3 - 7 * _S6 / 3, -23 / 3 + 22 * _S6 / 3, 10 / 3 - 5 * _S6],
+        [1 / 3, -8 / 3, 10 / 3]])
+
+    def __init__(self, func, t0, y0, t_bound, atol=1e-6, rtol=1e-3, first_step=None, max_step=np.inf,
+                 jac=None, jac_sparsity=None, **_):
+        super().__init__(func, t0, y0, t_bound, atol, rtol, max_step, jac, jac_sparsity)
+        self.h_abs = abs(first_step) if first_step is not None else select_initial_step(
+            self._call, t0, self.y, self.f, t_bound, 3, atol, self.rtol, max_step)
+        self.h_abs_old = None
+        self.error_norm_old = None
+        self.current_jac = True
+        self.LU_real = None
+        self.LU_complex = None
+        self.y_old = None
+        self.Z = None
+        self._Q = None
+
+    def _solve_collocation_system(self, t, y, h, Z0, scale, LU_real, LU_complex):
+        n = y.shape[0]
+        M_real = self.MU_REAL / h
+        M_complex = self.MU_COMPLEX / h
+        W = self.TI.dot(Z0)
+        Z = Z0
+        F = np.empty((3, n))
+        ch = h * self.C
+        dW_norm_old = None
+        dW = np.empty_like(W)
+        converged = False
+        rate = None
+        for k in range(self.NEWTON_MAXITER):
+            for i in range(3):
+                F[i] = self._call(t + ch[i], y + Z[i])
+            if not np.all(np.isfinite(F)):
+                break
+            f_real = F.T.dot(self.TI_REAL) - M_real * W[0]
+            f_complex = F.T.dot(self.TI_COMPLEX) - M_complex * (W[1] + 1j * W[2])
+            dW_real = self._solve_lu(LU_real, f_real)
+            dW_complex = self._solve_lu(LU_complex, f_complex)
+            dW[0] = dW_real
+            dW[1] = dW_complex.real
+            dW[2] = dW_complex.imag
+            dW_norm = _rms(dW / scale)
+            if dW_norm_old is not None:
+                rate = dW_norm / dW_norm_old
+            if rate is not None and (rate >= 1 or
+                                     rate ** (self.NEWTON_MAXITER - k) / (1 - rate) * dW_norm > self.newton_tol):
+                break
+            W += dW
+            Z = self.T.dot(W)
+            if dW_norm == 0 or (rate is not None and rate / (1 - rate) * dW_norm < self.newton_tol):
+                converged = True
+                break
+            dW_norm_old = dW_norm
+        return converged, k + 1, Z, rate
+
+    @staticmethod
+    def _predict_factor(h_abs, h_abs_old, error_norm, error_norm_old):
+        """Gustafsson 预测型步长因子"""
+        if error_norm_old is None or h_abs_old is None or error_norm == 0:
+            multiplier = 1
+        else:
+            multiplier = h_abs / h_abs_old * (error_norm_old / error_norm) ** 0.25
+        with np.errstate(divide='ignore'):
+            return min(1, multiplier) * error_norm ** -0.25
+
+    def step(self):
+        t, y, f = self.t, self.y, self.f
+        min_step = self._step_bounds()
+        if self.h_abs > self.max_step:
+            h_abs, h_abs_old, error_norm_old = self.max_step, None, None
+        elif self.h_abs < min_step:
+            h_abs, h_abs_old, error_norm_old = min_step, None, None
+        else:
+            h_abs, h_abs_old, error_norm_old = self.h_abs, self.h_abs_old, self.error_norm_old
+
+        J = self.J
+        LU_real, LU_complex = self.LU_real, self.LU_complex
+        current_jac = self.current_jac
+        rejected = False
+        while True:
+            if h_abs < min_step:
+                raise RuntimeError(f"t = {t} 处步长过小，积分失败")
+            h = h_abs * self.direction
+            t_new = t + h
+            if self.direction * (t_new - self.t_bound) > 0:
+                t_new = self.t_bound
+            h = t_new - t
+            h_abs = abs(h)
+
+            # 以上一步的稠密输出外推作为配置点初值
+            Z0 = np.zeros((3, y.shape[0])) if self._Q is None else self.dense(t + h * self.C) - y
+            scale = self.atol + np.abs(y) * self.rtol
+
+            converged = False
+            while not converged:
+                if LU_real is None or LU_complex is None:
+                    LU_real = self._lu(self.MU_REAL / h * self.I - J)
+                    LU_complex = self._lu(self.MU_COMPLEX / h * self.I - J)
+                converged, n_iter, Z, rate = self._solve_collocation_system(t, y, h, Z0, scale,
+                                                                            LU_real, LU_complex)
+                if not converged:
+                    if current_jac or self._jac_func is None:
+                        break
+                    J = self._jacobian(t, y, f)
+                    current_jac = True
+                    LU_real = LU_complex = None
+
+            if not converged:
+                h_abs *= 0.5
+                LU_real = LU_complex = None
+                self.n_rejected += 1
+                continue
+
+            y_new = y + Z[-1]
+            ZE = Z.T.dot(self.E) / h
+            error = self._solve_lu(LU_real, f + ZE)
+            scale = self.atol + np.maximum(np.abs(y), np.abs(y_new)) * self.rtol
+            error_norm = _rms(error / scale)
+            safety = 0.9 * (2 * self.NEWTON_MAXITER + 1) / (2 * self.NEWTON_MAXITER + n_iter)
+            if rejected and error_norm > 1:
+                error = self._solve_lu(LU_real, self._call(t, y + error) + ZE)
+                error_norm = _rms(error / scale)
+            if error_norm > 1:
+                factor = self._predict_factor(h_abs, h_abs_old, error_norm, error_norm_old)
+                h_abs *= max(self.MIN_FACTOR, safety * factor)
+                LU_real = LU_complex = None
+                rejected = True
+                self.n_rejected += 1
+                continue
+            break
+
+        recompute_jac = self._jac_func is not None and n_iter > 2 and rate > 1e-3
+        factor = self._predict_factor(h_abs, h_abs_old, error_norm, error_norm_old)
+        factor = min(self.MAX_FACTOR, safety * factor)
+        if not recompute_jac and factor < 1.2:
+            factor = 1  # 步长变化不大时保持不变，以复用 LU 分解
+        else:
+            LU_real = LU_complex = None
+
+        f_new = self._call(t_new, y_new)
+        if recompute_jac:
+            J = self._jacobian(t_new, y_new, f_new)
+            current_jac = True
+        elif self._jac_func is not None:
+            current_jac = False
+
+        self.n_accepted += 1
+        self.h_abs_old = self.h_abs
+        self.error_norm_old = error_norm
+        self.h_abs = h_abs * factor
+        self.t_old, self.y_old = t, y
+        self.t, self.y, self.f = t_new, y_new, f_new
+        self.Z = Z
+        self.LU_real, self.LU_complex = LU_real, LU_complex
+        self.current_jac = current_jac
+        self.J = J
+        self._Q = Z.T.dot(self.P)
+
+    def dense(self, t) -> np.ndarray:
+        """配置多项式插值（亦用于下一步的初值外推）"""
+        t = np.asarray(t, dtype=np.float64)
+        x = (t - self.t_old) / (self.t - self.t_old)
+        p = np.cumprod(np.repeat(x[..., None], self._Q.shape[1], axis=-1), axis=-1)
+        return self.y_old + p @ self._Q.T
@@ -0,0 +1,81 @@
+"""
+雅可比矩阵工具
+有限差分雅可比矩阵（稠密 / 按稀疏结构分组）与列分组算法，供隐式求解器使用
+"""
+import numpy as np
+from scipy.sparse import csc_matrix, csr_matrix, issparse
+
+EPS = np.finfo(float).eps
+
+
+def group_columns(sparsity) -> np.ndarray:
+    """
+    贪心列分组：同组各列的非零行互不重叠，可用一次扰动同时求出整组列的差分
+    :param sparsity: (n, n) 稀疏结构（稠密布尔数组或稀疏矩阵），非零处表示 ∂f_i/∂y_j 可能非零
+    :return: (n,) 各列的组号
+    """
+    pattern = csc_matrix(sparsity, dtype=bool)
+    n_rows, n_cols = pattern.shape
+    groups = np.full(n_cols, -1, dtype=np.intp)
+    occupied = []  # 每组已占用的行
+    for j in range(n_cols):
+        rows = pattern.indices[pattern.indptr[j]:pattern.indptr[j + 1]]
+        for g, used in enumerate(occupied):
+            if not used[rows].any():
+                used[rows] = True
+                groups[j] = g
+                break
+        else:
+            used = np.zeros(n_rows, dtype=bool)
+            used[rows] = True
+            occupied.append(used)
+            groups[j] = len(occupied) - 1
+    return groups
+
+
+class FiniteDifferenceJacobian:
+    """
+    前向差分雅可比矩阵
+    给定稀疏结构时按列分组扰动，每次求值只需“组数”次右端函数调用，结果为 CSR 矩阵；
+    否则逐列扰动，返回稠密数组
+    """
+
+    def __init__(self, func, n: int, sparsity=None):
+        self.func = func
+        self.n = n
+        if sparsity is None:
+            self.groups = np.arange(n)
+            self.rows = self.cols = None
+        else:
+            pattern = csr_matrix(sparsity, dtype=bool).tocoo()
+            self.rows, self.cols = pattern.row, pattern.col
+            self.groups = group_columns(pattern)
+        self.n_groups = int(self.groups.max()) + 1 if n else 0
+
+    @property
+    def sparse(self) -> bool:
+        return self.rows is not None
+
+    def __call__(self, t: float, y: np.ndarray, f0: np.ndarray = None):
+        if f0 is None:
+            f0 = np.asarray(self.func(t, y), dtype=np.float64)
+        sign = np.where(y >= 0, 1.0, -1.0)
+        h = np.sqrt(EPS) * sign * np.maximum(1.0, np.abs(y))
+        h = (y + h) - y  # 使步长在浮点上精确可表示
+        diffs = np.empty((self.n_groups, self.n))
+        for g in range(self.n_groups):
+            in_group = self.groups == g
+            y_pert = y.copy()
+            y_pert[in_group] += h[in_group]
+            diffs[g] = np.asarray(self.func(t, y_pert), dtype=np.float64) - f0
+        if not self.sparse:
+            return diffs.T / h  # 逐列扰动时组号即列号
+        values = diffs[self.groups[self.cols], self.rows] / h[self.cols]
+        return csr_matrix((values, (self.rows, self.cols)), shape=(self.n, self.n))
+
+
+def as_jacobian(matrix, sparse: bool):
+    """统一雅可比矩阵的存储格式（稀疏模式下为 CSC，便于 LU 分解）"""
+    if sparse:
+        return csc_matrix(matrix, dtype=np.float64)
+    return matrix.toarray() if issparse(matrix) else np.asarray(matrix, dtype=np.float64)
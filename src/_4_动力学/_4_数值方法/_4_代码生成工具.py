@@ -0,0 +1,138 @@
+"""
+符号表达式代码生成
+将 SymPy 表达式经公共子表达式消除（CSE）后生成 NumPy 向量化的 Python 源码，
+源码为纯文本，可直接缓存，加载时只需一次 exec
+"""
+import numpy as np
+from sympy import Symbol, cse, numbered_symbols, sympify
+from sympy.printing.numpy import NumPyPrinter
+
+
+def generate_source(name: str, args, exprs, use_cse: bool = True) -> str:
+    """
+    生成向量化函数源码
+    :param name: 函数名
+    :param args: 参数符号（或函数 / 导数等原子表达式）列表，生成函数按此顺序接收数组参数
+    :param exprs: 表达式列表，生成函数返回同长度元组；常数项返回标量，由调用方广播
+    :param use_cse: 是否对全部表达式统一做公共子表达式消除
+    :return: Python 源码
+    """
+    arg_symbols = [Symbol(f'_a{i}') for i in range(len(args))]
+    substitutions = dict(zip(args, arg_symbols))
+    exprs = [sympify(e).xreplace(substitutions) for e in exprs]
+    if use_cse:
+        replacements, reduced = cse(exprs, symbols=numbered_symbols('_x'))
+    else:
+        replacements, reduced = [], exprs
+
+    printer = NumPyPrinter()
+    lines = [f"def {name}({', '.join(map(str, arg_symbols))}):"]
+    for symbol, expr in replacements:
+        lines.append(f"    {symbol} = {printer.doprint(expr)}")
+    lines.append(f"    return ({''.join(printer.doprint(e) + ', ' for e in reduced)})")
+    return '\n'.join(lines) + '\n'
+
+
+def load_source(source: str, name: str):
+    """执行生成的源码并返回其中的函数"""
+    namespace = {'numpy': np}
+    exec(compile(source, f'<generated {name}>', 'exec'), namespace)
+    return namespace[name]
+
+
+def resolve_params(params, names, defaults):
+    """
+    将参数值整理为与 names 同序的列表
+    :param params: None（使用 defaults）、按 names 顺序的序列，或以符号 / 名称为键的字典
+    """
+    if params is None:
+        params = defaults
+    if params is None:
+        if names:
+            raise ValueError(f"缺少参数值: {', '.join(names)}")
+        return []
+    if isinstance(params, dict):
+        by_name = {str(k): v for k, v in params.items()}
+        missing = [n for n in names if n not in by_name]
+        if missing:
+            raise ValueError(f"缺少参数值: {', '.join(missing)}")
+        return [by_name[n] for n in names]
+    params = list(params)
+    if len(params) != len(names):
+        raise ValueError(f"参数个数应为 {len(names)}，实际为 {len(params)}")
+    return params
+
+
+def generate_explicit_ode(t, state, exprs, params, use_cse: bool = True, jacobian: bool = False) -> dict:
+    """
+    为显式一阶系统 dy/dt = f(t, y, params) 生成源码
+    源码含 'rhs'；jacobian=True 时另含 'rhs_jac'，其输出为右端项与雅可比矩阵非零元，二者共享一次 CSE
+    :param state: 状态符号，顺序即 y 的分量顺序
+    :param exprs: 与 state 等长的右端表达式
+    :return: {'source', 'param_names', 'jac_index'}，可直接缓存
+    """
+    args = (t,) + tuple(state) + tuple(params)
+    source = generate_source('rhs', args, exprs, use_cse)
+    jac_index = None
+    if jacobian:
+        entries = [(i, j, e.diff(y)) for i, e in enumerate(exprs) for j, y in enumerate(state)]
+        entries = [(i, j, d) for i, j, d in entries if d != 0]
+        jac_index = [(i, j) for i, j, _ in entries]
+        source += '\n' + generate_source('rhs_jac', args, list(exprs) + [d for _, _, d in entries], use_cse)
+    return {'source': source, 'param_names': [str(p) for p in params], 'jac_index': jac_index}
+
+
+class CompiledODE:
+    """
+    编译后的显式一阶系统右端函数 f(t, y, params)
+    y 为 (M, n) 时按行向量化，参数值可为标量或 (M,) 数组（逐成员参数）；
+    省略 params 时使用编译时给定的默认值，故可直接传给 ODESolver
+    """
+    FUNCTION = 'rhs'
+
+    def __init__(self, source: str, n_state: int, param_names, values=None, jac_index=None):
+        self.source = source
+        self.n = n_state
+        self.param_names = list(param_names)
+        self.values = values
+        self.jac_index = jac_index
+        self._func = load_source(source, self.FUNCTION)
+        self._jac_func = load_source(source, self.FUNCTION + '_jac') if jac_index is not None else None
+        self._defaults = resolve_params(values, self.param_names, None) \
+            if values is not None or not self.param_names else None
+
+    def _values(self, params):
+        if params is None and self._defaults is not None:
+            return self._defaults
+        return resolve_params(params, self.param_names, self.values)
+
+    def __call__(self, t, y, params=None) -> np.ndarray:
+        y = np.asarray(y, dtype=np.float64)
+        out = self._func(t, *np.moveaxis(y, -1, 0), *self._values(params))
+        dydt = np.empty(y.shape)
+        for i, value in enumerate(out):
+            dydt[..., i] = value
+        return dydt
+
+    def rhs_and_jacobian(self, t, y, params=None):
+        """一次调用同时求右端项与雅可比矩阵 ∂f/∂y（形状 (..., n, n)）"""
+        if self._jac_func is None:
+            raise ValueError("编译时未生成雅可比矩阵（需 jacobian=True）")
+        y = np.asarray(y, dtype=np.float64)
+        out = self._jac_func(t, *np.moveaxis(y, -1, 0), *self._values(params))
+        dydt = np.empty(y.shape)
+        for i in range(self.n):
+            dydt[..., i] = out[i]
+        J = np.zeros(y.shape + (self.n,))
+        for (i, j), value in zip(self.jac_index, out[self.n:]):
+            J[..., i, j] = value
+        return dydt, J
+
+    def jacobian(self, t, y, params=None) -> np.ndarray:
+        """解析雅可比矩阵 ∂f/∂y，可作为隐式求解器的 jac(t, y)"""
+        return self.rhs_and_jacobian(t, y, params)[1]
+
+    def bind(self, params):
+        """固定参数值，返回 f(t, y) 形式的右端函数"""
+        values = resolve_params(params, self.param_names, None)
+        return lambda t, y: self(t, y, values)
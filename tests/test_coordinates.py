@@ -0,0 +1,103 @@
+# tests/test_coordinates.py
+import numpy as np
+import pytest
+from src._1_核心基础模块._2_坐标系转换 import CoordinateTransform
+
+
+def test_numeric_rotation_matrix_matches_symbolic():
+    for axis in 'xyz':
+        symbolic = np.array(CoordinateTransform.rotation_matrix(axis, 0.7, symbolic=True), dtype=float)
+        assert np.allclose(CoordinateTransform.rotation_matrix(axis, 0.7), symbolic)
+
+    stack = CoordinateTransform.rotation_matrix('z', np.array([0.0, np.pi / 2]))
+    assert stack.shape == (2, 3, 3)
+    assert np.allclose(stack[1] @ [1, 0, 0], [0, 1, 0])
+
+
+def test_vectorized_coordinate_round_trip():
+    points = np.random.default_rng(0).normal(size=(100, 3))
+    spherical = CoordinateTransform.points_to_spherical(points)
+    assert np.allclose(CoordinateTransform.points_from_spherical(spherical), points)
+    cylindrical = CoordinateTransform.points_to_cylindrical(points)
+    assert np.allclose(CoordinateTransform.points_from_cylindrical(cylindrical), points)
+
+    x, y, z = CoordinateTransform.spherical_to_cartesian(2.0, np.pi / 2, 0.0)
+    assert isinstance(x, float) and np.allclose([x, y, z], [2, 0, 0])
+
+
+@pytest.mark.parametrize('order', ['xyz', 'xzy', 'yxz', 'yzx', 'zxy', 'zyx',
+                                   'xyx', 'xzx', 'yxy', 'yzy', 'zxz', 'zyz'])
+def test_euler_angles_all_sequences(order):
+    from scipy.spatial.transform import Rotation
+
+    angles = np.random.default_rng(1).uniform(-np.pi, np.pi, (50, 3))
+    for seq in (order, order.upper()):
+        R = CoordinateTransform.euler_angles_rotation(angles, seq)
+        assert np.allclose(R, Rotation.from_euler(seq, angles).as_matrix())
+        q = CoordinateTransform.euler_angles_rotation(angles, seq, as_quaternion=True)
+        assert np.allclose(CoordinateTransform.quaternion_to_matrix(q), R)
+
+        recovered = CoordinateTransform.rotation_to_euler_angles(R, seq)
+        assert np.allclose(CoordinateTransform.euler_angles_rotation(recovered, seq), R)
+
+        # 万向节锁：中间角取奇异值
+        locked = angles.copy()
+        locked[:, 1] = 0.0 if order[0] == order[2] else np.pi / 2
+        R_locked = CoordinateTransform.euler_angles_rotation(locked, seq)
+        recovered = CoordinateTransform.rotation_to_euler_angles(R_locked, seq)
+        assert np.all(np.isfinite(recovered))
+        assert np.allclose(CoordinateTransform.euler_angles_rotation(recovered, seq), R_locked)
+
+
+def test_reference_frame_tree_transforms():
+    from src._1_核心基础模块._2_坐标系转换 import ReferenceFrame
+
+    world = ReferenceFrame('world')
+    arm = [world]
+    for i in range(6):  # 六连杆串联机械臂
+        link = ReferenceFrame(f'link{i}', parent=arm[-1])
+        link.add_rotation('xyz'[i % 3], 0.3 + 0.1 * i)
+        link.translation = [1.0, 0.0, 0.2 * i]
+        arm.append(link)
+    base = ReferenceFrame('base', parent=world)
+    base.add_rotation('z', 1.0)
+    base.translation = [0.0, 2.0, 0.0]
+
+    def to_world(frame, p):
+        while frame.parent is not None:
+            p = frame.transform_vector(p) + frame.translation
+            frame = frame.parent
+        return p
+
+    points = np.random.default_rng(2).normal(size=(20, 3))
+    tool = arm[-1]
+    in_base = ReferenceFrame.transform_points(points, tool, base)
+    assert np.allclose(ReferenceFrame.transform_points(in_base, base, tool), points)
+    assert np.allclose([to_world(base, p) for p in in_base], [to_world(tool, p) for p in points])
+    assert ReferenceFrame.lowest_common_ancestor(tool, arm[3]) is arm[3]
+
+    # 祖先变化只使子树缓存失效
+    tool.world_transform()
+    base.world_transform()
+    arm[2].add_rotation('z', 0.5)
+    assert tool._dirty and not base._dirty
+    assert np.allclose(ReferenceFrame.transform_points(points, tool, world),
+                       [to_world(tool, p) for p in points])
+
+
+def test_transform_to_transformed_root():
+    from src._1_核心基础模块._2_坐标系转换 import ReferenceFrame
+
+    # 根坐标系自身带旋转与平移时，变换到根坐标系的结果应与根的局部变换无关
+    root = ReferenceFrame('root')
+    root.add_rotation('x', 0.7)
+    root.translation = [1.0, 2.0, 3.0]
+    child = ReferenceFrame('child', parent=root)
+    assert np.allclose(ReferenceFrame.transform_points(np.array([[1.0, 0.0, 0.0]]), child, root), [[1.0, 0.0, 0.0]])
+
+    child.add_rotation('z', 0.4)
+    child.translation = [0.5, -1.0, 0.0]
+    p = np.array([0.3, 0.2, -0.1])
+    expected = child.rotation_matrix.T @ p + child.translation
+    assert np.allclose(ReferenceFrame.transform_points(p[None], child, root)[0], expected)
+    assert np.allclose(ReferenceFrame.transform_points(expected[None], root, child)[0], p)
@@ -0,0 +1,59 @@
+# tests/test_disk_cache.py
+import os
+import numpy as np
+from sympy import cos, symbols
+from src._1_核心基础模块._4_磁盘缓存 import DiskCache
+from src._4_动力学._2_拉格朗日方程 import LagrangianSystem
+
+
+def test_content_addressed_keys_and_invalidation(tmp_path):
+    cache = DiskCache(tmp_path)
+    x, y = symbols('x y')
+    key = cache.key('eom', x ** 2 + y, [x, y], True)
+    assert key == DiskCache.key('eom', y + x ** 2, [x, y], True)
+    assert key != DiskCache.key('eom', x ** 2 + y, [x, y], False)
+
+    calls = []
+    compute = lambda: calls.append(1) or {'value': x ** 2}
+    assert cache.get_or_compute(key, compute) == cache.get_or_compute(key, compute)
+    assert len(calls) == 1 and cache.hits == 1
+
+    cache.set(DiskCache.key('compiled', 'a'), 'source')
+    assert cache.invalidate(namespace='eom') == 1
+    assert key not in cache and DiskCache.key('compiled', 'a') in cache
+    assert cache.clear() == 1
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=3 * 1100)
+    blob = b'x' * 1000
+    for i in range(3):
+        cache.set(f'k-{i}', blob)
+        os.utime(cache._path(f'k-{i}'), ns=(i * 10 ** 9, i * 10 ** 9))
+    cache.get('k-0')  # 刷新最近使用时间
+    cache.set('k-3', blob)
+    assert 'k-0' in cache and 'k-3' in cache and 'k-1' not in cache
+    assert cache.size() <= cache.max_bytes
+
+
+def test_lagrangian_system_reuses_cached_derivations(tmp_path):
+    def build():
+        sys = LagrangianSystem(dof=2, cache=tmp_path)
+        q1, q2 = sys.q
+        q1d, q2d = sys.qdot
+        m, g = symbols('m g')
+        T = m / 2 * (2 * q1d ** 2 + q2d ** 2 + 2 * q1d * q2d * cos(q1 - q2))
+        sys.set_lagrangian(T, m * g * (-2 * cos(q1) - cos(q2)))
+        return sys
+
+    first = build()
+    eqs = first.derive_equations()
+    f = first.compile(values={'m': 1.0, 'g': 9.81})
+
+    second = build()
+    assert second.derive_equations() == eqs
+    g = second.compile(values={'m': 1.0, 'g': 9.81})
+    assert second.cache.hits == 2 and second._lm is None  # 命中时不再构造 LagrangesMethod
+    assert g.source == f.source
+    y = np.array([0.3, 0.1, -0.2, 0.4])
+    assert np.allclose(g(0.0, y), f(0.0, y))
@@ -0,0 +1,68 @@
+# tests/test_hamiltonian.py
+import numpy as np
+from sympy import cos, symbols
+from src._4_动力学._3_哈密顿方程 import HamiltonianSystem
+from src._4_动力学._4_数值方法._3_雅可比矩阵工具 import FiniteDifferenceJacobian
+
+
+def test_compiled_canonical_equations_with_jacobian():
+    m, g, l = symbols('m g l')
+    sys = HamiltonianSystem(dof=1)
+    sys.set_hamiltonian(sys.p[0] ** 2 / (2 * m * l ** 2) - m * g * l * cos(sys.q[0]))
+    f = sys.compile(values={'m': 2.0, 'l': 1.5, 'g': 9.81}, jacobian=True)
+    Y = np.random.default_rng(0).normal(size=(5, 2))
+    assert np.allclose(f(0.0, Y)[:, 0], Y[:, 1] / (2.0 * 1.5 ** 2))
+    assert np.allclose(f(0.0, Y)[:, 1], -2.0 * 9.81 * 1.5 * np.sin(Y[:, 0]))
+    J = f.jacobian(0.0, Y)
+    assert np.allclose(J[2], FiniteDifferenceJacobian(f, 2)(0.0, Y[2]), atol=1e-6)
+
+    A, B = sys.linearize([0.0, 0.0], values={'m': 1.0, 'l': 1.0, 'g': 9.81})
+    assert np.allclose(A, [[0, 1], [-9.81, 0]]) and np.allclose(B, [[0], [1]])
+
+
+def test_legendre_transform_quadratic_kinetic_energy():
+    m, k = symbols('m k')
+    sys = HamiltonianSystem(dof=1)
+    q, qd = sys.q[0], sys.qdot[0]
+    sys.set_lagrangian(m * qd ** 2 / 2, k * q ** 2 / 2)
+    H = sys.legendre_transform()
+    assert (H - (sys.p[0] ** 2 / (2 * m) + k * q ** 2 / 2)).expand() == 0
+    assert sys.is_separable()
+
+
+def test_double_pendulum_canonical_equations_numeric_and_symbolic():
+    from tests.test_lagrangian import double_pendulum
+
+    lagrangian = double_pendulum()
+    sys = HamiltonianSystem(dof=2)
+    sys.set_lagrangian(lagrangian.L.xreplace(dict(zip(lagrangian.q, sys.q))), 0)
+    assert not sys.is_separable()
+    symbolic = sys.compile()
+    numeric = sys.compile(legendre='numeric')
+    Y = np.random.default_rng(1).normal(size=(6, 4))
+    assert np.allclose(symbolic(0.0, Y), numeric(0.0, Y))
+
+    # 与拉格朗日形式一致：q̇ = M⁻¹p
+    f = lagrangian.compile()
+    qdot = numeric(0.0, Y)[:, 0::2]
+    y_lag = np.empty_like(Y)
+    y_lag[:, 0::2], y_lag[:, 1::2] = Y[:, 0::2], qdot
+    assert np.allclose(f(0.0, y_lag)[:, 0::2], qdot)
+
+    t, y = sys.integrate(Y[0], [0, 1], t_eval=[1.0], rtol=1e-9, atol=1e-12)
+    assert y.shape == (1, 4)
+
+
+def test_separable_hamiltonian_uses_symplectic_integrator():
+    sys = HamiltonianSystem(dof=1)
+    sys.set_hamiltonian(sys.p[0] ** 2 / 2 - 9.81 * cos(sys.q[0]))
+
+    def energy(y):
+        return y[..., 1] ** 2 / 2 - 9.81 * np.cos(y[..., 0])
+
+    y0 = np.array([[1.0, 0.0], [2.0, 0.5]])
+    _, y = sys.integrate(y0, [0, 500], dt=0.05)
+    _, y_rk4 = sys.integrate(y0, [0, 500], dt=0.05, method='RK4')
+    drift = np.ptp(energy(y), axis=0)
+    assert y.shape[1:] == (2, 2) and np.all(drift < 1e-3)
+    assert np.all(drift < np.ptp(energy(y_rk4), axis=0) / 10)  # 辛积分无长期能量漂移
@@ -0,0 +1,140 @@
+# tests/test_lagrangian.py
+import numpy as np
+import pytest
+from sympy import cos, sin, symbols
+from src._4_动力学._2_拉格朗日方程 import LagrangianSystem
+from src._4_动力学._4_数值方法._1_微分方程求解器 import ODESolver
+
+
+def double_pendulum(m1=1.0, m2=1.0, l1=1.0, l2=1.0, g=9.81):
+    sys = LagrangianSystem(dof=2)
+    q1, q2 = sys.q
+    q1d, q2d = sys.qdot
+    T = 0.5 * m1 * l1 ** 2 * q1d ** 2 + 0.5 * m2 * (l1 ** 2 * q1d ** 2 + l2 ** 2 * q2d ** 2
+                                                    + 2 * l1 * l2 * q1d * q2d * cos(q1 - q2))
+    V = -(m1 + m2) * g * l1 * cos(q1) - m2 * g * l2 * cos(q2)
+    sys.set_lagrangian(T, V)
+    return sys
+
+
+def double_pendulum_reference(y, m1=1.0, m2=1.0, l1=1.0, l2=1.0, g=9.81):
+    """双摆运动方程的手工推导结果"""
+    th1, w1, th2, w2 = np.moveaxis(y, -1, 0)
+    delta = th2 - th1
+    den1 = (m1 + m2) * l1 - m2 * l1 * np.cos(delta) ** 2
+    den2 = (l2 / l1) * den1
+    dw1 = (m2 * l1 * w1 ** 2 * np.sin(delta) * np.cos(delta) + m2 * g * np.sin(th2) * np.cos(delta)
+           + m2 * l2 * w2 ** 2 * np.sin(delta) - (m1 + m2) * g * np.sin(th1)) / den1
+    dw2 = (-m2 * l2 * w2 ** 2 * np.sin(delta) * np.cos(delta) + (m1 + m2) * g * np.sin(th1) * np.cos(delta)
+           - (m1 + m2) * l1 * w1 ** 2 * np.sin(delta) - (m1 + m2) * g * np.sin(th2)) / den2
+    return np.stack([w1, dw1, w2, dw2], axis=-1)
+
+
+def test_compiled_double_pendulum_matches_hand_derivation():
+    f = double_pendulum(m1=1.5, l2=0.7).compile()
+    assert f.param_names == []
+    Y = np.random.default_rng(0).normal(size=(50, 4))
+    assert np.allclose(f(0.0, Y), double_pendulum_reference(Y, m1=1.5, l2=0.7), rtol=1e-12, atol=1e-12)
+    assert np.allclose(f(0.0, Y[3]), double_pendulum_reference(Y[3], m1=1.5, l2=0.7))
+
+    t, y = ODESolver.rk4(f, Y[:4], [0, 1], 0.01)
+    _, y_ref = ODESolver.rk4(lambda t, y: double_pendulum_reference(y, m1=1.5, l2=0.7), Y[:4], [0, 1], 0.01)
+    assert y.shape == (101, 4, 4) and np.allclose(y, y_ref, atol=1e-10)
+
+
+def test_compiled_chain_with_symbolic_parameters():
+    m, l, g = symbols('m l g')
+    sys = LagrangianSystem(dof=3)
+    x = y = vx = vy = 0
+    T = V = 0
+    for q, qd in zip(sys.q, sys.qdot):
+        x, y = x + l * sin(q), y - l * cos(q)
+        vx, vy = vx + l * cos(q) * qd, vy + l * sin(q) * qd
+        T += m * (vx ** 2 + vy ** 2) / 2
+        V += m * g * y
+    sys.set_lagrangian(T, V)
+    f = sys.compile(values={'m': 1.0, 'l': 1.0, 'g': 9.81})
+    assert f.param_names == ['g', 'l', 'm']
+
+    Y = np.random.default_rng(1).normal(size=(8, 6))
+    # 质量按比例缩放不改变运动；逐成员参数按行广播
+    assert np.allclose(f(0.0, Y), f(0.0, Y, {'m': 3.0, 'l': 1.0, 'g': 9.81}))
+    lengths = np.linspace(1, 2, 8)
+    per_member = f(0.0, Y, [9.81, lengths, 1.0])
+    assert np.allclose(per_member[5], f(0.0, Y[5], [9.81, lengths[5], 1.0]))
+
+    # 小角度下单摆链的能量守恒
+    bound = f.bind({'m': 1.0, 'l': 1.0, 'g': 9.81})
+    t, traj = ODESolver.rk45(bound, Y[0] * 0.1, [0, 2], rtol=1e-9, atol=1e-12)
+    assert np.all(np.isfinite(traj))
+    with pytest.raises(ValueError):
+        sys.compile()(0.0, Y)  # 未给参数值
+
+
+def pendulum_chain(n):
+    m, l, g = symbols('m l g')
+    sys = LagrangianSystem(dof=n)
+    x = y = vx = vy = 0
+    T = V = 0
+    for q, qd in zip(sys.q, sys.qdot):
+        x, y = x + l * sin(q), y - l * cos(q)
+        vx, vy = vx + l * cos(q) * qd, vy + l * sin(q) * qd
+        T += m * (vx ** 2 + vy ** 2) / 2
+        V += m * g * y
+    sys.set_lagrangian(T, V)
+    return sys
+
+
+def test_fast_derivation_matches_lagranges_method():
+    sys = double_pendulum(m1=1.5, l2=0.7)
+    slow = sys.derive_equations(simplify=False)
+    fast = sys.derive_equations(simplify=True, fast=True)
+    assert {'mass_matrix', 'forcing', 'simplify', 'total'} <= set(sys.timings)
+    assert all((a - b).expand().simplify() == 0 for a, b in zip(slow, fast))
+
+
+def test_fast_derivation_of_pendulum_chain():
+    sys = pendulum_chain(5)
+    sys.derive_equations(fast=True, simplify=False)
+    assert sys.timings['total'] < 30
+    f = sys.compile(values={'m': 1.0, 'l': 1.0, 'g': 9.81})
+
+    def energy(y):
+        q, u = y[..., 0::2], y[..., 1::2]
+        vx = np.cumsum(np.cos(q) * u, axis=-1)
+        vy = np.cumsum(np.sin(q) * u, axis=-1)
+        return 0.5 * (vx ** 2 + vy ** 2).sum(-1) - 9.81 * np.cumsum(np.cos(q), axis=-1).sum(-1)
+
+    y0 = np.zeros(10)
+    y0[0::2] = 0.3
+    _, y = ODESolver.dop853(f, y0, [0, 2], rtol=1e-10, atol=1e-10)
+    assert abs(energy(y[-1]) - energy(y0)) < 1e-6
+
+
+def test_analytic_jacobian_and_linearization():
+    from src._4_动力学._4_数值方法._3_雅可比矩阵工具 import FiniteDifferenceJacobian
+
+    sys = pendulum_chain(3)
+    values = {'m': 1.0, 'l': 1.0, 'g': 9.81}
+    f = sys.compile(values=values, jacobian=True)
+    Y = np.random.default_rng(2).normal(size=(4, 6))
+    dydt, J = f.rhs_and_jacobian(0.0, Y)
+    assert np.allclose(dydt, f(0.0, Y))
+    fd = FiniteDifferenceJacobian(f, 6)
+    assert all(np.allclose(J[k], fd(0.0, Y[k]), atol=1e-5) for k in range(4))
+
+    # 刚性求解器直接使用解析雅可比矩阵
+    _, y_jac = ODESolver.radau(f, Y[0] * 0.1, [0, 1], jac=f.jacobian, t_eval=[1.0], rtol=1e-8, atol=1e-10)
+    _, y_ref = ODESolver.dop853(f, Y[0] * 0.1, [0, 1], t_eval=[1.0], rtol=1e-10, atol=1e-12)
+    assert np.allclose(y_jac, y_ref, atol=1e-6)
+
+    A, B = double_pendulum().linearize(np.zeros(4))
+    omega = np.sort(np.abs(np.linalg.eigvals(A).imag))[::2]
+    assert np.allclose(omega ** 2, 9.81 * np.array([2 - np.sqrt(2), 2 + np.sqrt(2)]))  # 双摆简正频率
+    assert B.shape == (4, 2) and np.allclose(B[0::2], 0)
+
+    y0 = np.array([0.3, 0.2, -0.1, 0.5, 0.2, 0.0])
+    _, B = sys.linearize(y0, values=values, inputs=['g'])
+    h = 1e-6
+    expected = (f(0.0, y0, {**values, 'g': 9.81 + h}) - f(0.0, y0, {**values, 'g': 9.81 - h})) / (2 * h)
+    assert np.allclose(B[:, 0], expected, atol=1e-6)
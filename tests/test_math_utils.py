@@ -0,0 +1,42 @@
+# tests/test_math_utils.py
+import numpy as np
+import pytest
+from src._1_核心基础模块._3_数学工具函数 import MathUtils
+
+
+@pytest.mark.parametrize('method', ['trapezoid', 'simpson', 'gauss_kronrod', 'tanh_sinh'])
+def test_numerical_integrate_methods(method):
+    result = MathUtils.numerical_integrate(np.sin, 0, np.pi, method=method, full_output=True)
+    assert abs(result['value'] - 2.0) < 1e-5
+    assert result['n_eval'] > 0
+
+
+def test_adaptive_integration_accuracy():
+    # 尖峰被积函数：自适应细分集中在峰附近
+    peak = MathUtils.numerical_integrate(lambda x: np.exp(-1e4 * (x - 0.3) ** 2), 0, 1,
+                                         method='gauss_kronrod', full_output=True)
+    assert abs(peak['value'] - np.sqrt(np.pi / 1e4)) < 1e-10
+    assert peak['error'] < 1e-9
+
+    # 端点奇异：tanh-sinh
+    singular = MathUtils.numerical_integrate(lambda x: 1 / np.sqrt(x), 0, 1, method='tanh_sinh')
+    assert abs(singular - 2.0) < 1e-9
+
+
+@pytest.mark.parametrize('method', ['simpson', 'gauss_kronrod', 'tanh_sinh'])
+def test_batched_integration(method):
+    k = np.arange(1, 6)[:, None]
+    values = MathUtils.numerical_integrate(lambda x: np.sin(k * x), 0, np.pi, method=method)
+    expected = (1 - np.cos(k[:, 0] * np.pi)) / k[:, 0]
+    assert values.shape == (5,)
+    assert np.allclose(values, expected, atol=1e-6)
+
+
+def test_tanh_sinh_reversed_limits_and_sharp_peak():
+    reversed_ = MathUtils.numerical_integrate(np.sin, np.pi, 0, method='tanh_sinh', full_output=True)
+    assert abs(reversed_['value'] + 2.0) < 1e-10 and reversed_['n_eval'] > 0
+
+    # 粗层节点都错过尖峰时不能误判收敛
+    peak = MathUtils.numerical_integrate(lambda x: np.exp(-1e4 * (x - 0.3) ** 2), 0, 1,
+                                         method='tanh_sinh', full_output=True)
+    assert abs(peak['value'] - np.sqrt(np.pi / 1e4)) < 1e-9
@@ -0,0 +1,226 @@
+# tests/test_ode_solver.py
+import numpy as np
+import pytest
+from src._1_核心基础模块._3_数学工具函数 import MathUtils
+from src._4_动力学._4_数值方法._1_微分方程求解器 import ODESolver
+
+
+def oscillator(t, y):
+    """简谐振子 x'' = -x，按行向量化"""
+    return np.stack([y[..., 1], -y[..., 0]], axis=-1)
+
+
+def test_rk4_single_trajectory():
+    t, y = ODESolver.rk4(oscillator, np.array([1.0, 0.0]), [0, 10], 0.01)
+    assert np.allclose(y[:, 0], np.cos(t), atol=1e-7)
+
+
+def test_rk4_ensemble_matches_single_runs():
+    Y0 = np.random.default_rng(0).normal(size=(50, 2))
+    t, Y = ODESolver.rk4(oscillator, Y0, [0, 2], 0.01)
+    assert Y.shape == (len(t), 50, 2)
+    _, y7 = ODESolver.rk4(oscillator, Y0[7], [0, 2], 0.01)
+    assert np.allclose(Y[:, 7], y7)
+
+
+def test_rk4_step_mask_freezes_members():
+    Y = np.random.default_rng(1).normal(size=(10, 2))
+    mask = np.arange(10) % 2 == 0
+    calls = []
+
+    def counted(t, y):
+        calls.append(y.shape[0])
+        return oscillator(t, y)
+
+    stepped = MathUtils.rk4_step(counted, 0.0, Y, 0.1, mask=mask)
+    assert np.array_equal(stepped[~mask], Y[~mask])
+    assert not np.allclose(stepped[mask], Y[mask])
+    assert calls == [5, 5, 5, 5]  # 冻结成员不参与右端函数计算
+
+
+def test_inplace_rhs_and_save_every():
+    def oscillator_inplace(t, y, out):
+        out[0] = y[1]
+        out[1] = -y[0]
+
+    for method in (ODESolver.euler, ODESolver.rk4):
+        t_all, y_all = method(oscillator, np.array([1.0, 0.0]), [0, 1], 0.01)
+        t_k, y_k = method(oscillator_inplace, np.array([1.0, 0.0]), [0, 1], 0.01,
+                          inplace_rhs=True, save_every=7)
+        assert np.allclose(t_k[:-1], t_all[::7]) and np.isclose(t_k[-1], t_all[-1])
+        assert np.allclose(y_k[:-1], y_all[::7]) and np.allclose(y_k[-1], y_all[-1])
+
+        t_end, y_end = method(oscillator_inplace, np.array([1.0, 0.0]), [0, 1], 0.01,
+                              inplace_rhs=True, save_every=0)
+        assert y_end.shape == (1, 2) and np.allclose(y_end[0], y_all[-1])
+
+
+@pytest.mark.parametrize('method', ['RK45', 'DOP853'])
+def test_adaptive_methods_accuracy_and_dense_output(method):
+    t_eval = np.linspace(0, 20, 57)
+    t, y, info = ODESolver.solve_adaptive(oscillator, np.array([1.0, 0.0]), [0, 20], method=method,
+                                          t_eval=t_eval, rtol=1e-9, atol=1e-12, full_output=True)
+    assert np.array_equal(t, t_eval)
+    assert np.allclose(y[:, 0], np.cos(t_eval), atol=1e-7)
+    assert info['nfev'] < 4000  # 同精度下固定步长 RK4 约需 4 万次调用
+
+    # 不给 t_eval 时返回实际步点，且终点精确落在 t_span[1]
+    t_steps, y_steps = ODESolver.solve_adaptive(oscillator, np.array([1.0, 0.0]), [0, 5], method=method)
+    assert t_steps[-1] == 5 and np.isclose(y_steps[-1, 0], np.cos(5), atol=1e-3)
+
+
+@pytest.mark.parametrize('method, order', [('velocity', 2), ('position', 2), ('yoshida4', 4),
+                                           ('forest_ruth', 4), ('yoshida6', 6)])
+def test_symplectic_schemes_order_and_energy(method, order):
+    def accel(t, q):
+        return -q
+
+    errors = []
+    for dt in (0.1, 0.05):
+        t, y = ODESolver.verlet(accel, (np.array([1.0]), np.array([0.0])), [0, 10], dt, method=method)
+        energy = 0.5 * (y[:, 0] ** 2 + y[:, 1] ** 2)
+        assert np.abs(energy - 0.5).max() < 1e-2  # 能量误差有界，不随时间漂移
+        errors.append(abs(y[-1, 0] - np.cos(t[-1])))
+    assert np.log2(errors[0] / errors[1]) > order - 0.3
+
+
+def test_verlet_single_force_evaluation_and_ensemble():
+    calls = []
+
+    def accel(t, q, out):
+        calls.append(q.shape)
+        np.negative(q, out=out)
+
+    Y0 = np.random.default_rng(3).normal(size=(20, 4))
+    t, Y = ODESolver.verlet(accel, Y0, [0, 1], 0.01, inplace_accel=True, save_every=0)
+    assert len(calls) == len(np.arange(0, 1.01, 0.01))  # 首步一次 + 每步一次
+    assert Y.shape == (1, 20, 4)
+
+    _, y3 = ODESolver.verlet(lambda t, q: -q, Y0[3], [0, 1], 0.01, save_every=0)
+    assert np.allclose(Y[0, 3], y3[0])
+
+
+def test_symplectic_workspace_cache_follows_position():
+    from src._4_动力学._4_数值方法._1_微分方程求解器 import SymplecticWorkspace, _VELOCITY_VERLET
+    calls = []
+
+    def accel(t, q):
+        calls.append(q.copy())
+        return -q
+
+    workspace = SymplecticWorkspace((2,), _VELOCITY_VERLET)
+    first = workspace.step(accel, 0.0, np.array([1.0, 0.0]), 0.1)
+    workspace.step(accel, 0.1, first.copy(), 0.1)
+    assert len(calls) == 3  # 位置与上一步输出相同时复用加速度
+    # 形状相同但位置不同的新状态必须重新计算加速度
+    fresh = workspace.step(accel, 0.0, np.array([2.0, 0.0]), 0.1)
+    assert len(calls) == 5 and calls[3][0] == 2.0
+    assert np.allclose(fresh, 2 * first)
+
+
+def robertson(t, y):
+    """Robertson 化学动力学问题（强刚性）"""
+    return np.array([-0.04 * y[0] + 1e4 * y[1] * y[2],
+                     0.04 * y[0] - 1e4 * y[1] * y[2] - 3e7 * y[1] ** 2,
+                     3e7 * y[1] ** 2])
+
+
+@pytest.mark.parametrize('method', ['BDF', 'Radau'])
+def test_implicit_solvers_stiff_robertson(method):
+    from scipy.integrate import solve_ivp
+    t, y, info = ODESolver.solve_adaptive(robertson, [1.0, 0.0, 0.0], [0, 1e5], method=method,
+                                          rtol=1e-6, atol=1e-10, t_eval=[1e2, 1e5], full_output=True)
+    ref = solve_ivp(robertson, [0, 1e5], [1.0, 0.0, 0.0], method=method, rtol=1e-6, atol=1e-10, t_eval=[1e2, 1e5])
+    assert np.allclose(y, ref.y.T, rtol=1e-4, atol=1e-10)
+    assert np.isclose(y[-1].sum(), 1.0)
+    assert info['n_steps'] < 1000 and info['njev'] < info['n_steps'] / 4  # 雅可比矩阵跨步复用
+
+
+@pytest.mark.parametrize('method', ['BDF', 'Radau'])
+def test_implicit_solvers_sparse_jacobian(method):
+    from scipy.sparse import diags, issparse
+    from src._4_动力学._4_数值方法._3_雅可比矩阵工具 import FiniteDifferenceJacobian, group_columns
+
+    n = 500
+    L = diags([1.0, -2.0, 1.0], [-1, 0, 1], shape=(n, n), format='csr') * 1e4
+
+    def rhs(t, y):
+        return L @ y - y ** 3
+
+    assert group_columns(L != 0).max() == 2  # 三对角结构只需 3 次扰动
+    J = FiniteDifferenceJacobian(rhs, n, L != 0)(0.0, np.ones(n))
+    assert issparse(J) and np.allclose(J.toarray(), (L - 3 * diags(np.ones(n))).toarray(), atol=1e-4)
+
+    y0 = np.sin(np.linspace(0, np.pi, n))
+    _, y_fd, info = ODESolver.solve_adaptive(rhs, y0, [0, 0.1], method=method, t_eval=[0.1],
+                                             jac_sparsity=L != 0, rtol=1e-6, atol=1e-9, full_output=True)
+    _, y_an = ODESolver.solve_adaptive(rhs, y0, [0, 0.1], method=method, t_eval=[0.1],
+                                       jac=lambda t, y: L - diags(3 * y ** 2), rtol=1e-6, atol=1e-9)
+    assert np.allclose(y_fd, y_an, atol=1e-6)
+    assert info['nfev'] < 50 * info['n_steps']  # 显式法在此刚度下需数十万步
+
+
+def projectile(t, y):
+    """竖直平面抛体 [x, y, vx, vy]，按行向量化"""
+    return np.stack([y[..., 2], y[..., 3], np.zeros_like(y[..., 0]), np.full_like(y[..., 0], -9.81)], axis=-1)
+
+
+def ground(t, y):
+    return y[..., 1]
+
+
+ground.terminal = True
+ground.direction = -1
+
+
+@pytest.mark.parametrize('save_every', [1, 7, 0])
+def test_terminal_event_truncates_fixed_step(save_every):
+    def apex(t, y):
+        return y[..., 3]
+
+    t, y, info = ODESolver.rk4(projectile, np.array([0.0, 0.0, 20.0, 30.0]), [0, 10], 0.01,
+                               events=[ground, apex], save_every=save_every)
+    t_hit = 2 * 30 / 9.81
+    assert np.isclose(t[-1], t_hit, atol=1e-10) and len(t) <= int(t_hit / 0.01) + 2
+    assert np.allclose(y[-1], [20 * t_hit, 0.0, 20.0, -30.0], atol=1e-9)
+    assert np.allclose(info['t_events'][1], [30 / 9.81])  # 非终止事件同样被记录
+    assert np.allclose(info['t_events'][0], [t_hit])
+
+
+def test_event_direction_and_dense_refinement():
+    def crossing(t, y):
+        return y[0]
+
+    crossing.direction = 1
+    _, _, info = ODESolver.rk45(oscillator, np.array([1.0, 0.0]), [0, 20], events=crossing,
+                                rtol=1e-9, atol=1e-12)
+    assert np.allclose(info['t_events'][0], 3 * np.pi / 2 + 2 * np.pi * np.arange(3), atol=1e-8)
+
+    t, y, info = ODESolver.dop853(projectile, [0.0, 0.0, 20.0, 30.0], [0, 10], events=ground,
+                                  t_eval=np.linspace(0, 10, 101))
+    assert t[-1] <= 2 * 30 / 9.81 and len(t) == 62
+    assert np.isclose(info['t_events'][0][0], 2 * 30 / 9.81)
+
+
+def test_ensemble_per_member_terminal_events():
+    rng = np.random.default_rng(0)
+    Y0 = np.zeros((200, 4))
+    Y0[:, 2] = rng.uniform(5, 20, 200)
+    Y0[:, 3] = rng.uniform(5, 40, 200)
+    t, Y, info = ODESolver.rk4(projectile, Y0, [0, 100], 0.01, events=ground, save_every=0)
+    t_hit = 2 * Y0[:, 3] / 9.81
+    assert t[-1] < t_hit.max() + 0.01  # 最后一个成员落地即停止
+    assert np.allclose(info['t_terminal'], t_hit, atol=1e-10)
+    assert np.allclose(Y[-1, :, 1], 0.0, atol=1e-9)  # 各成员冻结在各自的落地状态
+    assert np.array_equal(np.sort(info['member_events'][0]), np.arange(200))
+
+
+def test_particle_trajectory_stops_at_ground():
+    from src._3_运动学._1_质点运动 import Particle
+
+    p = Particle(np.zeros(3), np.array([20.0, 30.0, 0.0]))
+    trajectory, info = p.cartesian_acceleration(lambda r, v, t: np.array([0, -9.81, 0]), t_end=10,
+                                                events=Particle.ground_contact())
+    assert np.isclose(trajectory[-1, 0], 2 * 30 / 9.81)
+    assert np.allclose(trajectory[-1, 1:3], [20 * 2 * 30 / 9.81, 0.0], atol=1e-8)
+    assert trajectory.shape[0] == 613
@@ -0,0 +1,437 @@
+# tests/test_truss.py
+import numpy as np
+import pytest
+from src._2_静力学._3_桁架分析专用模块 import (TrussModel, Node, Member, IncrementalTrussSolver, TrussDiagnostics,
+                                         TrussSolver, solve_truss)
+from src._2_静力学._3_桁架分析专用模块.solver import assemble_stiffness, model_arrays
+
+
+def bridge():
+    """示例中的四节点简支桁架"""
+    model = TrussModel()
+    model.add_node(Node(0, 0, 0, is_supported=True, support_type='pin'))
+    model.add_node(Node(1, 8, 0, is_supported=True, support_type='roller'))
+    model.add_node(Node(2, 2, 3))
+    model.add_node(Node(3, 6, 3))
+    for i, (a, b) in enumerate([(0, 2), (0, 3), (1, 3), (1, 2), (2, 3)]):
+        model.add_member(Member(i, a, b))
+    model.apply_load(2, np.array([0, -1e4]))
+    model.apply_load(3, np.array([0, -1e4]))
+    return model
+
+
+def pratt_truss(panels, width=2.0, height=3.0, load=-1e4):
+    """简支 Pratt 桁架：下弦节点 0..panels（左铰右滚），上弦节点依次在其后，下弦内节点受竖向荷载"""
+    model = TrussModel()
+    for i in range(panels + 1):
+        support = {0: 'pin', panels: 'roller'}.get(i)
+        model.add_node(Node(i, i * width, 0, is_supported=support is not None, support_type=support))
+    for i in range(1, panels):
+        model.add_node(Node(panels + i, i * width, height))
+    top = lambda i: panels + i
+    pairs = [(i, i + 1) for i in range(panels)]
+    pairs += [(top(i), top(i + 1)) for i in range(1, panels - 1)]
+    pairs += [(i, top(i)) for i in range(1, panels)]
+    pairs += [(0, top(1)), (panels, top(panels - 1))]
+    pairs += [(top(i), i + 1) if i < panels / 2 else (top(i + 1), i) for i in range(1, panels - 1)]
+    for k, (a, b) in enumerate(pairs):
+        model.add_member(Member(k, a, b))
+    for i in range(1, panels):
+        model.apply_load(i, np.array([0.0, load]))
+    return model
+
+
+def dense_stiffness(model):
+    """逐杆件循环组装的稠密参考刚度矩阵"""
+    index = {node_id: i for i, node_id in enumerate(model.nodes)}
+    K = np.zeros((2 * len(index), 2 * len(index)))
+    for m in model.members.values():
+        n1, n2 = model.nodes[m.start_node], model.nodes[m.end_node]
+        L = np.hypot(n2.x - n1.x, n2.y - n1.y)
+        g = np.array([-(n2.x - n1.x), -(n2.y - n1.y), n2.x - n1.x, n2.y - n1.y]) / L
+        dofs = [2 * index[n1.id], 2 * index[n1.id] + 1, 2 * index[n2.id], 2 * index[n2.id] + 1]
+        K[np.ix_(dofs, dofs)] += m.E * m.A / L * np.outer(g, g)
+    return K
+
+
+def test_bridge_example_forces():
+    # 对称静定桁架：支座反力各 10 kN，由节点 0、1 的平衡可得各杆内力
+    forces = solve_truss(bridge())
+    expected = {0: -1e4 * np.sqrt(13) / 2, 1: 1e4 * np.sqrt(45) / 6,
+                2: -1e4 * np.sqrt(13) / 2, 3: 1e4 * np.sqrt(45) / 6, 4: -2e4}
+    for member_id, value in expected.items():
+        assert forces[member_id] == pytest.approx(value, rel=1e-9)
+
+
+def test_sparse_assembly_matches_dense_and_statics():
+    model = pratt_truss(8)
+    data = model_arrays(model)
+    K = assemble_stiffness(data['coords'], data['connectivity'], data['EA'])
+    assert np.allclose(K.toarray(), dense_stiffness(model))
+
+    # 截面法：下弦杆 (3, 4) 的内力等于上弦节点 x = 6 处的弯矩除以桁高
+    forces = solve_truss(model)
+    reaction = 7 * 1e4 / 2
+    moment = reaction * 6.0 - 1e4 * (2.0 + 4.0)
+    assert forces[3] == pytest.approx(moment / 3.0, rel=1e-9)
+
+
+def test_node_ids_need_not_be_contiguous():
+    model = TrussModel()
+    for node in bridge().nodes.values():
+        model.add_node(Node(10 * node.id + 7, node.x, node.y, node.is_supported, node.support_type))
+    for m in bridge().members.values():
+        model.add_member(Member(m.id, 10 * m.start_node + 7, 10 * m.end_node + 7))
+    model.apply_load(27, np.array([0, -1e4]))
+    model.apply_load(37, np.array([0, -1e4]))
+    assert solve_truss(model) == pytest.approx(solve_truss(bridge()))
+
+
+def test_large_lattice_is_sparse():
+    model = pratt_truss(2000)
+    data = model_arrays(model)
+    K = assemble_stiffness(data['coords'], data['connectivity'], data['EA'])
+    assert K.nnz < 20 * K.shape[0]
+    forces = solve_truss(model)
+    assert len(forces) == len(model.members)
+    assert np.all(np.isfinite(list(forces.values())))
+
+
+def test_multiple_load_cases_share_one_factorization():
+    model = pratt_truss(8)
+    solver = TrussSolver(model)
+    cases = [{2: [0.0, -1e4]}, {5: [3e3, 0.0], 6: [0.0, -2e4]}, dict(model.loads)]
+    forces = solver.solve(solver.load_matrix(cases))
+    assert forces.shape == (len(model.members), 3)
+    for k, case in enumerate(cases):
+        model.loads = case
+        assert np.allclose(forces[:, k], list(solve_truss(model).values()))
+
+
+def test_influence_line_and_moving_load():
+    model = pratt_truss(8)
+    solver = TrussSolver(model)
+    deck = list(range(9))
+    line = solver.influence_line(deck)[solver.member_index[3]]
+    a = 2.0 * np.arange(9)
+    expected = np.where(a <= 6, a * (16 - 6) / 16, 6 * (16 - a) / 16) / 3.0
+    assert np.allclose(line, expected)
+
+    # 两轴车辆：轴重 1e4、2e4，轴距 3 m，首轴位于 x = 7 时后轴位于 x = 4
+    positions, forces = solver.moving_load(deck, [1e4, 2e4], [0.0, 3.0], positions=[7.0])
+    F = solver.load_matrix([{3: [0, -0.5e4], 4: [0, -0.5e4], 2: [0, -2e4]}])
+    assert np.allclose(forces, solver.solve(F))
+
+    positions, forces = solver.moving_load(deck, [1e4, 2e4], [0.0, 3.0])
+    assert positions[0] == 0.0 and positions[-1] == 19.0
+    # 默认位置（任一轴位于节点）已包含包络极值
+    _, dense = solver.moving_load(deck, [1e4, 2e4], [0.0, 3.0], positions=np.linspace(0, 19, 1901))
+    assert np.allclose(forces.max(axis=1), dense.max(axis=1))
+    assert np.allclose(forces.min(axis=1), dense.min(axis=1))
+
+    # 路径中连续重复的节点不产生零长度节间
+    import warnings
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        _, repeated = solver.moving_load([0, 1, 1, 2, 3, 4, 4, 5, 6, 7, 8], [1e4, 2e4], [0.0, 3.0])
+    assert np.allclose(repeated, forces)
+    with pytest.raises(ValueError):
+        solver.moving_load([2, 2], [1e4])
+
+
+def test_diagnostics_are_opt_in(capsys):
+    model = pratt_truss(8)
+    forces = solve_truss(model)
+    assert capsys.readouterr().out == ''
+
+    diagnostics = TrussDiagnostics()
+    assert solve_truss(model, diagnostics) == pytest.approx(forces)
+    assert set(diagnostics.timings) == {'assembly', 'elimination', 'factorization', 'solve', 'recovery'}
+    solver = TrussSolver(model)
+    assert (diagnostics.n_dof, diagnostics.n_free, diagnostics.nnz) == (solver.ndof, 29, solver.K_free.nnz)
+    exact = np.linalg.cond(solver.K_free.toarray(), 1)
+    assert exact / 3 <= diagnostics.condition_estimate <= exact * 1.0001
+    assert diagnostics.residual_norm < 1e-12
+    assert '条件数估计' in str(diagnostics)
+
+
+def lattice(nx, ny):
+    """批量建模的 nx × ny 方格桁架（含一组斜杆），左列节点铰支，节点 id 为 10 + 2k"""
+    ix, iy = np.meshgrid(np.arange(nx), np.arange(ny), indexing='ij')
+    grid = 10 + 2 * (ix * ny + iy)
+    model = TrussModel()
+    model.add_nodes(grid.ravel(), np.column_stack([ix.ravel(), iy.ravel()]),
+                    np.where(ix.ravel() == 0, 0b11, 0))
+    pairs = np.concatenate([np.column_stack([grid[:-1].ravel(), grid[1:].ravel()]),
+                            np.column_stack([grid[:, :-1].ravel(), grid[:, 1:].ravel()]),
+                            np.column_stack([grid[:-1, :-1].ravel(), grid[1:, 1:].ravel()])])
+    model.add_members(np.arange(len(pairs)), pairs[:, 0], pairs[:, 1], E=2.1e11, A=1e-4)
+    return model
+
+
+def test_bulk_construction_matches_dataclass_api():
+    bulk = lattice(4, 3)
+    single = TrussModel()
+    for node in bulk.nodes.values():
+        single.add_node(node)
+    for member in bulk.members.values():
+        single.add_member(member)
+    for model in (bulk, single):
+        model.apply_load(10 + 2 * 11, np.array([0.0, -1e3]))
+    assert np.array_equal(bulk.connectivity, single.connectivity)
+    assert solve_truss(bulk) == pytest.approx(solve_truss(single))
+
+    assert bulk.nodes[10] == Node(10, 0.0, 0.0, True, 'pin', fixed=(True, True))
+    assert bulk.members[0] == Member(0, 10, 16)
+    assert 11 not in bulk.nodes and len(bulk.nodes) == 12
+    assert list(bulk.loads) == [32]
+    assert np.array_equal(bulk.constrained_dofs(), [0, 1, 2, 3, 4, 5])
+    assert np.array_equal(bulk.node_index.lookup([32, 10]), [11, 0])
+    with pytest.raises(KeyError):
+        bulk.node_index.lookup([11])
+    with pytest.raises(ValueError):
+        bulk.add_nodes([12], [[0.0, 0.0]])
+
+    # 同 id 的逐个添加覆盖原节点
+    single.add_node(Node(10, 0.0, 0.0))
+    assert single.supports[0] == 0 and len(single.nodes) == 12
+
+
+def test_loads_view_writes_through_and_records_are_read_only():
+    from dataclasses import FrozenInstanceError
+    model = bridge()
+    snapshot = dict(model.loads)
+    model.loads[3] = [1e3, 0.0]
+    del model.loads[2]
+    assert list(model.loads) == [3] and np.array_equal(model.load_array[1:], [[0, 0], [0, 0], [1e3, 0]])
+    assert np.array_equal(snapshot[3], [0.0, -1e4])  # 先前取出的荷载不随模型变化
+    with pytest.raises(ValueError):
+        model.loads[3][0] = 0.0
+    model.loads = model.loads
+    assert list(model.loads) == [3]
+
+    with pytest.raises(FrozenInstanceError):
+        model.members[1].A = 2e-4
+    with pytest.raises(FrozenInstanceError):
+        model.nodes[2].x = 1.0
+    assert model.members[1].A == 1e-4
+
+
+def test_large_bulk_model_solves():
+    model = lattice(200, 100)
+    assert len(model.members) > 59000
+    model.apply_loads(model.node_ids[-100:], np.tile([0.0, -1e3], (100, 1)))
+    forces = TrussSolver(model).solve()
+    assert forces.shape == (len(model.members),) and np.all(np.isfinite(forces))
+
+
+def test_binary_round_trip_with_memory_mapping(tmp_path):
+    from src._2_静力学._3_桁架分析专用模块 import load_truss, save_truss
+    model = lattice(30, 10)
+    model.apply_load(10 + 2 * 299, np.array([0.0, -1e3]))
+    solver = TrussSolver(model)
+    F = solver.load_matrix([model.loads, {10 + 2 * 150: [5e2, 0.0]}])
+    path = tmp_path / 'lattice.npz'
+    save_truss(path, model, load_cases=F, displacements=solver.displacements(F), forces=solver.solve(F))
+
+    loaded = load_truss(path)
+    assert isinstance(loaded['forces'], np.memmap)
+    assert np.array_equal(loaded['forces'][5:9, 1], solver.solve(F)[5:9, 1])
+    copy = loaded['model']
+    assert copy.loads.keys() == model.loads.keys()
+    assert copy.nodes[10] == model.nodes[10] and copy.members[7] == model.members[7]
+    assert np.allclose(TrussSolver(copy).solve(loaded['load_cases']), loaded['forces'])
+
+    # 写时复制：修改映射模型不影响文件
+    copy.apply_load(12, np.array([1.0, 1.0]))
+    copy.add_node(Node(10 ** 6, 0.0, -1.0))
+    assert 12 not in load_truss(path, mmap=False)['model'].loads
+    assert load_truss(path, mmap=False)['displacements'].shape == F.shape
+
+
+def test_text_importers(tmp_path):
+    import json
+    from src._2_静力学._3_桁架分析专用模块 import read_csv, read_json
+    reference = bridge()
+    nodes = [{'id': n.id, 'x': n.x, 'y': n.y, 'support': n.support_type or ''} for n in reference.nodes.values()]
+    members = [{'id': m.id, 'start': m.start_node, 'end': m.end_node} for m in reference.members.values()]
+    loads = [{'node': i, 'fx': f[0], 'fy': f[1]} for i, f in reference.loads.items()]
+    (tmp_path / 'bridge.json').write_text(json.dumps({'nodes': nodes, 'members': members, 'loads': loads}))
+    for name, records in (('nodes', nodes), ('members', members), ('loads', loads)):
+        lines = [','.join(records[0])] + [','.join(str(v) for v in r.values()) for r in records]
+        (tmp_path / f'{name}.csv').write_text('\n'.join(lines) + '\n')
+
+    expected = solve_truss(reference)
+    assert solve_truss(read_json(tmp_path / 'bridge.json')) == pytest.approx(expected)
+    model = read_csv(tmp_path / 'nodes.csv', tmp_path / 'members.csv', tmp_path / 'loads.csv')
+    assert model.nodes[1].support_type == 'roller'
+    assert solve_truss(model) == pytest.approx(expected)
+
+
+def test_text_importers_with_partially_omitted_fields(tmp_path):
+    import json
+    from src._2_静力学._3_桁架分析专用模块 import read_csv, read_json
+    reference = bridge()
+    reference.add_member(Member(1, 0, 3, A=2e-4))
+    reference.apply_load(2, np.array([5e3, -1e4]))
+    # 可省略字段只出现在部分记录中
+    nodes = [{'id': 0, 'x': 0, 'y': 0, 'support': 'pin'}, {'id': 1, 'x': 8, 'y': 0, 'support': 'roller'},
+             {'id': 2, 'x': 2, 'y': 3}, {'id': 3, 'x': 6, 'y': 3}]
+    members = [{'id': i, 'start': a, 'end': b} for i, (a, b) in enumerate([(0, 2), (0, 3), (1, 3), (1, 2), (2, 3)])]
+    members[1]['A'] = 2e-4
+    members[3]['E'] = 2.1e11
+    loads = [{'node': 2, 'fx': 5e3, 'fy': -1e4}, {'node': 3, 'fy': -1e4}]
+    (tmp_path / 'bridge.json').write_text(json.dumps({'nodes': nodes, 'members': members, 'loads': loads}))
+    expected = solve_truss(reference)
+    assert solve_truss(read_json(tmp_path / 'bridge.json')) == pytest.approx(expected)
+
+    # CSV 中的空单元格同样视为缺失
+    (tmp_path / 'nodes.csv').write_text('id,x,y,support\n0,0,0,pin\n1,8,0,roller\n2,2,3,\n3,6,3,\n')
+    (tmp_path / 'members.csv').write_text('id,start,end,E,A\n0,0,2,,\n1,0,3,,2e-4\n2,1,3,,\n'
+                                          '3,1,2,2.1e11,\n4,2,3,,\n')
+    (tmp_path / 'loads.csv').write_text('node,fx,fy\n2,5e3,-1e4\n3,,-1e4\n')
+    model = read_csv(tmp_path / 'nodes.csv', tmp_path / 'members.csv', tmp_path / 'loads.csv')
+    assert solve_truss(model) == pytest.approx(expected)
+
+
+def test_incremental_reanalysis_matches_full_solve():
+    model = lattice(12, 4)
+    model.apply_loads(model.node_ids[-4:], np.tile([0.0, -1e3], (4, 1)))
+    diagnostics = TrussDiagnostics(condition=False)
+    solver = IncrementalTrussSolver(model, diagnostics, max_rank=3)
+
+    solver.modify(5, A=3e-4)
+    solver.modify([20, 21], E=[1e11, 7e10])
+    solver.remove(100)  # 斜杆，删除后结构仍几何不变
+
+    reference = lattice(12, 4)
+    reference.apply_loads(reference.node_ids[-4:], np.tile([0.0, -1e3], (4, 1)))
+    reference.E[[20, 21]] = [1e11, 7e10]
+    reference.A[5] = 3e-4
+    reference.A[100] = 1e-30
+    expected = TrussSolver(reference).solve()
+    forces = solver.solve()
+    assert forces[100] == 0.0
+    assert np.allclose(forces, expected, rtol=1e-7, atol=1e-6)
+
+    # 秩达到上限后并入分解
+    assert solver.refactorizations == 1 and solver.rank == 0
+    solver.modify(6, A=2e-4)
+    assert solver.rank == 1
+    F = solver.load_matrix([{10: [1e3, 0.0]}, {40: [0.0, 5e2]}])
+    reference.A[6] = 2e-4
+    assert np.allclose(solver.solve(F), TrussSolver(reference).solve(F), rtol=1e-7, atol=1e-6)
+    assert diagnostics.residual_norm < 1e-10  # 残差按修改后的刚度计算
+
+    solver.restore()
+    assert np.allclose(solver.solve(), TrussSolver(lattice(12, 4)).solve(solver.loads))
+
+    # 逐杆件试算：恢复后不保留已恢复杆件的缓存列
+    for member in range(30):
+        solver.modify(member, A=2e-4)
+        solver.solve()
+        solver.restore(member)
+    assert solver.rank == 0 and not solver._columns
+
+
+def test_mechanism_is_detected_and_reverted():
+    solver = IncrementalTrussSolver(bridge())
+    before = solver.solve()
+    solver.modify(2, A=2e-4)
+    with pytest.raises(ValueError):
+        solver.remove(4)
+    assert solver.active[4] and solver.rank == 1
+    modified = bridge()
+    modified.add_member(Member(2, 1, 3, A=2e-4))
+    assert np.allclose(solver.solve(), list(solve_truss(modified).values()))
+    solver.restore(2)
+    assert np.allclose(solver.solve(), before)
+
+
+def tower(levels, width=1.0, height=1.0):
+    """方形截面空间桁架塔：每层 4 个节点，底层全约束，含竖杆、水平杆、面内斜杆与层内斜杆"""
+    model = TrussModel(dim=3)
+    corners = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=float) * width
+    level = np.repeat(np.arange(levels + 1), 4)
+    coords = np.column_stack([np.tile(corners, (levels + 1, 1)), level * height])
+    fixed = np.zeros((len(coords), 3), dtype=bool)
+    fixed[:4] = True
+    model.add_nodes(np.arange(len(coords)), coords, fixed)
+    node = lambda k, c: 4 * k + c % 4
+    pairs = []
+    for k in range(levels):
+        for c in range(4):
+            pairs += [(node(k, c), node(k + 1, c)), (node(k + 1, c), node(k + 1, c + 1)),
+                      (node(k, c), node(k + 1, c + 1))]
+        pairs.append((node(k + 1, 0), node(k + 1, 2)))
+    pairs = np.array(pairs)
+    model.add_members(np.arange(len(pairs)), pairs[:, 0], pairs[:, 1])
+    return model
+
+
+def test_space_truss_tripod():
+    # 三脚架：顶点竖向荷载 P 由三根腿平均承担，每根腿压力 P·L / (3h)
+    h, r, P = 4.0, 3.0, 1.2e4
+    model = TrussModel(dim=3)
+    model.add_node(Node(0, 0.0, 0.0, z=h))
+    for k in range(3):
+        angle = 2 * np.pi * k / 3
+        model.add_node(Node(k + 1, r * np.cos(angle), r * np.sin(angle), fixed=(True, True, True)))
+        model.add_member(Member(k, k + 1, 0))
+    model.apply_load(0, np.array([0.0, 0.0, -P]))
+    forces = solve_truss(model)
+    assert list(forces.values()) == pytest.approx([-P * 5.0 / (3 * h)] * 3)
+    assert model.nodes[1].support_type == 'pin' and model.nodes[0].z == h
+
+
+def test_space_assembly_matches_dense_reference_and_planar_solution():
+    model = tower(3)
+    data = model_arrays(model)
+    K = assemble_stiffness(data['coords'], data['connectivity'], data['EA'])
+    dense = np.zeros(K.shape)
+    for (i, j), EA in zip(data['connectivity'], data['EA']):
+        d = data['coords'][j] - data['coords'][i]
+        L = np.linalg.norm(d)
+        g = np.concatenate([-d, d]) / L
+        dofs = np.r_[3 * i:3 * i + 3, 3 * j:3 * j + 3]
+        dense[np.ix_(dofs, dofs)] += EA / L * np.outer(g, g)
+    assert np.allclose(K.toarray(), dense)
+
+    # 置于 z = 0 平面、约束全部 z 向位移的平面桁架与二维解一致
+    planar = pratt_truss(6)
+    space = TrussModel(dim=3)
+    masks = {'pin': (True, True, True), 'roller': (False, True, True), None: (False, False, True)}
+    for node in planar.nodes.values():
+        space.add_node(Node(node.id, node.x, node.y, fixed=masks[node.support_type]))
+    for member in planar.members.values():
+        space.add_member(member)
+    for node_id, load in planar.loads.items():
+        space.apply_load(node_id, np.append(load, 0.0))
+    assert solve_truss(space) == pytest.approx(solve_truss(planar))
+
+
+def test_large_space_tower_solves_incrementally_and_round_trips(tmp_path):
+    from src._2_静力学._3_桁架分析专用模块 import load_truss, save_truss
+    model = tower(200)
+    assert len(model.members) == 2600
+    top = model.node_ids[-4:]
+    model.apply_loads(top, np.tile([1e3, 0.0, -5e3], (4, 1)))
+    solver = IncrementalTrussSolver(model)
+    forces = solver.solve()
+    # 顶部 +x 向水平力产生的倾覆弯矩使底层 x = 0 一侧竖杆受拉、x = 1 一侧受压，大小约为 M / (2b) 减去竖向荷载的四分之一
+    moment = 4 * 1e3 * 200
+    assert forces[0] == pytest.approx(moment / 2 - 5e3, rel=0.02) and forces[3] < 0
+
+    solver.modify(10, A=5e-4)
+    reference = tower(200)
+    reference.apply_loads(top, np.tile([1e3, 0.0, -5e3], (4, 1)))
+    reference.A[10] = 5e-4
+    expected = TrussSolver(reference).solve()
+    assert np.allclose(solver.solve(), expected, atol=1e-8 * np.abs(expected).max())
+    unit = TrussSolver(reference).solve(solver.load_matrix([{int(top[0]): [0.0, 0.0, -1.0]}]))
+    assert np.allclose(solver.influence_line(top[:1]), unit, atol=1e-8 * np.abs(unit).max())
+
+    save_truss(tmp_path / 'tower.npz', model, forces=forces)
+    loaded = load_truss(tmp_path / 'tower.npz')
+    assert loaded['model'].dim == 3
+    assert np.allclose(TrussSolver(loaded['model']).solve(), loaded['forces'])
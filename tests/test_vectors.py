@@ -1,7 +1,8 @@
 # tests/test_vectors.py
 import pytest
 import numpy as np
-from src._1_核心基础模块._1_矢量运算工具 import Vector3D  # 修正后的导入路径
+from src._1_核心基础模块._1_矢量运算工具 import (Vector3D, Vector3DArray, rotate_vectors,
+                                          rodrigues_matrix)  # 修正后的导入路径
 
 
 def test_vector_operations():
@@ -23,4 +24,69 @@ def test_vector_operations():
 def test_rotation():
     v = Vector3D(1, 0, 0)
     rotated = v.rotate(Vector3D(0, 0, 1), np.pi / 2)  # 绕z轴旋转90度
-    assert np.allclose(rotated.components, [0, 1, 0], atol=1e-9)
\ No newline at end of file
+    assert np.allclose(rotated.components, [0, 1, 0], atol=1e-9)
+
+
+def test_vector_array_operations():
+    data = np.array([[1.0, 2, 3], [4, 5, 6]])
+    arr = Vector3DArray(data)
+    assert np.shares_memory(np.asarray(arr), data)  # 零拷贝
+
+    v = Vector3D(1, 0, 0)
+    assert np.allclose((arr + v).data, data + [1, 0, 0])
+    assert np.allclose((v + arr).data, data + [1, 0, 0])
+    assert np.allclose((arr * np.array([2.0, 3.0])).data, [[2, 4, 6], [12, 15, 18]])
+    assert np.allclose(arr.dot(v), [1, 4])
+    assert np.allclose(arr.cross(Vector3D(4, 5, 6)).data[0], [-3, 6, -3])
+    assert np.allclose(arr.normalize().norm(), 1.0)
+
+    rotated = arr.rotate(Vector3D(0, 0, 1), np.pi / 2)
+    assert np.allclose(rotated.data[0], arr[0].rotate(Vector3D(0, 0, 1), np.pi / 2).components)
+
+
+def test_scalar_fast_path():
+    buf = np.array([1.0, 2.0, 3.0])
+    v = Vector3D.from_array(buf)
+    assert v.components is buf
+    assert not hasattr(v, '__dict__')
+
+    v += Vector3D(1, 1, 1)
+    assert buf.tolist() == [2, 3, 4]  # 原地运算写回共享缓冲区
+    v *= 2
+    assert v == Vector3D(4, 6, 8)
+    assert -v == Vector3D(-4, -6, -8)
+    assert 0.5 * v == Vector3D(2, 3, 4)
+
+
+def test_batched_rotation():
+    rng = np.random.default_rng(0)
+    v = rng.normal(size=(5, 3))
+    axes = rng.normal(size=(5, 3))
+    angles = rng.uniform(-np.pi, np.pi, 5)
+
+    # N 组轴角逐一作用，与标量实现逐个对比
+    batched = rotate_vectors(v, axes, angles)
+    for i in range(5):
+        expected = Vector3D(*v[i]).rotate(Vector3D(*axes[i]), angles[i])
+        assert np.allclose(batched[i], expected.components)
+
+    # 单轴单角作用于全部矢量
+    R = rodrigues_matrix(axes[0], angles[0])
+    assert np.allclose(rotate_vectors(v, axes[0], angles[0]), v @ R.T)
+
+    # M 个角 × N 个矢量
+    stack = rotate_vectors(v, [0, 0, 1], angles[:3], outer=True)
+    assert stack.shape == (3, 5, 3)
+    assert np.allclose(stack[2], rotate_vectors(v, [0, 0, 1], angles[2]))
+
+
+def test_rotation_about_zero_axis():
+    # 零轴时各路径均退化为 v cosθ，与原实现一致
+    v = np.array([1.0, 2.0, 3.0])
+    theta = 0.7
+    assert np.allclose(Vector3D(*v).rotate(Vector3D(0, 0, 0), theta).components, v * np.cos(theta))
+    assert np.allclose(rodrigues_matrix([0, 0, 0], theta), np.cos(theta) * np.eye(3))
+    axes = np.array([[0.0, 0.0, 0.0], [0.0, 0.0, 1.0]])
+    batched = rotate_vectors(np.tile(v, (2, 1)), axes, [theta, theta])
+    assert np.allclose(batched[0], v * np.cos(theta))
+    assert np.allclose(batched[1], rotate_vectors(v, axes[1], theta))